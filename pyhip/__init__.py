@@ -1,6 +1,69 @@
 from __future__ import absolute_import
 
+import importlib
+
 from . import hip
 from . import hiprtc
 
-__version__ = "0.1.2"
\ No newline at end of file
+# Submodules are imported on first access, importing pyhip stays cheap
+_SUBMODULES = frozenset([
+    "launch",
+    "allocator",
+    "array",
+    "pipeline",
+    "fileio",
+    "managed",
+    "tracking",
+    "fill",
+    "peer",
+    "ipc",
+    "streams",
+    "aio",
+    "futures",
+    "taskgraph",
+    "graph",
+    "events",
+    "profiler",
+    "kernel",
+    "autotune",
+])
+_ATTRIBUTES = {
+    "DeviceArray": "array",
+    "PreparedLaunch": "launch",
+}
+
+__version__ = "0.1.2"
+
+
+def load(path=None, hiprtc_path=None):
+    """
+    Explicitly load the hip and hiprtc libraries.
+
+    Importing pyhip does not open any library, they are loaded on the first
+    HIP call. Call this to pick the libraries or to fail early.
+
+    Parameters
+    ----------
+    path : str, optional
+        Path of the hip library, defaults to PYHIP_LIBHIP_PATH or the
+        platform library names.
+    hiprtc_path : str, optional
+        Path of the hiprtc library, defaults to PYHIP_LIBHIPRTC_PATH or the
+        platform library names.
+    """
+    hip._libhip.load(path)
+    hiprtc._libhiprtc.load(hiprtc_path)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    if name in _ATTRIBUTES:
+        value = getattr(importlib.import_module(f".{_ATTRIBUTES[name]}", __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | _SUBMODULES | set(_ATTRIBUTES))
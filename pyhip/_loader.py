@@ -0,0 +1,134 @@
+"""
+Lazy loading of the hip and hiprtc shared libraries
+"""
+
+import ctypes
+import os
+import threading
+
+
+class _LazyFunction:
+    """
+    Placeholder for a library function.
+
+    The restype/argtypes assigned at import time are only recorded here, the
+    real symbol is looked up and bound the first time the function is called.
+    """
+
+    def __init__(self, library, name):
+        self._library = library
+        self._name = name
+        self.restype = ctypes.c_int
+        self.argtypes = None
+
+    def bind(self):
+        func = getattr(self._library.handle, self._name)
+        func.restype = self.restype
+        if self.argtypes is not None:
+            func.argtypes = self.argtypes
+        # Replace the placeholder, later lookups get the ctypes function directly
+        self._library.__dict__[self._name] = func
+        return func
+
+    def __call__(self, *args):
+        return self.bind()(*args)
+
+
+class LazyLibrary:
+    """
+    Shared library that is opened on first use.
+
+    Attribute access returns a placeholder per symbol so that modules can
+    declare restype/argtypes at import time without touching the driver.
+
+    Parameters
+    ----------
+    env_var : str
+        Environment variable that overrides the library path.
+    candidates : callable
+        Returns a list of (library name, platform name) tuples to try in order.
+    error : str
+        Message of the error raised when no candidate can be loaded.
+    """
+
+    def __init__(self, env_var, candidates, error):
+        self._env_var = env_var
+        self._candidates = candidates
+        self._error = error
+        self._lock = threading.Lock()
+        self._handle = None
+        self._path = None
+        self._platform = ""
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        func = _LazyFunction(self, name)
+        self.__dict__[name] = func
+        return func
+
+    def load(self, path=None):
+        """
+        Open the shared library.
+
+        Parameters
+        ----------
+        path : str, optional
+            Explicit library path, takes precedence over the environment
+            variable and the default library names.
+
+        Returns
+        -------
+        handle : ctypes.CDLL
+            Loaded library.
+        """
+        with self._lock:
+            if self._handle is not None:
+                if path is not None and path != self._path:
+                    raise RuntimeError(
+                        f"library already loaded from {self._path}, cannot load {path}"
+                    )
+                return self._handle
+
+            if path is None:
+                path = os.environ.get(self._env_var)
+            if path is not None:
+                platform = "nvidia" if "nvhip" in os.path.basename(path) else "amd"
+                try:
+                    handle = ctypes.cdll.LoadLibrary(path)
+                except OSError as e:
+                    raise RuntimeError(f"cant load {path}: {e}") from e
+                self._path = path
+                self._platform = platform
+                self._handle = handle
+                return handle
+
+            for libname, platform in self._candidates():
+                try:
+                    handle = ctypes.cdll.LoadLibrary(libname)
+                except OSError:
+                    continue
+                self._path = libname
+                self._platform = platform
+                self._handle = handle
+                return handle
+            raise RuntimeError(self._error)
+
+    @property
+    def handle(self):
+        """Loaded ctypes library, loads it if needed."""
+        if self._handle is None:
+            self.load()
+        return self._handle
+
+    @property
+    def platform(self):
+        """Platform of the loaded library, amd or nvidia."""
+        if self._handle is None:
+            self.load()
+        return self._platform
+
+    @property
+    def loaded(self):
+        """True once the shared library has been opened."""
+        return self._handle is not None
@@ -0,0 +1,119 @@
+"""
+asyncio awaitables for stream and event completion
+"""
+
+import asyncio
+import weakref
+
+from . import hip
+from .events import event_pool
+
+# Poll interval bounds in seconds, the interval doubles while nothing
+# completes and drops back to the minimum when something does
+_MIN_INTERVAL = 50e-6
+_MAX_INTERVAL = 2e-3
+
+_pollers = weakref.WeakKeyDictionary()  # loop -> _Poller
+
+
+class _Poller:
+    """
+    hipEventQuery poller shared by all the waiters of an event loop.
+
+    Runs as a loop callback, no thread blocks on the device.
+    """
+
+    def __init__(self, loop):
+        # Weak, a strong reference would keep the _pollers key alive
+        self._loop = weakref.ref(loop)
+        self._waiters = []  # (event, future)
+        self._interval = _MIN_INTERVAL
+        self._handle = None
+
+    def add(self, event):
+        loop = self._loop()
+        future = loop.create_future()
+        self._waiters.append((event, future))
+        self._interval = _MIN_INTERVAL
+        if self._handle is None:
+            self._handle = loop.call_soon(self._poll)
+        return future
+
+    def _poll(self):
+        self._handle = None
+        pending = []
+        completed = False
+        for event, future in self._waiters:
+            if future.done():  # cancelled
+                continue
+            try:
+                ready = hip.hipEventQuery(event)
+            except hip.hipError as e:
+                future.set_exception(e)
+                continue
+            if ready:
+                future.set_result(None)
+                completed = True
+            else:
+                pending.append((event, future))
+        self._waiters = pending
+        if pending:
+            if completed:
+                self._interval = _MIN_INTERVAL
+            else:
+                self._interval = min(self._interval * 2, _MAX_INTERVAL)
+            self._handle = self._loop().call_later(self._interval, self._poll)
+
+
+def _poller():
+    loop = asyncio.get_running_loop()
+    poller = _pollers.get(loop)
+    if poller is None:
+        poller = _pollers[loop] = _Poller(loop)
+    return poller
+
+
+async def wait(event):
+    """
+    Wait for an event to complete without blocking the event loop.
+
+    Parameters
+    ----------
+    event : ctypes pointer
+        Recorded event.
+
+    Examples
+    --------
+    >>> hip.hipEventRecord(event, stream)
+    >>> await aio.wait(event)
+    """
+    if hip.hipEventQuery(event):
+        return
+    await _poller().add(event)
+
+
+async def synchronize(stream):
+    """
+    Wait for all the work enqueued on a stream so far without blocking the
+    event loop.
+
+    Records a disable-timing event from the event_pool() on stream and
+    waits for it.
+
+    Parameters
+    ----------
+    stream : ctypes pointer
+        Stream to wait for.
+
+    Examples
+    --------
+    >>> hip.hipMemcpyAsync_dtoh(out, ptr, stream=stream)
+    >>> await aio.synchronize(stream)
+    """
+    pool = event_pool()
+    event = pool.acquire()
+    try:
+        hip.hipEventRecord(event, stream)
+        await wait(event)
+    finally:
+        pool.release(event)
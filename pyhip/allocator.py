@@ -0,0 +1,600 @@
+"""
+Caching and stream ordered allocators on top of the hip memory APIs
+"""
+
+import ctypes
+import threading
+
+from . import hip
+
+# Smallest size class in bytes
+_MIN_BLOCK_SIZE = 512
+
+
+def _round_size(count):
+    """
+    Round an allocation size up to its size class.
+
+    Sizes are rounded to four classes per power of two, for example
+    1024, 1280, 1536, 1792, 2048, which bounds the waste to 25%.
+    """
+    if count <= _MIN_BLOCK_SIZE:
+        return _MIN_BLOCK_SIZE
+    step = (1 << (count - 1).bit_length()) >> 3
+    return (count + step - 1) // step * step
+
+
+def _address(ptr):
+    """
+    Integer address of a ctypes pointer, c_void_p or int.
+    """
+    if ptr is None or isinstance(ptr, int):
+        return ptr
+    if isinstance(ptr, ctypes.c_void_p):
+        return ptr.value
+    return ctypes.cast(ptr, ctypes.c_void_p).value
+
+
+class _Block:
+    __slots__ = ("ptr", "size", "stream", "event", "ordered")
+
+    def __init__(self, ptr, size, stream):
+        self.ptr = ptr
+        self.size = size
+        self.stream = stream
+        self.event = None
+        self.ordered = False  # freed on an explicit stream it was allocated on
+
+
+class CachingAllocator:
+    """
+    Device memory pool that caches freed blocks in size classes.
+
+    Freed blocks are kept and handed out again by malloc instead of going
+    through hipFree/hipMalloc. A block allocated and freed with explicit
+    streams is reused right away on the free stream, other streams only get
+    it once an event recorded at free time has completed. A block freed
+    without any stream, as by hipFree with the pool installed, waits for
+    the device like the driver hipFree does.
+
+    Install it with hip.hipSetAllocator to route hipMalloc/hipFree through
+    the pool.
+
+    Parameters
+    ----------
+    limit : int, optional
+        Maximum number of bytes held by the pool, in use and cached. Cached
+        blocks are released when an allocation would exceed it, MemoryError
+        is raised if that is not enough.
+
+    Examples
+    --------
+    >>> pool = CachingAllocator(limit=1 << 30)
+    >>> hip.hipSetAllocator(pool)
+    >>> ptr = hip.hipMalloc(1024)  # miss, allocated by the driver
+    >>> hip.hipFree(ptr)  # cached
+    >>> ptr = hip.hipMalloc(1000)  # hit, same size class
+    """
+
+    def __init__(self, limit=None):
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._bins = {}  # size class -> list of free blocks
+        self._allocated = {}  # address -> block in use
+        self._events = []  # recycled events
+        self.hits = 0
+        self.misses = 0
+        self.bytes_in_use = 0
+        self.bytes_cached = 0
+        self.peak_bytes = 0
+
+    @property
+    def bytes_held(self):
+        """Bytes held by the pool, in use and cached."""
+        return self.bytes_in_use + self.bytes_cached
+
+    def malloc(self, count, stream=None):
+        """
+        Allocate device memory from the pool.
+
+        Parameters
+        ----------
+        count : int
+            Number of bytes of memory to allocate
+        stream : ctypes pointer, optional
+            Stream the memory is going to be used on.
+
+        Returns
+        -------
+        ptr : ctypes pointer
+            Pointer to allocated device memory.
+        """
+        size = _round_size(count)
+        stream_key = _address(stream)
+        with self._lock:
+            block = self._take(size, stream_key)
+            if block is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+                if self.limit is not None and self.bytes_held + size > self.limit:
+                    self._release_cached()
+                    if self.bytes_held + size > self.limit:
+                        raise MemoryError(
+                            f"allocating {size} bytes exceeds pool limit {self.limit}"
+                        )
+                try:
+                    ptr = hip._hipMalloc(size)
+                except hip.hipError:
+                    # Out of memory, retry with the cache handed back to the driver
+                    self._release_cached()
+                    ptr = hip._hipMalloc(size)
+                block = _Block(ptr.value, size, stream_key)
+            block.stream = stream_key
+            self._allocated[block.ptr] = block
+            self.bytes_in_use += size
+            self.peak_bytes = max(self.peak_bytes, self.bytes_held)
+        return ctypes.c_void_p(block.ptr)
+
+    def free(self, ptr, stream=None):
+        """
+        Return device memory to the pool.
+
+        Pointers that were not allocated by the pool are freed with hipFree.
+
+        Parameters
+        ----------
+        ptr : ctypes pointer
+            Pointer to allocated device memory.
+        stream : ctypes pointer, optional
+            Stream the memory was last used on, defaults to the stream it
+            was allocated for. Without either, the device is synchronized.
+        """
+        address = _address(ptr)
+        with self._lock:
+            block = self._allocated.get(address)
+            if block is None:
+                hip._hipFree(ptr)
+                return
+            stream_key = block.stream if stream is None else _address(stream)
+            if stream_key is not None:
+                self._free_ordered(address, block, stream_key, stream is not None)
+                return
+        # Any stream may still use the block, the driver hipFree would
+        # synchronize as well
+        hip.hipDeviceSynchronize()
+        with self._lock:
+            if self._allocated.pop(address, None) is None:
+                return
+            block.stream = None
+            block.ordered = False
+            self.bytes_in_use -= block.size
+            self.bytes_cached += block.size
+            self._bins.setdefault(block.size, []).append(block)
+
+    def _free_ordered(self, address, block, stream_key, explicit):
+        try:
+            if self._events:
+                event = self._events.pop()
+            else:
+                event = hip.hipEventCreateWithFlags(hip.hipEventDisableTiming)
+            try:
+                hip.hipEventRecord(event, stream_key)
+            except hip.hipError:
+                self._events.append(event)
+                raise
+        except hip.hipError:
+            # Without an event the block cannot be reused safely, hipFree
+            # waits for the device before freeing it
+            del self._allocated[address]
+            self.bytes_in_use -= block.size
+            hip._hipFree(block.ptr)
+            return
+        del self._allocated[address]
+        block.ordered = explicit and block.stream is not None
+        block.stream = stream_key
+        block.event = event
+        self.bytes_in_use -= block.size
+        self.bytes_cached += block.size
+        self._bins.setdefault(block.size, []).append(block)
+
+    def _take(self, size, stream_key):
+        blocks = self._bins.get(size)
+        if not blocks:
+            return None
+        # Prefer the most recently freed block of the same stream, work
+        # enqueued on it is ordered after the previous use
+        if stream_key is not None:
+            for i in range(len(blocks) - 1, -1, -1):
+                if blocks[i].ordered and blocks[i].stream == stream_key:
+                    return self._pop(blocks, i)
+        for i in range(len(blocks)):
+            if blocks[i].event is None or hip.hipEventQuery(blocks[i].event):
+                return self._pop(blocks, i)
+        return None
+
+    def _pop(self, blocks, i):
+        block = blocks.pop(i)
+        if block.event is not None:
+            self._events.append(block.event)
+        block.event = None
+        block.ordered = False
+        self.bytes_cached -= block.size
+        return block
+
+    def _release_cached(self):
+        for blocks in self._bins.values():
+            for block in blocks:
+                hip._hipFree(block.ptr)
+                if block.event is not None:
+                    self._events.append(block.event)
+            self.bytes_cached -= sum(block.size for block in blocks)
+        self._bins.clear()
+        for event in self._events:
+            hip.hipEventDestroy(event)
+        self._events.clear()
+
+    def empty_cache(self):
+        """
+        Free all cached blocks, memory in use is not affected.
+        """
+        with self._lock:
+            self._release_cached()
+
+    def stats(self):
+        """
+        Pool counters.
+
+        Returns
+        -------
+        stats : dict
+            hits, misses, bytes_in_use, bytes_cached, bytes_held and
+            peak_bytes.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "bytes_in_use": self.bytes_in_use,
+                "bytes_cached": self.bytes_cached,
+                "bytes_held": self.bytes_held,
+                "peak_bytes": self.peak_bytes,
+            }
+
+
+# Pinned buffers are never smaller than a page
+_MIN_PINNED_SIZE = 4096
+
+
+class PinnedBufferPool:
+    """
+    Pool of page-locked host staging buffers.
+
+    Buffers are allocated with hipHostMalloc and recycled instead of being
+    freed. A buffer released with a stream is only handed out again once the
+    copies queued on that stream before the release have completed.
+
+    acquire returns a ctypes char array over the pinned memory, it can be
+    passed wherever a ctypes buffer is accepted (hipMemcpy*, memoryview,
+    ctypes.memmove).
+
+    Parameters
+    ----------
+    limit : int, optional
+        Maximum number of bytes held by the pool, MemoryError is raised when
+        an allocation would exceed it after releasing idle buffers.
+    flags : int, optional
+        hipHostMalloc* flags of the buffers.
+
+    Examples
+    --------
+    >>> pool = PinnedBufferPool()
+    >>> buf = pool.acquire(size)
+    >>> memoryview(buf)[:] = data
+    >>> hip.hipMemcpyAsync_htod(ptr, buf, size, stream)
+    >>> pool.release(buf, stream)
+    """
+
+    def __init__(self, limit=None, flags=hip.hipHostMallocDefault):
+        self.limit = limit
+        self.flags = flags
+        self._lock = threading.Lock()
+        self._bins = {}  # size class -> list of idle blocks
+        self._acquired = {}  # address -> block handed out
+        self._events = []  # recycled events
+        self.hits = 0
+        self.misses = 0
+        self.bytes_in_use = 0
+        self.bytes_cached = 0
+        self.peak_bytes = 0
+
+    @property
+    def bytes_held(self):
+        """Bytes held by the pool, in use and cached."""
+        return self.bytes_in_use + self.bytes_cached
+
+    def acquire(self, count):
+        """
+        Get a pinned buffer of at least count bytes.
+
+        Parameters
+        ----------
+        count : int
+            Number of bytes needed.
+
+        Returns
+        -------
+        buf : ctypes.c_char array
+            count bytes of page-locked host memory.
+        """
+        size = _round_size(max(count, _MIN_PINNED_SIZE))
+        with self._lock:
+            block = self._take(size)
+            if block is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+                if self.limit is not None and self.bytes_held + size > self.limit:
+                    self._release_cached()
+                    if self.bytes_held + size > self.limit:
+                        raise MemoryError(
+                            f"allocating {size} bytes exceeds pool limit {self.limit}"
+                        )
+                ptr = hip.hipHostMalloc(size, self.flags)
+                block = _Block(ptr.value, size, None)
+            self._acquired[block.ptr] = block
+            self.bytes_in_use += size
+            self.peak_bytes = max(self.peak_bytes, self.bytes_held)
+        return (ctypes.c_char * count).from_address(block.ptr)
+
+    def release(self, buf, stream=None):
+        """
+        Return a buffer to the pool.
+
+        Parameters
+        ----------
+        buf : ctypes.c_char array or buffer
+            Buffer returned by acquire, or a memoryview of it.
+        stream : ctypes pointer, optional
+            Stream the copies using the buffer were queued on. Without a
+            stream the buffer is assumed to be idle already.
+        """
+        address, _, view = hip._host_buffer(buf)
+        if view is not None:
+            view.release()
+        address = _address(address)
+        with self._lock:
+            block = self._acquired.get(address)
+            if block is None:
+                raise ValueError("buffer was not acquired from this pool")
+            if stream is not None:
+                try:
+                    if self._events:
+                        event = self._events.pop()
+                    else:
+                        event = hip.hipEventCreateWithFlags(hip.hipEventDisableTiming)
+                    try:
+                        hip.hipEventRecord(event, stream)
+                    except hip.hipError:
+                        self._events.append(event)
+                        raise
+                except hip.hipError:
+                    # Without an event the buffer cannot be reused safely,
+                    # hipHostFree waits for the device before freeing it
+                    del self._acquired[address]
+                    self.bytes_in_use -= block.size
+                    hip.hipHostFree(block.ptr)
+                    return
+                block.event = event
+            del self._acquired[address]
+            self.bytes_in_use -= block.size
+            self.bytes_cached += block.size
+            self._bins.setdefault(block.size, []).append(block)
+
+    def _take(self, size):
+        blocks = self._bins.get(size)
+        if not blocks:
+            return None
+        for i in range(len(blocks)):
+            block = blocks[i]
+            if block.event is None or hip.hipEventQuery(block.event):
+                del blocks[i]
+                if block.event is not None:
+                    self._events.append(block.event)
+                    block.event = None
+                self.bytes_cached -= block.size
+                return block
+        return None
+
+    def _release_cached(self):
+        for blocks in self._bins.values():
+            for block in blocks:
+                if block.event is not None:
+                    # The host memory must not be freed under a running copy
+                    hip.hipEventSynchronize(block.event)
+                    self._events.append(block.event)
+                hip.hipHostFree(block.ptr)
+            self.bytes_cached -= sum(block.size for block in blocks)
+        self._bins.clear()
+        for event in self._events:
+            hip.hipEventDestroy(event)
+        self._events.clear()
+
+    def empty_cache(self):
+        """
+        Free all idle buffers, acquired buffers are not affected.
+        """
+        with self._lock:
+            self._release_cached()
+
+    def stats(self):
+        """
+        Pool counters.
+
+        Returns
+        -------
+        stats : dict
+            hits, misses, bytes_in_use, bytes_cached, bytes_held and
+            peak_bytes.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "bytes_in_use": self.bytes_in_use,
+                "bytes_cached": self.bytes_cached,
+                "bytes_held": self.bytes_held,
+                "peak_bytes": self.peak_bytes,
+            }
+
+
+class MemPool:
+    """
+    Stream ordered device memory pool.
+
+    Allocations and frees go through hipMallocFromPoolAsync/hipFreeAsync,
+    they are ordered on a stream and never synchronize the host. Freed memory
+    stays in the pool up to the release threshold and is reused by later
+    allocations.
+
+    It can be installed with hip.hipSetAllocator, hipMalloc/hipFree are then
+    ordered on the null stream. free() hands pointers the pool did not
+    allocate, like managed or pitched allocations, to the driver hipFree.
+
+    Parameters
+    ----------
+    device : int, optional
+        Device of the pool, the current device when omitted.
+    release_threshold : int, optional
+        Bytes the pool keeps reserved instead of releasing them at
+        synchronization points.
+    max_size : int, optional
+        Maximum pool size in bytes, where HIP supports it.
+    default : bool, optional
+        Use the default pool of the device instead of creating one. The
+        default pool is not destroyed by destroy().
+
+    Examples
+    --------
+    >>> pool = MemPool(release_threshold=1 << 30)
+    >>> ptr = pool.malloc(size, stream)
+    >>> hip.hipModuleLaunchKernel(kernel, ..., stream, PackageStruct(ptr))
+    >>> pool.free(ptr, stream)
+    """
+
+    def __init__(self, device=None, release_threshold=None, max_size=0, default=False):
+        if device is None:
+            device = hip.hipGetDevice()
+        self.device = device
+        self._owner = not default
+        if default:
+            self.handle = hip.hipDeviceGetDefaultMemPool(device)
+        else:
+            self.handle = hip.hipMemPoolCreate(device, max_size)
+        self._lock = threading.Lock()
+        self._allocated = set()  # addresses handed out by malloc
+        if release_threshold is not None:
+            self.release_threshold = release_threshold
+
+    def malloc(self, count, stream=None):
+        """
+        Allocate device memory ordered on stream.
+
+        Parameters
+        ----------
+        count : int
+            Number of bytes of memory to allocate
+        stream : ctypes pointer, optional
+            Stream the memory is going to be used on.
+
+        Returns
+        -------
+        ptr : ctypes pointer
+            Pointer to allocated device memory.
+        """
+        ptr = hip.hipMallocFromPoolAsync(count, self.handle, stream)
+        with self._lock:
+            self._allocated.add(ptr.value)
+        return ptr
+
+    def free(self, ptr, stream=None):
+        """
+        Free device memory ordered on stream, work enqueued before on stream
+        may still use it.
+
+        Pointers that were not allocated by the pool are freed with hipFree.
+        """
+        address = _address(ptr)
+        with self._lock:
+            owned = address in self._allocated
+            self._allocated.discard(address)
+        if owned:
+            hip.hipFreeAsync(ptr, stream)
+        else:
+            hip._hipFree(ptr)
+
+    @property
+    def release_threshold(self):
+        return hip.hipMemPoolGetAttribute(self.handle, hip.hipMemPoolAttrReleaseThreshold)
+
+    @release_threshold.setter
+    def release_threshold(self, value):
+        hip.hipMemPoolSetAttribute(self.handle, hip.hipMemPoolAttrReleaseThreshold, value)
+
+    def set_reuse(self, follow_event_dependencies=None, allow_opportunistic=None,
+                  allow_internal_dependencies=None):
+        """
+        Set the reuse policies of the pool, None leaves a policy unchanged.
+
+        Parameters
+        ----------
+        follow_event_dependencies : bool, optional
+            Reuse memory freed on another stream the allocating stream
+            already waits on through events.
+        allow_opportunistic : bool, optional
+            Reuse memory whose free has completed on another stream.
+        allow_internal_dependencies : bool, optional
+            Allow the driver to insert dependencies on the stream that freed
+            the memory.
+        """
+        for attribute, value in (
+            (hip.hipMemPoolReuseFollowEventDependencies, follow_event_dependencies),
+            (hip.hipMemPoolReuseAllowOpportunistic, allow_opportunistic),
+            (hip.hipMemPoolReuseAllowInternalDependencies, allow_internal_dependencies),
+        ):
+            if value is not None:
+                hip.hipMemPoolSetAttribute(self.handle, attribute, int(bool(value)))
+
+    def trim(self, min_bytes_to_hold=0):
+        """
+        Release unused memory held by the pool down to min_bytes_to_hold.
+        """
+        hip.hipMemPoolTrimTo(self.handle, min_bytes_to_hold)
+
+    def stats(self):
+        """
+        Pool counters.
+
+        Returns
+        -------
+        stats : dict
+            reserved_bytes, reserved_high, used_bytes and used_high.
+        """
+        return {
+            "reserved_bytes": hip.hipMemPoolGetAttribute(
+                self.handle, hip.hipMemPoolAttrReservedMemCurrent),
+            "reserved_high": hip.hipMemPoolGetAttribute(
+                self.handle, hip.hipMemPoolAttrReservedMemHigh),
+            "used_bytes": hip.hipMemPoolGetAttribute(
+                self.handle, hip.hipMemPoolAttrUsedMemCurrent),
+            "used_high": hip.hipMemPoolGetAttribute(
+                self.handle, hip.hipMemPoolAttrUsedMemHigh),
+        }
+
+    def destroy(self):
+        """
+        Destroy the pool if it was created by this object.
+        """
+        if self._owner and self.handle is not None:
+            hip.hipMemPoolDestroy(self.handle)
+        self.handle = None
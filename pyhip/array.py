@@ -0,0 +1,385 @@
+"""
+Device arrays with shape and dtype
+"""
+
+import ctypes
+
+from . import hip
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, only needed by DeviceArray
+    np = None
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("DeviceArray requires numpy")
+
+
+def _c_strides(shape, itemsize):
+    strides = []
+    stride = itemsize
+    for dim in reversed(shape):
+        strides.append(stride)
+        stride *= dim
+    return tuple(reversed(strides))
+
+
+def _pitched_layout(shape, itemsize, *strides):
+    """
+    Describe a copy between arrays of the same shape as pitched rows.
+
+    Dimensions that are contiguous in all the arrays are merged, what is
+    left has to be at most 3 dimensions with contiguous rows.
+
+    Returns
+    -------
+    layout : tuple or None
+        (width, height, depth, pitches), width is the row size in bytes and
+        pitches holds (pitch, rows per slice) for each strides. None if the
+        arrays cannot be copied with a single hipMemcpy/2D/3D call.
+    """
+    dims = [
+        (dim, tuple(s[axis] for s in strides))
+        for axis, dim in enumerate(shape) if dim != 1
+    ]
+    if not dims:
+        return itemsize, 1, 1, [(itemsize, 1)] * len(strides)
+    merged = [dims[-1]]
+    for dim, dim_strides in reversed(dims[:-1]):
+        inner, inner_strides = merged[0]
+        if all(st == ist * inner for st, ist in zip(dim_strides, inner_strides)):
+            merged[0] = (dim * inner, inner_strides)
+        else:
+            merged.insert(0, (dim, dim_strides))
+    if len(merged) > 3 or any(st != itemsize for st in merged[-1][1]):
+        return None
+    width = merged[-1][0] * itemsize
+    if len(merged) == 1:
+        return width, 1, 1, [(width, 1)] * len(strides)
+    height, pitches = merged[-2]
+    if any(pitch < width for pitch in pitches):
+        return None
+    if len(merged) == 2:
+        return width, height, 1, [(pitch, height) for pitch in pitches]
+    depth, slice_strides = merged[0]
+    layout = []
+    for pitch, slice_stride in zip(pitches, slice_strides):
+        if slice_stride % pitch or slice_stride // pitch < height:
+            return None
+        layout.append((pitch, slice_stride // pitch))
+    return width, height, depth, layout
+
+
+def _copy(dst, dst_strides, src, src_strides, shape, itemsize, kind, stream):
+    """
+    Copy between two arrays of the same shape with one driver call.
+    """
+    layout = _pitched_layout(shape, itemsize, dst_strides, src_strides)
+    if layout is None:
+        raise ValueError("arrays cannot be copied with a single 2D/3D copy")
+    width, height, depth, ((dpitch, dysize), (spitch, sysize)) = layout
+    if height == 1 and depth == 1:
+        if stream is None:
+            status = hip._libhip.hipMemcpy(dst, src, width, kind)
+        else:
+            status = hip._libhip.hipMemcpyAsync(dst, src, width, kind, stream)
+        hip.hipCheckStatus(status)
+    elif depth == 1:
+        if stream is None:
+            hip.hipMemcpy2D(dst, dpitch, src, spitch, width, height, kind)
+        else:
+            hip.hipMemcpy2DAsync(dst, dpitch, src, spitch, width, height, kind, stream)
+    else:
+        params = hip.hipMemcpy3DParms()
+        params.dstPtr = hip.hipPitchedPtr(dst, dpitch, width, dysize)
+        params.srcPtr = hip.hipPitchedPtr(src, spitch, width, sysize)
+        params.extent = hip.hipExtent(width, height, depth)
+        params.kind = kind
+        if stream is None:
+            hip.hipMemcpy3D(params)
+        else:
+            hip.hipMemcpy3DAsync(params, stream)
+
+
+class DeviceArray:
+    """
+    N-dimensional array in device memory.
+
+    Holds a device pointer together with shape, strides (in bytes) and a
+    numpy dtype. Host transfers pass the numpy buffer address straight to
+    hipMemcpy/hipMemcpyAsync, no intermediate ctypes array is built.
+    Slicing returns views sharing the device memory. Strided views whose
+    rows are contiguous, like pitched allocations or tiles of a larger
+    array, are copied with a single hipMemcpy2D/3D call.
+
+    A DeviceArray can be passed directly to the hip functions taking a
+    device pointer, it converts to its ctypes pointer.
+
+    Parameters
+    ----------
+    shape : int or tuple of int
+        Array shape.
+    dtype : numpy dtype or anything numpy.dtype accepts
+        Element type, ctypes types are accepted too.
+    ptr : ctypes pointer, optional
+        Existing device memory, allocated with hip.hipMalloc when omitted.
+    strides : tuple of int, optional
+        Strides in bytes, defaults to C order.
+    base : DeviceArray, optional
+        Array owning the memory when this array is a view.
+    """
+
+    def __init__(self, shape, dtype, ptr=None, strides=None, base=None):
+        _require_numpy()
+        if isinstance(shape, int):
+            shape = (shape,)
+        self.shape = tuple(int(dim) for dim in shape)
+        self.dtype = np.dtype(dtype)
+        self.strides = (
+            tuple(strides) if strides is not None
+            else _c_strides(self.shape, self.dtype.itemsize)
+        )
+        self.base = base
+        if ptr is None:
+            self.ptr = hip.hipMalloc(max(self.nbytes, 1))
+            self._owner = True
+        else:
+            self.ptr = ptr if isinstance(ptr, ctypes.c_void_p) else ctypes.c_void_p(ptr)
+            self._owner = False
+
+    @classmethod
+    def empty(cls, shape, dtype):
+        """
+        Allocate an uninitialized device array.
+        """
+        return cls(shape, dtype)
+
+    @classmethod
+    def from_numpy(cls, array, stream=None):
+        """
+        Copy a numpy array to a new device array.
+
+        Parameters
+        ----------
+        array : numpy.ndarray
+            Host array, copied through a contiguous temporary if it is not
+            C-contiguous.
+        stream : ctypes pointer, optional
+            Copy asynchronously on stream, array must stay alive and
+            unchanged until the copy is complete. Arrays copied through a
+            temporary are copied synchronously, the temporary is gone once
+            from_numpy returns.
+
+        Returns
+        -------
+        device_array : DeviceArray
+        """
+        _require_numpy()
+        contiguous = np.ascontiguousarray(array)
+        device_array = cls(contiguous.shape, contiguous.dtype)
+        if contiguous is not array:
+            stream = None
+        device_array.copy_from_host(contiguous, stream)
+        return device_array
+
+    @classmethod
+    def empty_pitched(cls, shape, dtype):
+        """
+        Allocate an uninitialized 2D or 3D array with driver chosen pitch.
+
+        Rows are padded to the pitch returned by hipMallocPitch/hipMalloc3D,
+        the strides of the array reflect it.
+        """
+        _require_numpy()
+        dtype = np.dtype(dtype)
+        shape = tuple(int(dim) for dim in shape)
+        width = shape[-1] * dtype.itemsize
+        if len(shape) == 2:
+            ptr, pitch = hip.hipMallocPitch(0, shape[0], shape[1], dtype.itemsize)
+            strides = (pitch, dtype.itemsize)
+        elif len(shape) == 3:
+            pitched_ptr = hip.hipMalloc3D(width, shape[1], shape[0])
+            ptr = ctypes.c_void_p(pitched_ptr.ptr)
+            pitch = pitched_ptr.pitch
+            strides = (pitch * shape[1], pitch, dtype.itemsize)
+        else:
+            raise ValueError("pitched arrays must have 2 or 3 dimensions")
+        array = cls(shape, dtype, ptr=ptr, strides=strides)
+        array._owner = True
+        return array
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def size(self):
+        size = 1
+        for dim in self.shape:
+            size *= dim
+        return size
+
+    @property
+    def itemsize(self):
+        return self.dtype.itemsize
+
+    @property
+    def nbytes(self):
+        return self.size * self.dtype.itemsize
+
+    @property
+    def is_contiguous(self):
+        """True if the array is C-contiguous."""
+        if self.size == 0:
+            return True
+        expected = _c_strides(self.shape, self.itemsize)
+        return all(
+            dim == 1 or stride == expected_stride
+            for dim, stride, expected_stride in zip(self.shape, self.strides, expected)
+        )
+
+    @property
+    def _as_parameter_(self):
+        return self.ptr
+
+    def __len__(self):
+        if not self.shape:
+            raise TypeError("len() of unsized object")
+        return self.shape[0]
+
+    def __repr__(self):
+        ptr = "freed" if self.ptr is None else hex(self.ptr.value or 0)
+        return f"DeviceArray(shape={self.shape}, dtype={self.dtype}, ptr={ptr})"
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        if key.count(Ellipsis) > 1:
+            raise IndexError("an index can only have a single ellipsis")
+        if Ellipsis in key:
+            i = key.index(Ellipsis)
+            key = key[:i] + (slice(None),) * (self.ndim - len(key) + 1) + key[i + 1:]
+        if len(key) > self.ndim:
+            raise IndexError(f"too many indices for array of dimension {self.ndim}")
+        key = key + (slice(None),) * (self.ndim - len(key))
+
+        offset = 0
+        shape = []
+        strides = []
+        for index, dim, stride in zip(key, self.shape, self.strides):
+            if isinstance(index, slice):
+                start, stop, step = index.indices(dim)
+                length = len(range(start, stop, step))
+                if length:
+                    offset += start * stride
+                shape.append(length)
+                strides.append(stride * step)
+            else:
+                index = int(index)
+                if index < 0:
+                    index += dim
+                if not 0 <= index < dim:
+                    raise IndexError(f"index {index} is out of bounds for size {dim}")
+                offset += index * stride
+        return DeviceArray(
+            tuple(shape),
+            self.dtype,
+            ptr=self.ptr.value + offset,
+            strides=tuple(strides),
+            base=self if self.base is None else self.base,
+        )
+
+    def _check_host(self, array, writable):
+        if writable and not array.flags.writeable:
+            raise ValueError("host array must be writable")
+        if array.flags.c_contiguous and self.is_contiguous:
+            if array.nbytes != self.nbytes:
+                raise ValueError(
+                    f"host array has {array.nbytes} bytes, device array has {self.nbytes}"
+                )
+        elif array.shape != self.shape or array.dtype.itemsize != self.itemsize:
+            raise ValueError(
+                f"host array of shape {array.shape} does not match device array "
+                f"of shape {self.shape}"
+            )
+
+    def _host_copy(self, array, kind, stream):
+        if array.flags.c_contiguous and self.is_contiguous:
+            shape = (self.nbytes,)
+            host_strides = device_strides = (1,)
+            itemsize = 1
+        else:
+            shape = self.shape
+            host_strides = array.strides
+            device_strides = self.strides
+            itemsize = self.itemsize
+        host = array.ctypes.data
+        if kind == hip.hipMemcpyHostToDevice:
+            _copy(self.ptr, device_strides, host, host_strides, shape, itemsize,
+                  kind, stream)
+        else:
+            _copy(host, host_strides, self.ptr, device_strides, shape, itemsize,
+                  kind, stream)
+
+    def copy_from_host(self, array, stream=None):
+        """
+        Copy a host array into this array.
+
+        Parameters
+        ----------
+        array : numpy.ndarray
+            Host array with the same number of bytes if both arrays are
+            C-contiguous, with the same shape otherwise.
+        stream : ctypes pointer, optional
+            Copy asynchronously on stream.
+        """
+        self._check_host(array, writable=False)
+        self._host_copy(array, hip.hipMemcpyHostToDevice, stream)
+
+    def copy_to_host(self, out=None, stream=None):
+        """
+        Copy this array into a host array.
+
+        Parameters
+        ----------
+        out : numpy.ndarray, optional
+            Writable host array with the same number of bytes if both arrays
+            are C-contiguous, with the same shape otherwise. A C-contiguous
+            array is allocated when omitted.
+        stream : ctypes pointer, optional
+            Copy asynchronously on stream, out is only valid once the stream
+            is synchronized.
+
+        Returns
+        -------
+        out : numpy.ndarray
+        """
+        if out is None:
+            out = np.empty(self.shape, self.dtype)
+        self._check_host(out, writable=True)
+        self._host_copy(out, hip.hipMemcpyDeviceToHost, stream)
+        return out
+
+    def to_numpy(self, stream=None):
+        """
+        Copy this array to a new numpy array.
+        """
+        return self.copy_to_host(stream=stream)
+
+    def free(self):
+        """
+        Free the device memory, only arrays that allocated it can free it.
+        """
+        if not self._owner:
+            raise ValueError("array does not own its memory")
+        if self.ptr is not None:
+            hip.hipFree(self.ptr)
+            self.ptr = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.free()
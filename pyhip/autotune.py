@@ -0,0 +1,367 @@
+"""
+Launch configuration autotuning with a persistent result cache
+
+Examples
+--------
+>>> tuner = Autotuner(source, "axpy")
+>>> grid = lambda config: ((size + config.block[0] - 1) // config.block[0],)
+>>> tuner.tune(grid, (ptr, 2, 3, size), blocks=(64, 128, 256, 512, 1024), size=size)
+>>> tuner.launch(grid, ptr, 2, 3, size, size=size, stream=stream)
+"""
+
+import contextlib
+import hashlib
+import itertools
+import json
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from . import hip, hiprtc
+from .kernel import Kernel, _dims
+
+
+def default_cache_path():
+    """
+    Path of the result cache, PYHIP_AUTOTUNE_CACHE or
+    $XDG_CACHE_HOME/pyhip/autotune.json.
+    """
+    path = os.environ.get("PYHIP_AUTOTUNE_CACHE")
+    if path:
+        return path
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "pyhip", "autotune.json")
+
+
+def size_bucket(size):
+    """
+    Problem size bucket, the next power of two.
+    """
+    return 1 << max(size - 1, 0).bit_length()
+
+
+class Config:
+    """
+    Launch configuration.
+
+    Parameters
+    ----------
+    block : int or tuple of int
+        block dims (x, y, z), missing dims default to 1
+    shared : int, optional
+        shared mem
+    defines : dict, optional
+        Compile-time constants, passed to hiprtc as -Dname=value.
+    ms : float, optional
+        Measured time per launch in milliseconds.
+    """
+
+    __slots__ = ("block", "shared", "defines", "ms")
+
+    def __init__(self, block, shared=0, defines=None, ms=None):
+        self.block = _dims(block)
+        self.shared = shared
+        self.defines = dict(defines or {})
+        self.ms = ms
+
+    def to_dict(self):
+        return {
+            "block": list(self.block),
+            "shared": self.shared,
+            "defines": self.defines,
+            "ms": self.ms,
+        }
+
+    @classmethod
+    def from_dict(cls, entry):
+        return cls(tuple(entry["block"]), entry["shared"], entry["defines"], entry["ms"])
+
+    def __eq__(self, other):
+        if not isinstance(other, Config):
+            return NotImplemented
+        return (self.block, self.shared, self.defines) == (
+            other.block, other.shared, other.defines
+        )
+
+    def __repr__(self):
+        ms = "" if self.ms is None else f", ms={self.ms:.4f}"
+        return f"Config(block={self.block}, shared={self.shared}, defines={self.defines}{ms})"
+
+
+class ResultCache:
+    """
+    JSON file of tuned configurations.
+
+    The file is read once. Writes merge with the current file content and
+    replace it atomically, under an flock of a sidecar .lock file, so
+    processes tuning at the same time can share one cache. Without fcntl
+    only the threads of a process are serialized.
+
+    Parameters
+    ----------
+    path : str, optional
+        Cache file, default_cache_path() by default.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_cache_path()
+        self._lock = threading.Lock()
+        self._entries = None
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            # A corrupt cache is rebuilt by tuning again
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def get(self, key):
+        """
+        Configuration stored under key, None when missing.
+        """
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._read()
+            entry = self._entries.get(key)
+        return None if entry is None else Config.from_dict(entry)
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            yield
+            return
+        with open(f"{self.path}.lock", "a") as lock:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+    def put(self, key, config):
+        """
+        Store a configuration under key and write the file.
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock, self._file_lock():
+            entries = self._read()
+            entries[key] = config.to_dict()
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(entries, f, indent=1, sort_keys=True)
+            os.replace(tmp, self.path)
+            self._entries = entries
+
+
+class Autotuner:
+    """
+    Picks the fastest launch configuration of a kernel.
+
+    Candidates are the combinations of block dims, shared memory sizes
+    and compile-time constants. Each is launched warmup times, then
+    timed with hipEventRecord and hipEventElapsedTime over repeat
+    launches. The best configuration is stored in the ResultCache under
+    the hash of the source, name and options, the gcnArchName of the
+    device and the size_bucket() of the problem size, later processes
+    only look it up.
+
+    Parameters
+    ----------
+    source : str
+        Kernel source.
+    name : str
+        Kernel name.
+    types : str or sequence of ctypes types, optional
+        Argument types, parsed from the signature by default, see Kernel.
+    options : list of str, optional
+        hiprtc options common to all candidates.
+    cache : ResultCache, optional
+        Result cache, the default_cache_path() file by default.
+    warmup : int, optional
+        Untimed launches per candidate.
+    repeat : int, optional
+        Timed launches per candidate.
+    """
+
+    def __init__(self, source, name, types=None, options=None, cache=None, warmup=2,
+                 repeat=10):
+        self.source = source
+        self.name = name
+        self.types = types
+        self.options = list(options or [])
+        self.cache = cache if cache is not None else ResultCache()
+        self.warmup = warmup
+        self.repeat = repeat
+        digest = hashlib.sha256()
+        for part in [name, source] + self.options:
+            digest.update(part.encode())
+            digest.update(b"\0")
+        self.source_hash = digest.hexdigest()
+        self._lock = threading.Lock()
+        self._kernels = {}  # (device, sorted defines) -> Kernel
+        self._arches = {}  # device -> gcnArchName
+        self._best = {}  # cache key -> Config
+
+    def kernel(self, defines=None):
+        """
+        Kernel compiled with the compile-time constants, cached.
+        """
+        defines = dict(defines or {})
+        device = hip.hipGetDevice()
+        key = (device, tuple(sorted(defines.items())))
+        with self._lock:
+            kernel = self._kernels.get(key)
+        if kernel is None:
+            options = self.options + [f"-D{name}={value}" for name, value in key[1]]
+            kernel = Kernel.from_source(self.source, self.name, options, self.types)
+            with self._lock:
+                self._kernels.setdefault(key, kernel)
+                kernel = self._kernels[key]
+        return kernel
+
+    def key(self, size):
+        """
+        Cache key of a problem size on the current device.
+        """
+        device = hip.hipGetDevice()
+        arch = self._arches.get(device)
+        if arch is None:
+            arch = self._arches[device] = hip.hipGetDeviceProperties(device).gcnArchName
+        return f"{self.source_hash}/{arch}/{size_bucket(size)}"
+
+    def lookup(self, size):
+        """
+        Tuned configuration of a problem size, None when not tuned.
+        """
+        key = self.key(size)
+        config = self._best.get(key)
+        if config is None:
+            config = self.cache.get(key)
+            if config is not None:
+                self._best[key] = config
+        return config
+
+    def _time(self, kernel, grid, block, shared, struct, stream, start, end):
+        for _ in range(self.warmup):
+            hip.hipModuleLaunchKernel(
+                kernel.function, *grid, *block, shared, stream, struct
+            )
+        hip.hipEventRecord(start, stream)
+        for _ in range(self.repeat):
+            hip.hipModuleLaunchKernel(
+                kernel.function, *grid, *block, shared, stream, struct
+            )
+        hip.hipEventRecord(end, stream)
+        hip.hipEventSynchronize(end)
+        return hip.hipEventElapsedTime(start, end) / self.repeat
+
+    def tune(self, grid, args, blocks, shared=(0,), defines=(None,), size=0, stream=None,
+             force=False):
+        """
+        Time all candidates and store the fastest.
+
+        The kernel runs warmup + repeat times per candidate on the same
+        arguments, in-place kernels must tolerate it. Candidates whose
+        constants fail to compile or that fail to launch are skipped.
+
+        Parameters
+        ----------
+        grid : callable or tuple of int
+            Grid dims, or a callable taking the candidate Config and
+            returning them.
+        args : tuple
+            Kernel arguments.
+        blocks : sequence of int or tuple of int
+            Candidate block dims.
+        shared : sequence of int, optional
+            Candidate shared mem sizes.
+        defines : sequence of dict, optional
+            Candidate compile-time constants.
+        size : int, optional
+            Problem size, configurations are stored per size_bucket().
+        stream : ctypes pointer, optional
+            stream object
+        force : bool, optional
+            Tune even when the cache has a configuration.
+
+        Returns
+        -------
+        config : Config
+            Fastest configuration, with its time per launch.
+        """
+        key = self.key(size)
+        if not force:
+            config = self.lookup(size)
+            if config is not None:
+                return config
+        best = None
+        error = None
+        start = hip.hipEventCreate()
+        end = hip.hipEventCreate()
+        try:
+            for constants in defines:
+                try:
+                    kernel = self.kernel(constants)
+                except (hiprtc.hiprtcError, hip.hipError) as e:
+                    # Constants the kernel does not compile or load with
+                    error = e
+                    continue
+                struct = kernel.pack(*args)
+                for block, shared_size in itertools.product(blocks, shared):
+                    config = Config(block, shared_size, constants)
+                    dims = _dims(grid(config) if callable(grid) else grid)
+                    try:
+                        config.ms = self._time(
+                            kernel, dims, config.block, shared_size, struct, stream, start,
+                            end,
+                        )
+                    except hip.hipError as e:
+                        # Block too large, out of shared memory or registers
+                        error = e
+                        continue
+                    if best is None or config.ms < best.ms:
+                        best = config
+        finally:
+            hip.hipEventDestroy(start)
+            hip.hipEventDestroy(end)
+        if best is None:
+            raise RuntimeError(f"no candidate configuration of {self.name} launched: {error}")
+        self.cache.put(key, best)
+        self._best[key] = best
+        return best
+
+    def launch(self, grid, *args, size=0, stream=None, default=None):
+        """
+        Launch with the tuned configuration of size.
+
+        Parameters
+        ----------
+        grid : callable or tuple of int
+            Grid dims, or a callable taking the Config and returning them.
+        args :
+            Kernel arguments.
+        size : int, optional
+            Problem size.
+        stream : ctypes pointer, optional
+            stream object
+        default : Config, optional
+            Configuration used when size was not tuned, KeyError is raised
+            without it.
+        """
+        config = self.lookup(size)
+        if config is None:
+            if default is None:
+                raise KeyError(f"{self.name} not tuned for {self.key(size)}")
+            config = default
+        kernel = self.kernel(config.defines)
+        dims = grid(config) if callable(grid) else grid
+        kernel(dims, config.block, *args, stream=stream, shared=config.shared)
@@ -0,0 +1,192 @@
+"""
+Pools of reusable events
+"""
+
+import collections
+import threading
+
+from . import hip
+from .streams import _on_device
+
+_pools_lock = threading.Lock()
+_pools = {}  # device -> EventPool
+
+
+class EventPool:
+    """
+    Pool of recycled events of one device.
+
+    Creating and destroying an event is a driver call each, a pool keeps
+    them instead. Events are created with hipEventDisableTiming by
+    default, the cheapest kind for synchronization. A released event is
+    only handed out again once hipEventQuery reports it complete, so a
+    consumer still waiting on it is never affected.
+
+    The pool grows on demand up to limit events, when the limit is hit
+    acquire() waits for the oldest released event. Completed events
+    beyond max_idle are destroyed.
+
+    Parameters
+    ----------
+    device : int, optional
+        Device of the events, the current device by default.
+    flags : int, optional
+        hipEventCreateWithFlags flags, hipEventDisableTiming by default.
+    blocking : bool, optional
+        Add hipEventBlockingSync, hipEventSynchronize then yields the CPU
+        instead of spinning.
+    initial : int, optional
+        Number of events created up front.
+    max_idle : int, optional
+        Maximum number of idle events kept.
+    limit : int, optional
+        Maximum number of events alive, unlimited by default.
+
+    Examples
+    --------
+    >>> pool = event_pool()
+    >>> event = pool.acquire()
+    >>> hip.hipEventRecord(event, producer)
+    >>> hip.hipStreamWaitEvent(consumer, event)
+    >>> pool.release(event)
+    """
+
+    def __init__(self, device=None, flags=hip.hipEventDisableTiming, blocking=False,
+                 initial=0, max_idle=64, limit=None):
+        if limit is not None and limit < 1:
+            raise ValueError("limit must be at least 1")
+        self.device = hip.hipGetDevice() if device is None else device
+        self.flags = flags | (hip.hipEventBlockingSync if blocking else 0)
+        self.max_idle = max_idle
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._idle = []
+        self._released = collections.deque()  # possibly still pending
+        self.size = 0
+        self.peak_size = 0
+        self.hits = 0
+        self.misses = 0
+        self.destroyed = 0
+        with self._lock:
+            self._idle.extend(self._create() for _ in range(initial))
+
+    def _create(self):
+        with _on_device(self.device):
+            event = hip.hipEventCreateWithFlags(self.flags)
+        self.size += 1
+        self.peak_size = max(self.peak_size, self.size)
+        return event
+
+    def _destroy(self, event):
+        hip.hipEventDestroy(event)
+        self.size -= 1
+        self.destroyed += 1
+
+    def _reclaim(self):
+        # Released events complete roughly in release order
+        while self._released and hip.hipEventQuery(self._released[0]):
+            self._idle.append(self._released.popleft())
+        while len(self._idle) > self.max_idle:
+            self._destroy(self._idle.pop())
+
+    def acquire(self):
+        """
+        Get an event.
+
+        Returns
+        -------
+        event : ctypes pointer
+            Event owned by the pool, give it back with release().
+        """
+        with self._lock:
+            if not self._idle:
+                self._reclaim()
+            if self._idle:
+                self.hits += 1
+                return self._idle.pop()
+            if self.limit is None or self.size < self.limit:
+                self.misses += 1
+                return self._create()
+            if not self._released:
+                raise RuntimeError(f"all {self.limit} events of the pool are in use")
+            self.hits += 1
+            event = self._released.popleft()
+        hip.hipEventSynchronize(event)
+        return event
+
+    def release(self, event):
+        """
+        Return an event, it may still be pending.
+        """
+        with self._lock:
+            self._released.append(event)
+            if len(self._released) > self.max_idle:
+                self._reclaim()
+
+    def trim(self, keep=0):
+        """
+        Destroy completed idle events beyond keep.
+        """
+        with self._lock:
+            self._reclaim()
+            while len(self._idle) > keep:
+                self._destroy(self._idle.pop())
+
+    def stats(self):
+        """
+        Pool counters.
+
+        Returns
+        -------
+        stats : dict
+            size (events alive), idle, released (returned, maybe pending),
+            in_use, peak_size, hits (reuses), misses and destroyed.
+        """
+        with self._lock:
+            idle = len(self._idle)
+            released = len(self._released)
+            return {
+                "size": self.size,
+                "idle": idle,
+                "released": released,
+                "in_use": self.size - idle - released,
+                "peak_size": self.peak_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "destroyed": self.destroyed,
+            }
+
+    def close(self):
+        """
+        Wait for and destroy the events held by the pool, events still
+        acquired are left alone.
+        """
+        with self._lock:
+            for event in self._released:
+                hip.hipEventSynchronize(event)
+            self._idle.extend(self._released)
+            self._released.clear()
+            while self._idle:
+                self._destroy(self._idle.pop())
+
+
+def event_pool(device=None):
+    """
+    Process wide pool of disable-timing events of a device.
+
+    Parameters
+    ----------
+    device : int, optional
+        Device, the current device by default.
+
+    Returns
+    -------
+    pool : EventPool
+    """
+    if device is None:
+        device = hip.hipGetDevice()
+    with _pools_lock:
+        pool = _pools.get(device)
+        if pool is None:
+            pool = _pools[device] = EventPool(device)
+        return pool
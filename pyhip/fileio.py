@@ -0,0 +1,180 @@
+"""
+Loading files into device memory
+"""
+
+import collections
+import ctypes
+import mmap
+import os
+import time
+
+from . import hip
+from .allocator import PinnedBufferPool
+
+
+class FileLoadResult:
+    """
+    Device buffer filled by load_file.
+
+    Attributes
+    ----------
+    ptr : ctypes pointer
+        Device memory holding the file region, free it with hip.hipFree.
+    nbytes : int
+        Size of the region.
+    seconds : float
+        Wall time of the load.
+    registered : bool
+        True if the mapping was registered and copied without staging.
+    """
+
+    def __init__(self, ptr, nbytes, seconds, registered):
+        self.ptr = ptr
+        self.nbytes = nbytes
+        self.seconds = seconds
+        self.registered = registered
+
+    @property
+    def gbps(self):
+        """Achieved throughput in GB/s."""
+        return self.nbytes / self.seconds / 1e9 if self.seconds > 0 else 0.0
+
+    def __repr__(self):
+        return (
+            f"FileLoadResult(nbytes={self.nbytes}, seconds={self.seconds:.3f}, "
+            f"gbps={self.gbps:.2f}, registered={self.registered})"
+        )
+
+
+def _copy_registered(address, delta, nbytes, dst, stream):
+    """
+    Page-lock the whole mapping and copy the region with a single async
+    copy, returns False if the platform refuses to register the mapping.
+    """
+    try:
+        hip.hipHostRegister(address, delta + nbytes, hip.hipHostRegisterReadOnly)
+    except hip.hipError:
+        return False
+    try:
+        hip.hipMemcpyAsync_htod(dst, address + delta, nbytes, stream)
+        hip.hipStreamSynchronize(stream)
+    finally:
+        hip.hipHostUnregister(address)
+    return True
+
+
+def _copy_staged(address, delta, nbytes, dst, stream, window_bytes, depth, pool):
+    """
+    Copy the region at delta in the mapping through depth pinned buffers,
+    reading the next window from the mapping while the previous ones are
+    copied. Windows are page-aligned in the mapping, only the first one
+    starts at delta.
+    """
+    buffers = []
+    events = []
+    inflight = collections.deque()
+    try:
+        buffers.extend(pool.acquire(window_bytes) for _ in range(depth))
+        events.extend(
+            hip.hipEventCreateWithFlags(hip.hipEventDisableTiming) for _ in range(depth)
+        )
+        start = delta - delta % window_bytes
+        for index, window in enumerate(range(start, delta + nbytes, window_bytes)):
+            slot = index % depth
+            if len(inflight) == depth:
+                hip.hipEventSynchronize(events[inflight.popleft()])
+            begin = max(window, delta)
+            count = min(window + window_bytes, delta + nbytes) - begin
+            ctypes.memmove(buffers[slot], address + begin, count)
+            hip.hipMemcpyAsync_htod(dst.value + begin - delta, buffers[slot], count, stream)
+            hip.hipEventRecord(events[slot], stream)
+            inflight.append(slot)
+    finally:
+        hip.hipStreamSynchronize(stream)
+        for event in events:
+            hip.hipEventDestroy(event)
+        for buf in buffers:
+            pool.release(buf)
+
+
+def load_file(path, offset=0, size=None, window_bytes=16 << 20, depth=2,
+              register=False, stream=None, pool=None):
+    """
+    Load a file region into device memory.
+
+    The file is memory mapped and streamed to the device in page-aligned
+    windows through pinned staging buffers, without reading it into Python
+    objects first.
+
+    Parameters
+    ----------
+    path : str
+        File to load.
+    offset : int, optional
+        Start of the region in bytes.
+    size : int, optional
+        Size of the region, defaults to the rest of the file.
+    window_bytes : int, optional
+        Size of each staged copy, rounded up to the page size.
+    depth : int, optional
+        Number of staging buffers in flight.
+    register : bool, optional
+        Try to hipHostRegister the mapping and copy it directly, falls back
+        to staging if the platform does not allow it.
+    stream : ctypes pointer, optional
+        Stream to copy on, a temporary stream is used when omitted.
+    pool : PinnedBufferPool, optional
+        Pool the staging buffers are taken from, lets repeated loads reuse
+        them.
+
+    Returns
+    -------
+    result : FileLoadResult
+        Device pointer, size and achieved throughput.
+    """
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        file_size = os.fstat(f.fileno()).st_size
+        if size is None:
+            size = file_size - offset
+        if offset < 0 or size < 0 or offset + size > file_size:
+            raise ValueError(
+                f"region {offset}:{offset + size} is outside of the file of {file_size} bytes"
+            )
+        dst = hip.hipMalloc(max(size, 1))
+        if size == 0:
+            return FileLoadResult(dst, 0, time.perf_counter() - start, False)
+
+        window_bytes = -(-window_bytes // mmap.PAGESIZE) * mmap.PAGESIZE
+        own_stream = stream is None
+        own_pool = pool is None
+        mapping = view = None
+        try:
+            # mmap offsets must be aligned to the allocation granularity
+            delta = offset % mmap.ALLOCATIONGRANULARITY
+            mapping = mmap.mmap(
+                f.fileno(), size + delta, access=mmap.ACCESS_READ, offset=offset - delta
+            )
+            if hasattr(mapping, "madvise"):
+                mapping.madvise(mmap.MADV_SEQUENTIAL)
+            address, _, view = hip._host_buffer(mapping)
+            if own_stream:
+                stream = hip.hipStreamCreate()
+            if own_pool:
+                pool = PinnedBufferPool()
+            registered = register and _copy_registered(address, delta, size, dst, stream)
+            if not registered:
+                _copy_staged(address, delta, size, dst, stream, window_bytes, depth, pool)
+        except BaseException:
+            hip.hipFree(dst)
+            raise
+        finally:
+            if view is not None:
+                view.release()
+            if mapping is not None:
+                mapping.close()
+            if own_pool and pool is not None:
+                pool.empty_cache()
+            if own_stream and stream is not None:
+                hip.hipStreamDestroy(stream)
+    return FileLoadResult(dst, size, time.perf_counter() - start, registered)
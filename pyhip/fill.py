@@ -0,0 +1,172 @@
+"""
+Typed fills of device memory
+"""
+
+import ctypes
+import threading
+
+from . import hip, hiprtc
+from .allocator import _address
+from .array import DeviceArray
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, ctypes types work without it
+    np = None
+
+_FILL_SOURCE = """
+extern "C" __global__ void pyhip_fill{words}(unsigned long long *dst,
+                                             pattern{words} value, size_t count) {{
+  size_t stride = (size_t)gridDim.x * blockDim.x;
+  for (size_t i = (size_t)blockIdx.x * blockDim.x + threadIdx.x; i < count; i += stride) {{
+    *(pattern{words} *)(dst + i * {words}) = value;
+  }}
+}}
+"""
+
+_FILL_BLOCK = 256
+# Grid stride loop, enough blocks to fill the device without one per element
+_FILL_MAX_GRID = 4096
+
+# (device, words) -> (module, kernel, args type)
+_kernels = {}
+_lock = threading.Lock()
+
+
+def _pattern(value, dtype):
+    """
+    Bytes of value stored as dtype.
+    """
+    if isinstance(dtype, type) and issubclass(dtype, ctypes._SimpleCData):
+        return bytes(dtype(value))
+    if np is None:
+        raise ImportError("fill with a numpy dtype requires numpy, use a ctypes type")
+    return np.array(value, dtype=dtype).tobytes()
+
+
+def _period(pattern):
+    """
+    Smallest of 1, 2 and 4 bytes the pattern repeats with, None if it does
+    not.
+    """
+    for period in (1, 2, 4):
+        if len(pattern) % period == 0 and pattern == pattern[:period] * (len(pattern) // period):
+            return period
+    return None
+
+
+def _fill_kernel(words):
+    """
+    Kernel storing a pattern of words 64-bit words, compiled once per
+    device and pattern size.
+    """
+    device = hip.hipGetDevice()
+    key = (device, words)
+    with _lock:
+        if key not in _kernels:
+            source = (
+                f"struct __attribute__((aligned(8))) pattern{words} "
+                f"{{ unsigned long long w[{words}]; }};\n"
+                + _FILL_SOURCE.format(words=words)
+            )
+            prog = hiprtc.hiprtcCreateProgram(source, f"pyhip_fill{words}", [], [])
+            try:
+                options = []
+                if hip.hipGetPlatformName() == "amd":
+                    arch = hip.hipGetDeviceProperties(device).gcnArchName
+                    options.append(f"--offload-arch={arch}")
+                hiprtc.hiprtcCompileProgram(prog, options)
+                code = hiprtc.hiprtcGetCode(prog)
+            finally:
+                hiprtc.hiprtcDestroyProgram(prog)
+            module = hip.hipModuleLoadData(code)
+            kernel = hip.hipModuleGetFunction(module, f"pyhip_fill{words}")
+
+            class FillArgs(ctypes.Structure):
+                _fields_ = [
+                    ("dst", ctypes.c_void_p),
+                    ("value", ctypes.c_uint64 * words),
+                    ("count", ctypes.c_size_t),
+                ]
+
+            _kernels[key] = (module, kernel, FillArgs)
+        return _kernels[key]
+
+
+def fill(buffer, value, dtype=None, stream=None, count=None):
+    """
+    Fill device memory with a typed value, asynchronously on stream.
+
+    The widest of hipMemsetD32Async, hipMemsetD16Async and hipMemsetD8Async
+    the byte pattern of value allows is used, so zeros and any 8, 16 or
+    32-bit value (float32 included) are native memsets. Patterns that do
+    not repeat every 4 bytes, like float64 or int64 values, are stored by a
+    generated kernel, compiled with hiprtc on first use and cached per
+    device. The host never waits for the fill, except for the one time
+    kernel compilation.
+
+    Parameters
+    ----------
+    buffer : DeviceArray or ctypes pointer
+        Device memory to fill, a DeviceArray must be contiguous.
+    value : int or float
+        Value to store in every element.
+    dtype : ctypes type or numpy dtype, optional
+        Element type, defaults to the dtype of a DeviceArray.
+    stream : ctypes pointer, optional
+        Stream on which the fill is enqueued, the null stream by default.
+    count : int, optional
+        Number of elements to fill, defaults to the size of a DeviceArray.
+
+    Examples
+    --------
+    >>> fill(accumulators, 0.0, stream=stream)
+    >>> fill(ptr, 1.5, ctypes.c_double, stream, count=n)
+    """
+    if isinstance(buffer, DeviceArray):
+        if not buffer.is_contiguous:
+            raise ValueError("fill requires a contiguous array")
+        if dtype is None:
+            dtype = buffer.dtype
+        if count is None:
+            count = buffer.size
+        elif count > buffer.size:
+            raise ValueError(f"count {count} exceeds array size {buffer.size}")
+        buffer = buffer.ptr
+    elif dtype is None or count is None:
+        raise ValueError("dtype and count are required for device pointers")
+    pattern = _pattern(value, dtype)
+    if count == 0:
+        return
+    nbytes = len(pattern) * count
+    address = _address(buffer)
+    period = _period(pattern)
+
+    if period is not None:
+        # Widen the pattern as far as size and alignment allow
+        for width in (4, 2, 1):
+            if width >= period and nbytes % width == 0 and address % width == 0:
+                break
+        else:
+            raise ValueError(f"address {address:#x} is not aligned to {period} bytes")
+        word = pattern[:period] * (width // period)
+        if width == 4:
+            value = ctypes.c_int.from_buffer_copy(word).value
+            hip.hipMemsetD32Async(buffer, value, nbytes // 4, stream)
+        elif width == 2:
+            value = ctypes.c_ushort.from_buffer_copy(word).value
+            hip.hipMemsetD16Async(buffer, value, nbytes // 2, stream)
+        else:
+            hip.hipMemsetD8Async(buffer, word[0], nbytes, stream)
+        return
+
+    if len(pattern) % 8 or address % 8:
+        raise ValueError(
+            f"{len(pattern)}-byte pattern at {address:#x} cannot be filled, the "
+            "fill kernel needs 8-byte multiple elements at an 8-byte aligned address"
+        )
+    words = len(pattern) // 8
+    _, kernel, args_type = _fill_kernel(words)
+    args = args_type(address, (ctypes.c_uint64 * words).from_buffer_copy(pattern), count)
+    grid = min((count + _FILL_BLOCK - 1) // _FILL_BLOCK, _FILL_MAX_GRID)
+    hip.hipModuleLaunchKernel(kernel, grid, 1, 1, _FILL_BLOCK, 1, 1, 0, stream, args)
@@ -0,0 +1,231 @@
+"""
+concurrent.futures variants of the asynchronous hip operations
+"""
+
+import concurrent.futures
+import sys
+import threading
+import traceback
+
+from . import hip
+from .events import event_pool
+
+# Poll interval bounds in seconds, see _CompletionThread
+_MIN_INTERVAL = 50e-6
+_MAX_INTERVAL = 2e-3
+
+
+class _Pending:
+    __slots__ = ("pool", "event", "future", "result", "keep")
+
+    def __init__(self, pool, event, future, result, keep):
+        self.pool = pool
+        self.event = event
+        self.future = future
+        self.result = result
+        self.keep = keep
+
+
+class _CompletionThread:
+    """
+    Background thread resolving the futures of all outstanding events.
+
+    Events are polled with hipEventQuery. The interval starts at
+    _MIN_INTERVAL, doubles up to _MAX_INTERVAL while nothing completes and
+    drops back when something does, a new submission wakes the thread
+    immediately. The thread sleeps on a condition while nothing is
+    pending.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._incoming = []
+        self._watching = []  # only touched by the thread
+        self._thread = None
+
+    def add(self, pending):
+        with self._cond:
+            self._incoming.append(pending)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="pyhip-completion", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self):
+        try:
+            self._poll()
+        finally:
+            # Should polling itself fail, a new thread takes over the
+            # outstanding futures
+            with self._cond:
+                self._thread = None
+                if self._incoming or self._watching:
+                    self._thread = threading.Thread(
+                        target=self._run, name="pyhip-completion", daemon=True
+                    )
+                    self._thread.start()
+
+    def _poll(self):
+        interval = _MIN_INTERVAL
+        while True:
+            with self._cond:
+                if not self._incoming:
+                    if self._watching:
+                        self._cond.wait(interval)
+                    else:
+                        self._cond.wait()
+                if self._incoming:
+                    self._watching.extend(self._incoming)
+                    self._incoming = []
+                    interval = _MIN_INTERVAL
+            watching = self._watching
+            still = []
+            for pending in watching:
+                try:
+                    ready = hip.hipEventQuery(pending.event)
+                except hip.hipError as e:
+                    self._finish(pending, exception=e)
+                    continue
+                if ready:
+                    self._finish(pending)
+                else:
+                    still.append(pending)
+            if len(still) < len(watching):
+                interval = _MIN_INTERVAL
+            else:
+                interval = min(interval * 2, _MAX_INTERVAL)
+            self._watching = still
+
+    @staticmethod
+    def _finish(pending, exception=None):
+        # A failure resolving one future must not stop the thread, the
+        # other futures would never complete
+        try:
+            pending.pool.release(pending.event)
+        except Exception as e:
+            _report_exception(e)
+        try:
+            if exception is not None:
+                pending.future.set_exception(exception)
+            else:
+                pending.future.set_result(pending.result)
+        except Exception as e:
+            _report_exception(e)
+
+
+def _report_exception(exc):
+    print("pyhip: exception in completion thread", file=sys.stderr)
+    traceback.print_exception(type(exc), exc, exc.__traceback__, file=sys.stderr)
+
+
+_completion = _CompletionThread()
+
+
+def record(stream=None, result=None, keep=None):
+    """
+    Future resolved when the work enqueued on stream so far completes.
+
+    A disable-timing event from the event_pool() is recorded on stream
+    and watched by the completion thread. Future callbacks run on the
+    completion thread. GPU work cannot be cancelled, cancel() on the
+    future returns False.
+
+    Parameters
+    ----------
+    stream : ctypes pointer, optional
+        Stream to watch.
+    result : optional
+        Result of the future.
+    keep : optional
+        Objects kept alive until the work completes, like host buffers of
+        asynchronous copies.
+
+    Returns
+    -------
+    future : concurrent.futures.Future
+    """
+    pool = event_pool()
+    event = pool.acquire()
+    try:
+        hip.hipEventRecord(event, stream)
+    except hip.hipError:
+        pool.release(event)
+        raise
+    future = concurrent.futures.Future()
+    future.set_running_or_notify_cancel()
+    _completion.add(_Pending(pool, event, future, result, keep))
+    return future
+
+
+def memcpy_htod(dst, src, count=None, stream=None):
+    """
+    hipMemcpyAsync_htod returning a future resolving to dst.
+
+    src is kept alive until the copy completes.
+    """
+    hip.hipMemcpyAsync_htod(dst, src, count, stream)
+    return record(stream, dst, src)
+
+
+def memcpy_dtoh(dst, src, count=None, stream=None):
+    """
+    hipMemcpyAsync_dtoh returning a future resolving to dst.
+
+    dst is valid once the future is done.
+    """
+    hip.hipMemcpyAsync_dtoh(dst, src, count, stream)
+    return record(stream, dst)
+
+
+def memcpy(dst, src, count=None, direction=hip.hipMemcpyDefault, stream=None):
+    """
+    hipMemcpyAsync returning a future resolving to dst.
+
+    src is kept alive until the copy completes.
+    """
+    hip.hipMemcpyAsync(dst, src, count, direction, stream)
+    return record(stream, dst, src)
+
+
+def memset(dst, value, sizeBytes=None, stream=None):
+    """
+    hipMemsetAsync returning a future resolving to dst.
+    """
+    hip.hipMemsetAsync(dst, value, sizeBytes, stream)
+    return record(stream, dst)
+
+
+def launch(kernel, grid, block, struct, shared=0, stream=None, result=None):
+    """
+    hipModuleLaunchKernel returning a future resolving to result.
+
+    Parameters
+    ----------
+    kernel : ctypes ptr
+        kernel from loaded module
+    grid : tuple of int
+        grid dims (x, y, z), missing dims default to 1
+    block : tuple of int
+        block dims (x, y, z), missing dims default to 1
+    struct : ctypes structure
+        struct of packed up arguments of kernel
+    shared : int, optional
+        shared mem
+    stream : ctype void ptr, optional
+        stream object
+    result : optional
+        Result of the future, typically the output buffer.
+
+    Examples
+    --------
+    >>> futures = [launch(kernel, (blocks,), (256,), args, stream=s, result=out)
+    ...            for args, out in jobs]
+    >>> for future in concurrent.futures.as_completed(futures):
+    ...     consume(future.result())
+    """
+    grid = tuple(grid) + (1,) * (3 - len(grid))
+    block = tuple(block) + (1,) * (3 - len(block))
+    hip.hipModuleLaunchKernel(kernel, *grid, *block, shared, stream, struct)
+    return record(stream, result)
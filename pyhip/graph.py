@@ -0,0 +1,185 @@
+"""
+Stream capture into replayable HIP graphs
+"""
+
+import ctypes
+import heapq
+
+from . import hip
+
+
+class CapturedGraph:
+    """
+    Work captured from a stream into an executable graph.
+
+    Used as a context manager, every pyhip call enqueued on stream inside
+    the block (kernel launches, async copies, memsets, ...) is recorded
+    instead of executed. On exit the graph is instantiated, launch()
+    replays the whole sequence with a single driver call.
+
+    Kernel launches become kernel nodes. They are indexed in dependency
+    order, which is the capture order for work captured on one stream,
+    work forked to other streams is ordered after what it waits on. Their
+    arguments are copied at capture time, set_kernel_args() changes them
+    for the following launches.
+
+    Parameters
+    ----------
+    stream : ctypes pointer
+        Stream to capture, it cannot be the null stream.
+    mode : int, optional
+        Capture mode, hip.hipStreamCaptureModeGlobal by default.
+
+    Examples
+    --------
+    >>> with CapturedGraph(stream) as graph:
+    ...     for step in steps:
+    ...         hip.hipModuleLaunchKernel(kernel, ..., stream, step.args)
+    >>> for batch in batches:
+    ...     graph.set_kernel_args(0, FirstArgs(batch.ptr, batch.size))
+    ...     graph.launch()
+    >>> graph.close()
+    """
+
+    def __init__(self, stream, mode=hip.hipStreamCaptureModeGlobal):
+        if stream is None or getattr(stream, "value", stream) in (None, 0):
+            raise ValueError("the null stream cannot be captured")
+        self.stream = stream
+        self.mode = mode
+        self.graph = None
+        self.graph_exec = None
+        self.kernel_nodes = []
+        self._kernel_params = []
+        self._updates = {}  # kernel node index -> objects the params point to
+
+    def __enter__(self):
+        if self.graph is not None:
+            raise RuntimeError("graph was already captured")
+        hip.hipStreamBeginCapture(self.stream, self.mode)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Capture has to end even if the block failed
+        graph = hip.hipStreamEndCapture(self.stream)
+        if exc_type is not None:
+            hip.hipGraphDestroy(graph)
+            return
+        self.graph = graph
+        try:
+            self.graph_exec = hip.hipGraphInstantiate(graph)
+            # hipGraphGetNodes does not guarantee capture order
+            nodes = {node.value: node for node in hip.hipGraphGetNodes(graph)}
+            dependencies = {
+                address: [dependency.value for dependency in
+                          hip.hipGraphNodeGetDependencies(node)]
+                for address, node in nodes.items()
+            }
+            for address in _topological_order(list(nodes), dependencies):
+                node = nodes[address]
+                if hip.hipGraphNodeGetType(node) == hip.hipGraphNodeTypeKernel:
+                    self.kernel_nodes.append(node)
+                    self._kernel_params.append(hip.hipGraphKernelNodeGetParams(node))
+        except hip.hipError:
+            self.close()
+            raise
+
+    def launch(self, stream=None):
+        """
+        Replay the captured work.
+
+        Parameters
+        ----------
+        stream : ctypes pointer, optional
+            Stream to launch on, the captured stream by default.
+        """
+        if self.graph_exec is None:
+            raise RuntimeError("graph is not captured")
+        hip.hipGraphLaunch(self.graph_exec, self.stream if stream is None else stream)
+
+    def set_kernel_args(self, index, struct, grid=None, block=None, shared=None):
+        """
+        Change the arguments of a captured kernel launch.
+
+        Launches already enqueued are not affected.
+
+        Parameters
+        ----------
+        index : int
+            Index of the kernel launch in dependency order, see
+            CapturedGraph.
+        struct : ctypes structure
+            struct of packed up arguments of kernel
+        grid : tuple of int, optional
+            New grid dims (x, y, z), missing dims default to 1.
+        block : tuple of int, optional
+            New block dims (x, y, z), missing dims default to 1.
+        shared : int, optional
+            New shared mem.
+        """
+        if self.graph_exec is None:
+            raise RuntimeError("graph is not captured")
+        base = self._kernel_params[index]
+        params = hip.hipKernelNodeParams.from_buffer_copy(base)
+        if grid is not None:
+            params.gridDim = hip.dim3(*_dims(grid))
+        if block is not None:
+            params.blockDim = hip.dim3(*_dims(block))
+        if shared is not None:
+            params.sharedMemBytes = shared
+        size = ctypes.c_size_t(ctypes.sizeof(struct))
+        config = (ctypes.c_void_p * 5)(
+            hip.HIP_LAUNCH_PARAM_BUFFER_POINTER,
+            ctypes.addressof(struct),
+            hip.HIP_LAUNCH_PARAM_BUFFER_SIZE,
+            ctypes.addressof(size),
+            hip.hipLaunchParamEnd(),
+        )
+        params.kernelParams = None
+        params.extra = config
+        hip.hipGraphExecKernelNodeSetParams(self.graph_exec, self.kernel_nodes[index], params)
+        self._updates[index] = (struct, size, config)
+
+    def close(self):
+        """
+        Destroy the executable graph and the graph.
+        """
+        if self.graph_exec is not None:
+            hip.hipGraphExecDestroy(self.graph_exec)
+            self.graph_exec = None
+        if self.graph is not None:
+            hip.hipGraphDestroy(self.graph)
+            self.graph = None
+        self.kernel_nodes = []
+        self._kernel_params = []
+        self._updates.clear()
+
+
+def _dims(dims):
+    dims = tuple(dims)
+    if not 1 <= len(dims) <= 3:
+        raise ValueError(f"expected 1 to 3 dims, got {dims}")
+    return dims + (1,) * (3 - len(dims))
+
+
+def _topological_order(nodes, dependencies):
+    """
+    Nodes ordered after their dependencies, independent nodes keep their
+    order in nodes.
+    """
+    position = {node: i for i, node in enumerate(nodes)}
+    waiting = {node: len(dependencies[node]) for node in nodes}
+    dependents = {node: [] for node in nodes}
+    for node in nodes:
+        for dependency in dependencies[node]:
+            dependents[dependency].append(node)
+    ready = [position[node] for node in nodes if not waiting[node]]
+    heapq.heapify(ready)
+    order = []
+    while ready:
+        node = nodes[heapq.heappop(ready)]
+        order.append(node)
+        for dependent in dependents[node]:
+            waiting[dependent] -= 1
+            if not waiting[dependent]:
+                heapq.heappush(ready, position[dependent])
+    return order
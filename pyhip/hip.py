@@ -3,38 +3,31 @@ Python interface to hip library
 """
 
 import ctypes
+import itertools
 import sys
+import threading
 
-_libhip = None
-_hip_platform_name = ""
+from ._loader import LazyLibrary
 
-# Try to find amd hip library, if not found, fallback to nvhip library
-if "linux" in sys.platform:
-    try:
-        _libhip_libname = "libamdhip64.so"
-        _libhip = ctypes.cdll.LoadLibrary(_libhip_libname)
-        _hip_platform_name = "amd"
-    except:
-        try:
-            _libhip_libname = "libnvhip64.so"
-            _libhip = ctypes.cdll.LoadLibrary(_libhip_libname)
-            _hip_platform_name = "nvidia"
-        except:
-            raise RuntimeError(
-                "cant find libamdhip64.so or libnvhip64.so. make sure LD_LIBRARY_PATH is set"
-            )
-elif "win" in sys.platform:
-    try:
-        _libhip_libname = "amdhip64"
-        _libhip = ctypes.cdll.LoadLibrary(_libhip_libname)
-        _hip_platform_name = "amd"
-    except:
-        raise RuntimeError("error loading hip on windows")
-else:
-    raise RuntimeError("Only linux/windows is supported")
 
-if _libhip is None:
-    raise OSError("hip (libamdhip64.so or libnvhip64.so) library not found")
+def _libhip_candidates():
+    # Try to find amd hip library, if not found, fallback to nvhip library
+    if "linux" in sys.platform:
+        return [("libamdhip64.so", "amd"), ("libnvhip64.so", "nvidia")]
+    elif "win" in sys.platform:
+        return [("amdhip64", "amd")]
+    else:
+        raise RuntimeError("Only linux/windows is supported")
+
+
+# The library is opened and each function bound on first call, the
+# restype/argtypes declarations below only record the signatures.
+# Set PYHIP_LIBHIP_PATH or call pyhip.load(path=...) to pick the library.
+_libhip = LazyLibrary(
+    "PYHIP_LIBHIP_PATH",
+    _libhip_candidates,
+    "cant find libamdhip64.so or libnvhip64.so. make sure LD_LIBRARY_PATH is set",
+)
 
 
 def POINTER(obj):
@@ -235,6 +228,170 @@ def hipStreamCreate():
     return ptr
 
 
+# Stream creation flags
+hipStreamDefault = 0
+hipStreamNonBlocking = 1
+
+_libhip.hipStreamCreateWithFlags.restype = int
+_libhip.hipStreamCreateWithFlags.argtypes = [
+    ctypes.POINTER(ctypes.c_void_p),
+    ctypes.c_uint,
+]  # flags
+
+
+def hipStreamCreateWithFlags(flags):
+    """
+    Create an asynchronous stream with the specified flags.
+
+    Parameters
+    ----------
+    flags : int
+        hipStreamDefault, or hipStreamNonBlocking for a stream that does
+        not synchronize with the null stream.
+
+    Returns
+    -------
+    ptr : ctypes pointer
+        Valid pointer to stream object.
+    """
+    ptr = ctypes.c_void_p()
+    status = _libhip.hipStreamCreateWithFlags(ctypes.byref(ptr), flags)
+    hipCheckStatus(status)
+    return ptr
+
+
+_libhip.hipStreamCreateWithPriority.restype = int
+_libhip.hipStreamCreateWithPriority.argtypes = [
+    ctypes.POINTER(ctypes.c_void_p),
+    ctypes.c_uint,  # flags
+    ctypes.c_int,
+]  # priority
+
+
+def hipStreamCreateWithPriority(flags, priority):
+    """
+    Create an asynchronous stream with the specified flags and priority.
+
+    Parameters
+    ----------
+    flags : int
+        hipStreamDefault or hipStreamNonBlocking.
+    priority : int
+        Stream priority, lower numbers are higher priorities. Values
+        outside hipDeviceGetStreamPriorityRange are clamped.
+
+    Returns
+    -------
+    ptr : ctypes pointer
+        Valid pointer to stream object.
+    """
+    ptr = ctypes.c_void_p()
+    status = _libhip.hipStreamCreateWithPriority(ctypes.byref(ptr), flags, priority)
+    hipCheckStatus(status)
+    return ptr
+
+
+_libhip.hipDeviceGetStreamPriorityRange.restype = int
+_libhip.hipDeviceGetStreamPriorityRange.argtypes = [
+    ctypes.POINTER(ctypes.c_int),  # least priority
+    ctypes.POINTER(ctypes.c_int),
+]  # greatest priority
+
+
+def hipDeviceGetStreamPriorityRange():
+    """
+    Get the stream priority range of the current device.
+
+    Returns
+    -------
+    leastPriority : int
+        Lowest priority, the numerically largest value.
+    greatestPriority : int
+        Highest priority, the numerically smallest value.
+    """
+    least = ctypes.c_int()
+    greatest = ctypes.c_int()
+    status = _libhip.hipDeviceGetStreamPriorityRange(
+        ctypes.byref(least), ctypes.byref(greatest)
+    )
+    hipCheckStatus(status)
+    return least.value, greatest.value
+
+
+_libhip.hipStreamGetPriority.restype = int
+_libhip.hipStreamGetPriority.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_int)]
+
+
+def hipStreamGetPriority(stream):
+    """
+    Get the priority of a stream.
+
+    Parameters
+    ----------
+    stream : ctypes pointer
+        Stream to query.
+
+    Returns
+    -------
+    priority : int
+    """
+    priority = ctypes.c_int()
+    status = _libhip.hipStreamGetPriority(stream, ctypes.byref(priority))
+    hipCheckStatus(status)
+    return priority.value
+
+
+_libhip.hipStreamGetFlags.restype = int
+_libhip.hipStreamGetFlags.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_uint)]
+
+
+def hipStreamGetFlags(stream):
+    """
+    Get the flags of a stream.
+
+    Parameters
+    ----------
+    stream : ctypes pointer
+        Stream to query.
+
+    Returns
+    -------
+    flags : int
+    """
+    flags = ctypes.c_uint()
+    status = _libhip.hipStreamGetFlags(stream, ctypes.byref(flags))
+    hipCheckStatus(status)
+    return flags.value
+
+
+_libhip.hipStreamWaitEvent.restype = int
+_libhip.hipStreamWaitEvent.argtypes = [
+    ctypes.c_void_p,  # stream
+    ctypes.c_void_p,  # event
+    ctypes.c_uint,
+]  # flags
+
+
+def hipStreamWaitEvent(stream, event, flags=0):
+    """
+    Make a stream wait for an event.
+
+    Work enqueued on stream after this call does not start before event
+    completes. The host does not wait.
+
+    Parameters
+    ----------
+    stream : ctypes pointer
+        Stream that waits, None for the null stream.
+    event : ctypes pointer
+        Recorded event to wait for.
+    flags : int, optional
+        Must be 0.
+    """
+    status = _libhip.hipStreamWaitEvent(stream, event, flags)
+    hipCheckStatus(status)
+
+
 _libhip.hipStreamDestroy.restype = int
 _libhip.hipStreamDestroy.argtypes = [ctypes.c_void_p]
 
@@ -284,6 +441,159 @@ def hipStreamSynchronize(ptr):
     hipCheckStatus(status)
 
 
+# Host callbacks
+
+# The driver only gets the two trampolines below, which live as long as the
+# module, and an integer key. The Python callable stays in _callbacks until
+# it fires.
+_callbacks = {}  # key -> (fn, args, executor)
+_callback_keys = itertools.count(1)
+_callback_lock = threading.Lock()
+_callback_executor = None
+
+
+def _default_callback_executor():
+    global _callback_executor
+    with _callback_lock:
+        if _callback_executor is None:
+            # Imported here, it is costly and most programs never need it
+            import concurrent.futures
+
+            # One worker keeps the callbacks in the order they fired
+            _callback_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="pyhip-callback"
+            )
+        return _callback_executor
+
+
+def _report_callback_exception(exc):
+    import traceback
+
+    print("pyhip: exception in host callback", file=sys.stderr)
+    traceback.print_exception(type(exc), exc, exc.__traceback__, file=sys.stderr)
+
+
+def _report_callback_future(future):
+    exc = future.exception()
+    if exc is not None:
+        _report_callback_exception(exc)
+
+
+def _register_callback(fn, args, executor):
+    key = next(_callback_keys)
+    with _callback_lock:
+        _callbacks[key] = (fn, args, executor)
+    return key
+
+
+def _dispatch_callback(key, *extra):
+    with _callback_lock:
+        entry = _callbacks.pop(key, None)
+    if entry is None:
+        return
+    fn, args, executor = entry
+    try:
+        if executor is False:
+            fn(*extra, *args)
+            return
+        if executor is None:
+            executor = _default_callback_executor()
+        executor.submit(fn, *extra, *args).add_done_callback(_report_callback_future)
+    except BaseException as e:
+        _report_callback_exception(e)
+
+
+hipHostFn_t = ctypes.CFUNCTYPE(None, ctypes.c_void_p)
+hipStreamCallback_t = ctypes.CFUNCTYPE(None, ctypes.c_void_p, ctypes.c_int, ctypes.c_void_p)
+
+
+@hipHostFn_t
+def _host_fn_trampoline(user_data):
+    _dispatch_callback(user_data)
+
+
+@hipStreamCallback_t
+def _stream_callback_trampoline(stream, status, user_data):
+    _dispatch_callback(user_data, ctypes.c_void_p(stream), status)
+
+
+_libhip.hipLaunchHostFunc.restype = int
+_libhip.hipLaunchHostFunc.argtypes = [
+    ctypes.c_void_p,  # stream
+    hipHostFn_t,
+    ctypes.c_void_p,
+]  # user data
+
+
+def hipLaunchHostFunc(stream, fn, *args, executor=None):
+    """
+    Call fn(*args) once the work enqueued on stream before it completes.
+
+    Work enqueued on stream after the call waits for the driver to run the
+    callback. The driver thread only hands fn to executor, so it is never
+    held up by fn, and fn may call hip functions, which is not allowed in
+    the driver callback itself. Exceptions raised by fn are reported on
+    stderr.
+
+    Parameters
+    ----------
+    stream : ctypes pointer
+        Stream to enqueue the callback on.
+    fn : callable
+        Host function, kept alive until it runs.
+    args :
+        Arguments of fn.
+    executor : concurrent.futures.Executor or False, optional
+        Executor fn is submitted to, a single thread executor keeping the
+        callbacks in order by default. False calls fn on the driver thread,
+        it must then be short and must not call hip functions.
+    """
+    key = _register_callback(fn, args, executor)
+    status = _libhip.hipLaunchHostFunc(stream, _host_fn_trampoline, key)
+    if status != 0:
+        with _callback_lock:
+            _callbacks.pop(key, None)
+    hipCheckStatus(status)
+
+
+_libhip.hipStreamAddCallback.restype = int
+_libhip.hipStreamAddCallback.argtypes = [
+    ctypes.c_void_p,  # stream
+    hipStreamCallback_t,
+    ctypes.c_void_p,  # user data
+    ctypes.c_uint,
+]  # flags
+
+
+def hipStreamAddCallback(stream, callback, *args, flags=0, executor=None):
+    """
+    Call callback(stream, status, *args) once the work enqueued on stream
+    before it completes.
+
+    status is the hip error code of the stream work, 0 on success. The
+    callable is handled like in hipLaunchHostFunc.
+
+    Parameters
+    ----------
+    stream : ctypes pointer
+        Stream to enqueue the callback on.
+    callback : callable
+        Stream callback, kept alive until it runs.
+    args :
+        Extra arguments of callback.
+    flags : int, optional
+        Must be 0.
+    executor : concurrent.futures.Executor or False, optional
+        See hipLaunchHostFunc.
+    """
+    key = _register_callback(callback, args, executor)
+    status = _libhip.hipStreamAddCallback(stream, _stream_callback_trampoline, key, flags)
+    if status != 0:
+        with _callback_lock:
+            _callbacks.pop(key, None)
+    hipCheckStatus(status)
+
+
 # Event management
 
 
@@ -479,267 +789,1630 @@ def hipEventQuery(event):
         hipCheckStatus(status)
 
 
-# Memory allocation functions (adapted from pystream):
-_libhip.hipMalloc.restype = int
-_libhip.hipMalloc.argtypes = [ctypes.POINTER(ctypes.c_void_p), ctypes.c_size_t]
+# Inter-process communication
 
+hipIpcMemLazyEnablePeerAccess = 1
 
-def hipMalloc(count, ctype=None):
+_HIP_IPC_HANDLE_SIZE = 64
+
+
+class _IpcHandle(ctypes.Structure):
+    """
+    Opaque IPC handle, pickled as its bytes so it can be sent to another
+    process.
     """
-    Allocate device memory.
 
-    Allocate memory on the device associated with the current active
-    context.
+    _fields_ = [("reserved", ctypes.c_char * _HIP_IPC_HANDLE_SIZE)]
 
-    Parameters
-    ----------
-    count : int
-        Number of bytes of memory to allocate
-    ctype : _ctypes.SimpleType, optional
-        ctypes type to cast returned pointer.
+    def __reduce__(self):
+        return type(self).from_buffer_copy, (bytes(self),)
 
-    Returns
-    -------
-    ptr : ctypes pointer
-        Pointer to allocated device memory.
+    def __eq__(self, other):
+        return type(self) is type(other) and bytes(self) == bytes(other)
 
-    """
+    def __hash__(self):
+        return hash(bytes(self))
 
-    ptr = ctypes.c_void_p()
-    status = _libhip.hipMalloc(ctypes.byref(ptr), count)
-    hipCheckStatus(status)
-    if ctype is not None:
-        ptr = ctypes.cast(ptr, ctypes.POINTER(ctype))
-    return ptr
 
+class hipIpcMemHandle(_IpcHandle):
+    """hipIpcMemHandle_t"""
 
-_libhip.hipFree.restype = int
-_libhip.hipFree.argtypes = [ctypes.c_void_p]
 
+class hipIpcEventHandle(_IpcHandle):
+    """hipIpcEventHandle_t"""
 
-def hipFree(ptr):
-    """
-    Free device memory.
 
-    Free allocated memory on the device associated with the current active
-    context.
+_libhip.hipIpcGetMemHandle.restype = int
+_libhip.hipIpcGetMemHandle.argtypes = [
+    ctypes.POINTER(hipIpcMemHandle),
+    ctypes.c_void_p,
+]  # device ptr
+
+
+def hipIpcGetMemHandle(devPtr):
+    """
+    Get an inter-process handle of a device allocation.
 
     Parameters
     ----------
-    ptr : ctypes pointer
-        Pointer to allocated device memory.
+    devPtr : ctypes pointer
+        Base pointer of an allocation made with hipMalloc.
 
+    Returns
+    -------
+    handle : hipIpcMemHandle
+        Picklable handle, opened in another process with
+        hipIpcOpenMemHandle.
     """
-
-    status = _libhip.hipFree(ptr)
+    handle = hipIpcMemHandle()
+    status = _libhip.hipIpcGetMemHandle(ctypes.byref(handle), devPtr)
     hipCheckStatus(status)
+    return handle
 
 
-_libhip.hipMallocPitch.restype = int
-_libhip.hipMallocPitch.argtypes = [
+_libhip.hipIpcOpenMemHandle.restype = int
+_libhip.hipIpcOpenMemHandle.argtypes = [
     ctypes.POINTER(ctypes.c_void_p),
-    ctypes.POINTER(ctypes.c_size_t),
-    ctypes.c_size_t,
-    ctypes.c_size_t,
-]
+    hipIpcMemHandle,  # passed by value
+    ctypes.c_uint,
+]  # flags
 
 
-def hipMallocPitch(pitch, rows, cols, elesize):
+def hipIpcOpenMemHandle(handle, flags=hipIpcMemLazyEnablePeerAccess):
     """
-    Allocate pitched device memory.
-
-    Allocate pitched memory on the device associated with the current active
-    context.
+    Map a device allocation exported by another process.
 
     Parameters
     ----------
-    pitch : int
-        Pitch for allocation.
-    rows : int
-        Requested pitched allocation height.
-    cols : int
-        Requested pitched allocation width.
-    elesize : int
-        Size of memory element.
+    handle : hipIpcMemHandle
+        Handle from hipIpcGetMemHandle in the exporting process.
+    flags : int, optional
+        hipIpcMemLazyEnablePeerAccess.
 
     Returns
     -------
     ptr : ctypes pointer
-        Pointer to allocated device memory.
-
+        Device pointer valid in this process, unmap with
+        hipIpcCloseMemHandle.
     """
-
     ptr = ctypes.c_void_p()
-    status = _libhip.hipMallocPitch(
-        ctypes.byref(ptr), ctypes.c_size_t(pitch), cols * elesize, rows
-    )
+    status = _libhip.hipIpcOpenMemHandle(ctypes.byref(ptr), handle, flags)
     hipCheckStatus(status)
-    return ptr, pitch
+    return ptr
 
 
-_libhip.hipMemset.restype = ctypes.c_int
-_libhip.hipMemset.argtypes = [
-    ctypes.c_void_p,  # ptr to allocation
-    ctypes.c_int,  # value
-    ctypes.c_size_t,
-]  # bytes to set
+_libhip.hipIpcCloseMemHandle.restype = int
+_libhip.hipIpcCloseMemHandle.argtypes = [ctypes.c_void_p]
 
 
-def hipMemset(dst, value, sizeBytes):
+def hipIpcCloseMemHandle(devPtr):
     """
-    Fills the first sizeBytes bytes of the memory area pointed to by dst with
-    the constant byte value value.
+    Unmap a device allocation opened with hipIpcOpenMemHandle.
 
     Parameters
     ----------
-    dst : ctypes pointer
-        Pointer to the memory to set.
-    value : a single 8-bit int
-        The value to set.
-    sizeBytes : int
-        The number of bytes to set.
+    devPtr : ctypes pointer
+        Pointer returned by hipIpcOpenMemHandle.
     """
-    ctypes_value = ctypes.c_int(value)
-    ctypes_size = ctypes.c_size_t(sizeBytes)
-    status = _libhip.hipMemset(dst, ctypes_value, ctypes_size)
+    status = _libhip.hipIpcCloseMemHandle(devPtr)
     hipCheckStatus(status)
 
 
-# Memory copy modes:
-hipMemcpyHostToHost = 0
-hipMemcpyHostToDevice = 1
-hipMemcpyDeviceToHost = 2
-hipMemcpyDeviceToDevice = 3
-hipMemcpyDefault = 4
-
-_libhip.hipMemcpy.restype = int
-_libhip.hipMemcpy.argtypes = [
-    ctypes.c_void_p,
+_libhip.hipIpcGetEventHandle.restype = int
+_libhip.hipIpcGetEventHandle.argtypes = [
+    ctypes.POINTER(hipIpcEventHandle),
     ctypes.c_void_p,
-    ctypes.c_size_t,
-    ctypes.c_int,
-]
+]  # event
 
 
-def hipMemcpy_htod(dst, src, count):
+def hipIpcGetEventHandle(event):
     """
-    Copy memory from host to device.
-
-    Copy data from host memory to device memory.
+    Get an inter-process handle of an event.
 
     Parameters
     ----------
-    dst : ctypes pointer
-        Device memory pointer.
-    src : ctypes pointer
-        Host memory pointer.
+    event : ctypes pointer
+        Event created with hipEventInterprocess | hipEventDisableTiming.
+
+    Returns
+    -------
+    handle : hipIpcEventHandle
+        Picklable handle, opened in another process with
+        hipIpcOpenEventHandle.
+    """
+    handle = hipIpcEventHandle()
+    status = _libhip.hipIpcGetEventHandle(ctypes.byref(handle), event)
+    hipCheckStatus(status)
+    return handle
+
+
+_libhip.hipIpcOpenEventHandle.restype = int
+_libhip.hipIpcOpenEventHandle.argtypes = [
+    ctypes.POINTER(ctypes.c_void_p),
+    hipIpcEventHandle,
+]  # passed by value
+
+
+def hipIpcOpenEventHandle(handle):
+    """
+    Open an event exported by another process.
+
+    Parameters
+    ----------
+    handle : hipIpcEventHandle
+        Handle from hipIpcGetEventHandle in the exporting process.
+
+    Returns
+    -------
+    event : ctypes pointer
+        Event usable with hipEventSynchronize, hipEventQuery and
+        hipEventRecord, release it with hipEventDestroy.
+    """
+    event = ctypes.c_void_p()
+    status = _libhip.hipIpcOpenEventHandle(ctypes.byref(event), handle)
+    hipCheckStatus(status)
+    return event
+
+
+# Memory allocation functions (adapted from pystream):
+_libhip.hipMalloc.restype = int
+_libhip.hipMalloc.argtypes = [ctypes.POINTER(ctypes.c_void_p), ctypes.c_size_t]
+
+_libhip.hipFree.restype = int
+_libhip.hipFree.argtypes = [ctypes.c_void_p]
+
+# Allocator hipMalloc/hipFree are routed through, see hipSetAllocator
+_allocator = None
+
+# Tracker notified of device allocations and frees, see pyhip.tracking
+_tracker = None
+
+# Set while hipMalloc/hipFree run the installed allocator, allocations it
+# makes through the hip functions are recorded once, by hipMalloc/hipFree
+_in_allocator = threading.local()
+
+
+def _record(ptr, count, api):
+    tracker = _tracker
+    if tracker is not None and not getattr(_in_allocator, "active", False):
+        tracker.record(ptr, count, api)
+
+
+def _release(ptr):
+    tracker = _tracker
+    if tracker is not None and not getattr(_in_allocator, "active", False):
+        tracker.release(ptr)
+
+
+def hipSetAllocator(allocator):
+    """
+    Not a traditional HIP API
+
+    Route hipMalloc/hipFree through an allocator, for example a
+    pyhip.allocator.CachingAllocator. The allocator needs malloc(count)
+    returning a ctypes pointer and free(ptr) methods.
+
+    Parameters
+    ----------
+    allocator : object or None
+        Allocator to use, None restores direct driver allocation.
+
+    Returns
+    -------
+    previous : object or None
+        Previously installed allocator.
+    """
+    global _allocator
+    previous = _allocator
+    _allocator = allocator
+    return previous
+
+
+def _hipMalloc(count):
+    # Driver allocation, bypasses the installed allocator
+    ptr = ctypes.c_void_p()
+    status = _libhip.hipMalloc(ctypes.byref(ptr), count)
+    hipCheckStatus(status)
+    return ptr
+
+
+def _hipFree(ptr):
+    # Driver free, bypasses the installed allocator
+    status = _libhip.hipFree(ptr)
+    hipCheckStatus(status)
+
+
+def hipMalloc(count, ctype=None):
+    """
+    Allocate device memory.
+
+    Allocate memory on the device associated with the current active
+    context.
+
+    Parameters
+    ----------
+    count : int
+        Number of bytes of memory to allocate
+    ctype : _ctypes.SimpleType, optional
+        ctypes type to cast returned pointer.
+
+    Returns
+    -------
+    ptr : ctypes pointer
+        Pointer to allocated device memory.
+
+    """
+
+    if _allocator is not None:
+        _in_allocator.active = True
+        try:
+            ptr = _allocator.malloc(count)
+        finally:
+            _in_allocator.active = False
+    else:
+        ptr = _hipMalloc(count)
+    _record(ptr, count, "hipMalloc")
+    if ctype is not None:
+        ptr = ctypes.cast(ptr, ctypes.POINTER(ctype))
+    return ptr
+
+
+def hipFree(ptr):
+    """
+    Free device memory.
+
+    Free allocated memory on the device associated with the current active
+    context.
+
+    Parameters
+    ----------
+    ptr : ctypes pointer
+        Pointer to allocated device memory.
+
+    """
+
+    if _allocator is not None:
+        _in_allocator.active = True
+        try:
+            _allocator.free(ptr)
+        finally:
+            _in_allocator.active = False
+    else:
+        _hipFree(ptr)
+    _release(ptr)
+
+
+# Host memory allocation flags
+hipHostMallocDefault = 0x0
+hipHostMallocPortable = 0x1
+hipHostMallocMapped = 0x2
+hipHostMallocWriteCombined = 0x4
+hipHostMallocCoherent = 0x40000000
+hipHostMallocNonCoherent = 0x80000000
+
+_libhip.hipHostMalloc.restype = int
+_libhip.hipHostMalloc.argtypes = [
+    ctypes.POINTER(ctypes.c_void_p),
+    ctypes.c_size_t,
+    ctypes.c_uint,
+]
+
+
+def hipHostMalloc(count, flags=hipHostMallocDefault):
+    """
+    Allocate page-locked host memory.
+
+    Page-locked memory is required for hipMemcpyAsync to be asynchronous
+    and run at full bandwidth.
+
+    Parameters
+    ----------
+    count : int
+        Number of bytes of memory to allocate
+    flags : int, optional
+        hipHostMalloc* flags.
+
+    Returns
+    -------
+    ptr : ctypes pointer
+        Pointer to allocated host memory.
+    """
+    ptr = ctypes.c_void_p()
+    status = _libhip.hipHostMalloc(ctypes.byref(ptr), count, flags)
+    hipCheckStatus(status)
+    return ptr
+
+
+_libhip.hipHostFree.restype = int
+_libhip.hipHostFree.argtypes = [ctypes.c_void_p]
+
+
+def hipHostFree(ptr):
+    """
+    Free page-locked host memory allocated by hipHostMalloc.
+
+    Parameters
+    ----------
+    ptr : ctypes pointer
+        Pointer to allocated host memory.
+    """
+    status = _libhip.hipHostFree(ptr)
+    hipCheckStatus(status)
+
+
+# Host memory register flags
+hipHostRegisterDefault = 0x0
+hipHostRegisterPortable = 0x1
+hipHostRegisterMapped = 0x2
+hipHostRegisterIoMemory = 0x4
+hipHostRegisterReadOnly = 0x8
+
+_libhip.hipHostRegister.restype = int
+_libhip.hipHostRegister.argtypes = [
+    ctypes.c_void_p,
+    ctypes.c_size_t,
+    ctypes.c_uint,
+]
+
+
+def hipHostRegister(ptr, count, flags=hipHostRegisterDefault):
+    """
+    Page-lock an existing host memory range.
+
+    Parameters
+    ----------
+    ptr : ctypes pointer
+        Host memory pointer.
+    count : int
+        Size of the range in bytes.
+    flags : int, optional
+        hipHostRegister* flags.
+    """
+    status = _libhip.hipHostRegister(ptr, count, flags)
+    hipCheckStatus(status)
+
+
+_libhip.hipHostUnregister.restype = int
+_libhip.hipHostUnregister.argtypes = [ctypes.c_void_p]
+
+
+def hipHostUnregister(ptr):
+    """
+    Unregister host memory registered with hipHostRegister.
+
+    Parameters
+    ----------
+    ptr : ctypes pointer
+        Host memory pointer.
+    """
+    status = _libhip.hipHostUnregister(ptr)
+    hipCheckStatus(status)
+
+
+_libhip.hipMallocPitch.restype = int
+_libhip.hipMallocPitch.argtypes = [
+    ctypes.POINTER(ctypes.c_void_p),
+    ctypes.POINTER(ctypes.c_size_t),
+    ctypes.c_size_t,
+    ctypes.c_size_t,
+]
+
+
+def hipMallocPitch(pitch, rows, cols, elesize):
+    """
+    Allocate pitched device memory.
+
+    Allocate pitched memory on the device associated with the current active
+    context. The pitch is chosen by the driver.
+
+    Parameters
+    ----------
+    pitch : int
+        Unused, kept for compatibility. The driver chosen pitch is returned.
+    rows : int
+        Requested pitched allocation height.
+    cols : int
+        Requested pitched allocation width.
+    elesize : int
+        Size of memory element.
+
+    Returns
+    -------
+    ptr : ctypes pointer
+        Pointer to allocated device memory.
+    pitch : int
+        Pitch of the allocation in bytes.
+
+    """
+
+    ptr = ctypes.c_void_p()
+    c_pitch = ctypes.c_size_t()
+    status = _libhip.hipMallocPitch(
+        ctypes.byref(ptr), ctypes.byref(c_pitch), cols * elesize, rows
+    )
+    hipCheckStatus(status)
+    _record(ptr, c_pitch.value * rows, "hipMallocPitch")
+    return ptr, c_pitch.value
+
+
+class hipPitchedPtr(ctypes.Structure):
+    _fields_ = [
+        # Pointer to the allocated memory
+        ("ptr", ctypes.c_void_p),
+        # Pitch in bytes
+        ("pitch", ctypes.c_size_t),
+        # Logical width of the allocation
+        ("xsize", ctypes.c_size_t),
+        # Logical height of the allocation
+        ("ysize", ctypes.c_size_t),
+    ]
+
+
+class hipExtent(ctypes.Structure):
+    _fields_ = [
+        # Width in bytes for linear memory
+        ("width", ctypes.c_size_t),
+        ("height", ctypes.c_size_t),
+        ("depth", ctypes.c_size_t),
+    ]
+
+
+class hipPos(ctypes.Structure):
+    _fields_ = [
+        # x offset in bytes for linear memory
+        ("x", ctypes.c_size_t),
+        ("y", ctypes.c_size_t),
+        ("z", ctypes.c_size_t),
+    ]
+
+
+class hipMemcpy3DParms(ctypes.Structure):
+    _fields_ = [
+        ("srcArray", ctypes.c_void_p),
+        ("srcPos", hipPos),
+        ("srcPtr", hipPitchedPtr),
+        ("dstArray", ctypes.c_void_p),
+        ("dstPos", hipPos),
+        ("dstPtr", hipPitchedPtr),
+        ("extent", hipExtent),
+        ("kind", ctypes.c_int),
+    ]
+
+
+_libhip.hipMalloc3D.restype = int
+_libhip.hipMalloc3D.argtypes = [ctypes.POINTER(hipPitchedPtr), hipExtent]
+
+
+def hipMalloc3D(width, height, depth):
+    """
+    Allocate pitched 3D device memory.
+
+    Parameters
+    ----------
+    width : int
+        Width of a row in bytes.
+    height : int
+        Rows per slice.
+    depth : int
+        Number of slices.
+
+    Returns
+    -------
+    pitched_ptr : hipPitchedPtr
+        Pointer, driver chosen pitch and logical size of the allocation.
+    """
+    pitched_ptr = hipPitchedPtr()
+    status = _libhip.hipMalloc3D(
+        ctypes.byref(pitched_ptr), hipExtent(width, height, depth)
+    )
+    hipCheckStatus(status)
+    _record(pitched_ptr.ptr, pitched_ptr.pitch * height * depth, "hipMalloc3D")
+    return pitched_ptr
+
+
+# Stream ordered allocation
+
+_libhip.hipMallocAsync.restype = int
+_libhip.hipMallocAsync.argtypes = [
+    ctypes.POINTER(ctypes.c_void_p),
+    ctypes.c_size_t,
+    ctypes.c_void_p,
+]
+
+
+def hipMallocAsync(count, stream=None):
+    """
+    Allocate device memory in stream order.
+
+    The memory can be used by work enqueued on stream after this call, no
+    host synchronization is involved.
+
+    Parameters
+    ----------
+    count : int
+        Number of bytes of memory to allocate
+    stream : ctypes pointer, optional
+        Stream the allocation is ordered on.
+
+    Returns
+    -------
+    ptr : ctypes pointer
+        Pointer to allocated device memory.
+    """
+    ptr = ctypes.c_void_p()
+    status = _libhip.hipMallocAsync(ctypes.byref(ptr), count, stream)
+    hipCheckStatus(status)
+    _record(ptr, count, "hipMallocAsync")
+    return ptr
+
+
+_libhip.hipFreeAsync.restype = int
+_libhip.hipFreeAsync.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+
+
+def hipFreeAsync(ptr, stream=None):
+    """
+    Free device memory in stream order.
+
+    Parameters
+    ----------
+    ptr : ctypes pointer
+        Pointer to allocated device memory.
+    stream : ctypes pointer, optional
+        Stream the free is ordered on.
+    """
+    status = _libhip.hipFreeAsync(ptr, stream)
+    hipCheckStatus(status)
+    _release(ptr)
+
+
+# Memory pool attributes
+hipMemPoolReuseFollowEventDependencies = 0x1
+hipMemPoolReuseAllowOpportunistic = 0x2
+hipMemPoolReuseAllowInternalDependencies = 0x3
+hipMemPoolAttrReleaseThreshold = 0x4
+hipMemPoolAttrReservedMemCurrent = 0x5
+hipMemPoolAttrReservedMemHigh = 0x6
+hipMemPoolAttrUsedMemCurrent = 0x7
+hipMemPoolAttrUsedMemHigh = 0x8
+
+# Reuse policies are int, the other attributes 64-bit
+_mem_pool_int_attributes = set(
+    [
+        hipMemPoolReuseFollowEventDependencies,
+        hipMemPoolReuseAllowOpportunistic,
+        hipMemPoolReuseAllowInternalDependencies,
+    ]
+)
+
+hipMemAllocationTypePinned = 0x1
+hipMemHandleTypeNone = 0x0
+hipMemLocationTypeDevice = 0x1
+
+
+class hipMemLocation(ctypes.Structure):
+    _fields_ = [
+        ("type", ctypes.c_int),
+        ("id", ctypes.c_int),
+    ]
+
+
+class hipMemPoolProps(ctypes.Structure):
+    _fields_ = [
+        ("allocType", ctypes.c_int),
+        ("handleTypes", ctypes.c_int),
+        ("location", hipMemLocation),
+        ("win32SecurityAttributes", ctypes.c_void_p),
+        # Maximum pool size, 0 for the default, reserved on older HIP
+        ("maxSize", ctypes.c_size_t),
+        ("reserved", ctypes.c_ubyte * 56),
+    ]
+
+
+_libhip.hipDeviceGetDefaultMemPool.restype = int
+_libhip.hipDeviceGetDefaultMemPool.argtypes = [
+    ctypes.POINTER(ctypes.c_void_p),
+    ctypes.c_int,
+]
+
+
+def hipDeviceGetDefaultMemPool(device):
+    """
+    Get the default memory pool of a device.
+
+    Parameters
+    ----------
+    device : int
+        Device id.
+
+    Returns
+    -------
+    mem_pool : ctypes pointer
+        Memory pool handle.
+    """
+    mem_pool = ctypes.c_void_p()
+    status = _libhip.hipDeviceGetDefaultMemPool(ctypes.byref(mem_pool), device)
+    hipCheckStatus(status)
+    return mem_pool
+
+
+_libhip.hipMemPoolCreate.restype = int
+_libhip.hipMemPoolCreate.argtypes = [
+    ctypes.POINTER(ctypes.c_void_p),
+    ctypes.POINTER(hipMemPoolProps),
+]
+
+
+def hipMemPoolCreate(device, max_size=0):
+    """
+    Create a memory pool on a device.
+
+    Parameters
+    ----------
+    device : int
+        Device id.
+    max_size : int, optional
+        Maximum pool size in bytes, 0 for no limit. Ignored by HIP versions
+        without the maxSize property.
+
+    Returns
+    -------
+    mem_pool : ctypes pointer
+        Memory pool handle, destroy it with hipMemPoolDestroy.
+    """
+    props = hipMemPoolProps()
+    props.allocType = hipMemAllocationTypePinned
+    props.handleTypes = hipMemHandleTypeNone
+    props.location = hipMemLocation(hipMemLocationTypeDevice, device)
+    props.maxSize = max_size
+    mem_pool = ctypes.c_void_p()
+    status = _libhip.hipMemPoolCreate(ctypes.byref(mem_pool), ctypes.byref(props))
+    hipCheckStatus(status)
+    return mem_pool
+
+
+_libhip.hipMemPoolDestroy.restype = int
+_libhip.hipMemPoolDestroy.argtypes = [ctypes.c_void_p]
+
+
+def hipMemPoolDestroy(mem_pool):
+    """
+    Destroy a memory pool created by hipMemPoolCreate.
+
+    Parameters
+    ----------
+    mem_pool : ctypes pointer
+        Memory pool handle.
+    """
+    status = _libhip.hipMemPoolDestroy(mem_pool)
+    hipCheckStatus(status)
+
+
+_libhip.hipMemPoolSetAttribute.restype = int
+_libhip.hipMemPoolSetAttribute.argtypes = [
+    ctypes.c_void_p,
+    ctypes.c_int,
+    ctypes.c_void_p,
+]
+
+
+def hipMemPoolSetAttribute(mem_pool, attribute, value):
+    """
+    Set a memory pool attribute.
+
+    Parameters
+    ----------
+    mem_pool : ctypes pointer
+        Memory pool handle.
+    attribute : int
+        hipMemPool* attribute, for example hipMemPoolAttrReleaseThreshold.
+    value : int
+        Attribute value, reuse policies are 0 or 1.
+    """
+    if attribute in _mem_pool_int_attributes:
+        c_value = ctypes.c_int(value)
+    else:
+        c_value = ctypes.c_uint64(value)
+    status = _libhip.hipMemPoolSetAttribute(mem_pool, attribute, ctypes.byref(c_value))
+    hipCheckStatus(status)
+
+
+_libhip.hipMemPoolGetAttribute.restype = int
+_libhip.hipMemPoolGetAttribute.argtypes = [
+    ctypes.c_void_p,
+    ctypes.c_int,
+    ctypes.c_void_p,
+]
+
+
+def hipMemPoolGetAttribute(mem_pool, attribute):
+    """
+    Get a memory pool attribute.
+
+    Parameters
+    ----------
+    mem_pool : ctypes pointer
+        Memory pool handle.
+    attribute : int
+        hipMemPool* attribute.
+
+    Returns
+    -------
+    value : int
+        Attribute value.
+    """
+    if attribute in _mem_pool_int_attributes:
+        c_value = ctypes.c_int()
+    else:
+        c_value = ctypes.c_uint64()
+    status = _libhip.hipMemPoolGetAttribute(mem_pool, attribute, ctypes.byref(c_value))
+    hipCheckStatus(status)
+    return c_value.value
+
+
+_libhip.hipMemPoolTrimTo.restype = int
+_libhip.hipMemPoolTrimTo.argtypes = [ctypes.c_void_p, ctypes.c_size_t]
+
+
+def hipMemPoolTrimTo(mem_pool, min_bytes_to_hold):
+    """
+    Release memory held by a pool back to the device.
+
+    Parameters
+    ----------
+    mem_pool : ctypes pointer
+        Memory pool handle.
+    min_bytes_to_hold : int
+        Bytes the pool may keep reserved.
+    """
+    status = _libhip.hipMemPoolTrimTo(mem_pool, min_bytes_to_hold)
+    hipCheckStatus(status)
+
+
+_libhip.hipMallocFromPoolAsync.restype = int
+_libhip.hipMallocFromPoolAsync.argtypes = [
+    ctypes.POINTER(ctypes.c_void_p),
+    ctypes.c_size_t,
+    ctypes.c_void_p,
+    ctypes.c_void_p,
+]
+
+
+def hipMallocFromPoolAsync(count, mem_pool, stream=None):
+    """
+    Allocate device memory from a pool in stream order.
+
+    Parameters
+    ----------
+    count : int
+        Number of bytes of memory to allocate
+    mem_pool : ctypes pointer
+        Memory pool handle.
+    stream : ctypes pointer, optional
+        Stream the allocation is ordered on.
+
+    Returns
+    -------
+    ptr : ctypes pointer
+        Pointer to allocated device memory, free it with hipFreeAsync.
+    """
+    ptr = ctypes.c_void_p()
+    status = _libhip.hipMallocFromPoolAsync(ctypes.byref(ptr), count, mem_pool, stream)
+    hipCheckStatus(status)
+    _record(ptr, count, "hipMallocFromPoolAsync")
+    return ptr
+
+
+# Managed memory attach flags
+hipMemAttachGlobal = 0x01
+hipMemAttachHost = 0x02
+hipMemAttachSingle = 0x04
+
+# Device id of the host for prefetching and advice
+hipCpuDeviceId = -1
+hipInvalidDeviceId = -2
+
+_libhip.hipMallocManaged.restype = int
+_libhip.hipMallocManaged.argtypes = [
+    ctypes.POINTER(ctypes.c_void_p),
+    ctypes.c_size_t,
+    ctypes.c_uint,
+]
+
+
+def hipMallocManaged(count, flags=hipMemAttachGlobal):
+    """
+    Allocate managed (unified) memory.
+
+    Managed memory is accessible from the host and all devices, pages are
+    migrated on demand.
+
+    Parameters
+    ----------
+    count : int
+        Number of bytes of memory to allocate
+    flags : int, optional
+        hipMemAttachGlobal or hipMemAttachHost.
+
+    Returns
+    -------
+    ptr : ctypes pointer
+        Pointer to allocated managed memory, free it with hipFree.
+    """
+    ptr = ctypes.c_void_p()
+    status = _libhip.hipMallocManaged(ctypes.byref(ptr), count, flags)
+    hipCheckStatus(status)
+    _record(ptr, count, "hipMallocManaged")
+    return ptr
+
+
+_libhip.hipMemPrefetchAsync.restype = int
+_libhip.hipMemPrefetchAsync.argtypes = [
+    ctypes.c_void_p,  # ptr
+    ctypes.c_size_t,  # count
+    ctypes.c_int,  # device
+    ctypes.c_void_p,  # stream
+]
+
+
+def hipMemPrefetchAsync(ptr, count, device, stream=None):
+    """
+    Prefetch managed memory to a device or to the host.
+
+    Parameters
+    ----------
+    ptr : ctypes pointer
+        Managed memory pointer.
+    count : int
+        Size of the range in bytes.
+    device : int
+        Destination device, hipCpuDeviceId for the host.
+    stream : ctypes pointer, optional
+        Stream on which command is to be enqueued
+    """
+    status = _libhip.hipMemPrefetchAsync(ptr, count, device, stream)
+    hipCheckStatus(status)
+
+
+# Managed memory advice
+hipMemAdviseSetReadMostly = 1
+hipMemAdviseUnsetReadMostly = 2
+hipMemAdviseSetPreferredLocation = 3
+hipMemAdviseUnsetPreferredLocation = 4
+hipMemAdviseSetAccessedBy = 5
+hipMemAdviseUnsetAccessedBy = 6
+hipMemAdviseSetCoarseGrain = 100
+hipMemAdviseUnsetCoarseGrain = 101
+
+_libhip.hipMemAdvise.restype = int
+_libhip.hipMemAdvise.argtypes = [
+    ctypes.c_void_p,  # ptr
+    ctypes.c_size_t,  # count
+    ctypes.c_int,  # advice
+    ctypes.c_int,  # device
+]
+
+
+def hipMemAdvise(ptr, count, advice, device):
+    """
+    Advise the driver about the usage of a managed memory range.
+
+    Parameters
+    ----------
+    ptr : ctypes pointer
+        Managed memory pointer.
+    count : int
+        Size of the range in bytes.
+    advice : int
+        hipMemAdvise* value.
+    device : int
+        Device the advice applies to, hipCpuDeviceId for the host.
+    """
+    status = _libhip.hipMemAdvise(ptr, count, advice, device)
+    hipCheckStatus(status)
+
+
+# Managed memory range attributes
+hipMemRangeAttributeReadMostly = 1
+hipMemRangeAttributePreferredLocation = 2
+hipMemRangeAttributeAccessedBy = 3
+hipMemRangeAttributeLastPrefetchLocation = 4
+hipMemRangeAttributeCoherencyMode = 100
+
+_libhip.hipMemRangeGetAttribute.restype = int
+_libhip.hipMemRangeGetAttribute.argtypes = [
+    ctypes.c_void_p,  # data
+    ctypes.c_size_t,  # data size
+    ctypes.c_int,  # attribute
+    ctypes.c_void_p,  # ptr
+    ctypes.c_size_t,  # count
+]
+
+
+def hipMemRangeGetAttribute(ptr, count, attribute):
+    """
+    Query an attribute of a managed memory range.
+
+    Parameters
+    ----------
+    ptr : ctypes pointer
+        Managed memory pointer.
+    count : int
+        Size of the range in bytes.
+    attribute : int
+        hipMemRangeAttribute* value.
+
+    Returns
+    -------
+    value : int or list of int
+        Attribute value, the list of device ids for
+        hipMemRangeAttributeAccessedBy.
+    """
+    if attribute == hipMemRangeAttributeAccessedBy:
+        data = (ctypes.c_int * hipGetDeviceCount())()
+    else:
+        data = (ctypes.c_int * 1)()
+    status = _libhip.hipMemRangeGetAttribute(
+        data, ctypes.sizeof(data), attribute, ptr, count
+    )
+    hipCheckStatus(status)
+    if attribute == hipMemRangeAttributeAccessedBy:
+        return [device for device in data if device != hipInvalidDeviceId]
+    return data[0]
+
+
+# Host buffers, objects exporting the buffer protocol (bytearray, memoryview,
+# numpy arrays, array.array, ctypes arrays) are resolved to their address.
+
+
+class _Py_buffer(ctypes.Structure):
+    _fields_ = [
+        ("buf", ctypes.c_void_p),
+        ("obj", ctypes.c_void_p),
+        ("len", ctypes.c_ssize_t),
+        ("itemsize", ctypes.c_ssize_t),
+        ("readonly", ctypes.c_int),
+        ("ndim", ctypes.c_int),
+        ("format", ctypes.c_char_p),
+        ("shape", ctypes.POINTER(ctypes.c_ssize_t)),
+        ("strides", ctypes.POINTER(ctypes.c_ssize_t)),
+        ("suboffsets", ctypes.POINTER(ctypes.c_ssize_t)),
+        ("internal", ctypes.c_void_p),
+    ]
+
+
+_PyBUF_ANY_CONTIGUOUS = 0x98
+_PyObject_GetBuffer = ctypes.PYFUNCTYPE(
+    ctypes.c_int, ctypes.py_object, ctypes.POINTER(_Py_buffer), ctypes.c_int
+)(("PyObject_GetBuffer", ctypes.pythonapi))
+_PyBuffer_Release = ctypes.PYFUNCTYPE(None, ctypes.POINTER(_Py_buffer))(
+    ("PyBuffer_Release", ctypes.pythonapi)
+)
+
+# Passed to the library as they are, these are pointers not host buffers
+_pointer_types = (int, ctypes.c_void_p, ctypes.c_char_p, ctypes._Pointer)
+
+
+def _host_buffer(obj, writable=False):
+    """
+    Resolve a buffer protocol object to its address without copying.
+
+    Returns (param, nbytes, view). Pointers, ints, byref() results and
+    objects with _as_parameter_ are returned unchanged with nbytes None.
+    view keeps the buffer exported and must be kept alive for the call.
+    """
+    if obj is None or isinstance(obj, _pointer_types) or hasattr(obj, "_as_parameter_"):
+        return obj, None, None
+    try:
+        view = memoryview(obj)
+    except TypeError:
+        return obj, None, None
+    if not view.contiguous:
+        raise ValueError("buffer must be contiguous")
+    if writable and view.readonly:
+        raise ValueError("destination buffer must be writable")
+    buffer = _Py_buffer()
+    _PyObject_GetBuffer(view, ctypes.byref(buffer), _PyBUF_ANY_CONTIGUOUS)
+    address = buffer.buf
+    _PyBuffer_Release(ctypes.byref(buffer))
+    return address, view.nbytes, view
+
+
+def _copy_args(dst, src, count):
+    """
+    Resolve memcpy arguments, count defaults to the size of the source
+    buffer, or of the destination buffer if only that one is a buffer.
+    """
+    dst, dst_nbytes, dst_view = _host_buffer(dst, writable=True)
+    src, src_nbytes, src_view = _host_buffer(src)
+    if count is None:
+        count = src_nbytes if src_nbytes is not None else dst_nbytes
+        if count is None:
+            raise ValueError("count is required when neither side is a buffer")
+    for nbytes in (dst_nbytes, src_nbytes):
+        if nbytes is not None and count > nbytes:
+            raise ValueError(f"count {count} exceeds buffer size {nbytes}")
+    return dst, src, count, (dst_view, src_view)
+
+
+_libhip.hipMemset.restype = ctypes.c_int
+_libhip.hipMemset.argtypes = [
+    ctypes.c_void_p,  # ptr to allocation
+    ctypes.c_int,  # value
+    ctypes.c_size_t,
+]  # bytes to set
+
+
+def hipMemset(dst, value, sizeBytes=None):
+    """
+    Fills the first sizeBytes bytes of the memory area pointed to by dst with
+    the constant byte value value.
+
+    Parameters
+    ----------
+    dst : ctypes pointer or buffer
+        Pointer to the memory to set.
+    value : a single 8-bit int
+        The value to set.
+    sizeBytes : int, optional
+        The number of bytes to set, defaults to the size of dst if it is a
+        buffer.
+    """
+    dst, _, sizeBytes, _views = _copy_args(dst, None, sizeBytes)
+    status = _libhip.hipMemset(dst, value, sizeBytes)
+    hipCheckStatus(status)
+
+
+_libhip.hipMemsetAsync.restype = ctypes.c_int
+_libhip.hipMemsetAsync.argtypes = [
+    ctypes.c_void_p,  # ptr to allocation
+    ctypes.c_int,  # value
+    ctypes.c_size_t,  # bytes to set
+    ctypes.c_void_p,
+]  # stream
+
+
+def hipMemsetAsync(dst, value, sizeBytes=None, stream=None):
+    """
+    Fills the first sizeBytes bytes of dst with the constant byte value
+    value, asynchronously on stream.
+
+    Parameters
+    ----------
+    dst : ctypes pointer or buffer
+        Pointer to the memory to set.
+    value : a single 8-bit int
+        The value to set.
+    sizeBytes : int, optional
+        The number of bytes to set, defaults to the size of dst if it is a
+        buffer.
+    stream : ctypes pointer, optional
+        Stream on which the memset is enqueued.
+    """
+    dst, _, sizeBytes, _views = _copy_args(dst, None, sizeBytes)
+    status = _libhip.hipMemsetAsync(dst, value, sizeBytes, stream)
+    hipCheckStatus(status)
+
+
+_libhip.hipMemsetD8.restype = ctypes.c_int
+_libhip.hipMemsetD8.argtypes = [ctypes.c_void_p, ctypes.c_ubyte, ctypes.c_size_t]
+_libhip.hipMemsetD8Async.restype = ctypes.c_int
+_libhip.hipMemsetD8Async.argtypes = [
+    ctypes.c_void_p,
+    ctypes.c_ubyte,
+    ctypes.c_size_t,
+    ctypes.c_void_p,
+]
+_libhip.hipMemsetD16.restype = ctypes.c_int
+_libhip.hipMemsetD16.argtypes = [ctypes.c_void_p, ctypes.c_ushort, ctypes.c_size_t]
+_libhip.hipMemsetD16Async.restype = ctypes.c_int
+_libhip.hipMemsetD16Async.argtypes = [
+    ctypes.c_void_p,
+    ctypes.c_ushort,
+    ctypes.c_size_t,
+    ctypes.c_void_p,
+]
+_libhip.hipMemsetD32.restype = ctypes.c_int
+_libhip.hipMemsetD32.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_size_t]
+_libhip.hipMemsetD32Async.restype = ctypes.c_int
+_libhip.hipMemsetD32Async.argtypes = [
+    ctypes.c_void_p,
+    ctypes.c_int,
+    ctypes.c_size_t,
+    ctypes.c_void_p,
+]
+
+
+def hipMemsetD8(dst, value, count):
+    """
+    Fills count 8-bit values of device memory with value.
+
+    Parameters
+    ----------
+    dst : ctypes pointer
+        Device memory pointer.
+    value : int
+        8-bit value to set.
+    count : int
+        Number of 8-bit values to set.
+    """
+    status = _libhip.hipMemsetD8(dst, value, count)
+    hipCheckStatus(status)
+
+
+def hipMemsetD8Async(dst, value, count, stream=None):
+    """
+    Fills count 8-bit values of device memory with value, asynchronously
+    on stream.
+
+    Parameters
+    ----------
+    dst : ctypes pointer
+        Device memory pointer.
+    value : int
+        8-bit value to set.
+    count : int
+        Number of 8-bit values to set.
+    stream : ctypes pointer, optional
+        Stream on which the memset is enqueued.
+    """
+    status = _libhip.hipMemsetD8Async(dst, value, count, stream)
+    hipCheckStatus(status)
+
+
+def hipMemsetD16(dst, value, count):
+    """
+    Fills count 16-bit values of device memory with value.
+
+    Parameters
+    ----------
+    dst : ctypes pointer
+        Device memory pointer, 2-byte aligned.
+    value : int
+        16-bit value to set.
+    count : int
+        Number of 16-bit values to set.
+    """
+    status = _libhip.hipMemsetD16(dst, value, count)
+    hipCheckStatus(status)
+
+
+def hipMemsetD16Async(dst, value, count, stream=None):
+    """
+    Fills count 16-bit values of device memory with value, asynchronously
+    on stream.
+
+    Parameters
+    ----------
+    dst : ctypes pointer
+        Device memory pointer, 2-byte aligned.
+    value : int
+        16-bit value to set.
+    count : int
+        Number of 16-bit values to set.
+    stream : ctypes pointer, optional
+        Stream on which the memset is enqueued.
+    """
+    status = _libhip.hipMemsetD16Async(dst, value, count, stream)
+    hipCheckStatus(status)
+
+
+def hipMemsetD32(dst, value, count):
+    """
+    Fills count 32-bit values of device memory with value.
+
+    Parameters
+    ----------
+    dst : ctypes pointer
+        Device memory pointer, 4-byte aligned.
+    value : int
+        32-bit value to set, as a signed int.
+    count : int
+        Number of 32-bit values to set.
+    """
+    status = _libhip.hipMemsetD32(dst, value, count)
+    hipCheckStatus(status)
+
+
+def hipMemsetD32Async(dst, value, count, stream=None):
+    """
+    Fills count 32-bit values of device memory with value, asynchronously
+    on stream.
+
+    Parameters
+    ----------
+    dst : ctypes pointer
+        Device memory pointer, 4-byte aligned.
+    value : int
+        32-bit value to set, as a signed int.
+    count : int
+        Number of 32-bit values to set.
+    stream : ctypes pointer, optional
+        Stream on which the memset is enqueued.
+    """
+    status = _libhip.hipMemsetD32Async(dst, value, count, stream)
+    hipCheckStatus(status)
+
+
+# Memory copy modes:
+hipMemcpyHostToHost = 0
+hipMemcpyHostToDevice = 1
+hipMemcpyDeviceToHost = 2
+hipMemcpyDeviceToDevice = 3
+hipMemcpyDefault = 4
+
+_libhip.hipMemcpy.restype = int
+_libhip.hipMemcpy.argtypes = [
+    ctypes.c_void_p,
+    ctypes.c_void_p,
+    ctypes.c_size_t,
+    ctypes.c_int,
+]
+
+
+def hipMemcpy_htod(dst, src, count=None):
+    """
+    Copy memory from host to device.
+
+    Copy data from host memory to device memory.
+
+    Parameters
+    ----------
+    dst : ctypes pointer
+        Device memory pointer.
+    src : ctypes pointer or buffer
+        Host memory pointer, or any contiguous object exporting the buffer
+        protocol (bytes, bytearray, memoryview, numpy array, array.array).
+    count : int, optional
+        Number of bytes to copy, defaults to the size of the src buffer.
+
+    """
+
+    dst, src, count, _views = _copy_args(dst, src, count)
+    status = _libhip.hipMemcpy(dst, src, count, hipMemcpyHostToDevice)
+    hipCheckStatus(status)
+
+
+def hipMemcpy_dtoh(dst, src, count=None):
+    """
+    Copy memory from device to host.
+
+    Copy data from device memory to host memory.
+
+    Parameters
+    ----------
+    dst : ctypes pointer or buffer
+        Host memory pointer, or any writable contiguous object exporting the
+        buffer protocol (bytearray, memoryview, numpy array, array.array).
+    src : ctypes pointer
+        Device memory pointer.
+    count : int, optional
+        Number of bytes to copy, defaults to the size of the dst buffer.
+
+    """
+
+    dst, src, count, _views = _copy_args(dst, src, count)
+    status = _libhip.hipMemcpy(dst, src, count, hipMemcpyDeviceToHost)
+    hipCheckStatus(status)
+
+
+_libhip.hipMemcpyAsync.restype = int
+_libhip.hipMemcpyAsync.argtypes = [
+    ctypes.c_void_p,
+    ctypes.c_void_p,
+    ctypes.c_size_t,
+    ctypes.c_int,
+    ctypes.c_void_p,
+]
+
+
+def hipMemcpyAsync_htod(dst, src, count=None, stream=None):
+    """
+    Copy memory from host to device via a stream.
+
+    The host memory must stay alive and unchanged until the copy completed.
+    The buffer of src is only referenced during the call, the caller has
+    to keep src alive, for example until hipStreamSynchronize.
+
+    Parameters
+    ----------
+    dst : ctypes pointer
+        Device memory pointer.
+    src : ctypes pointer or buffer
+        Host memory pointer or contiguous buffer protocol object.
+    count : int, optional
+        Number of bytes to copy, defaults to the size of the src buffer.
+    stream : ctypes pointer
+        Stream on which command is to be enqueued
+
+    """
+    dst, src, count, _views = _copy_args(dst, src, count)
+    status = _libhip.hipMemcpyAsync(
+        dst, src, count, hipMemcpyHostToDevice, stream
+    )
+    hipCheckStatus(status)
+
+
+def hipMemcpyAsync_dtoh(dst, src, count=None, stream=None):
+    """
+    Copy memory from device to host via a stream.
+
+    The host memory must stay alive until the copy completed. The buffer
+    of dst is only referenced during the call, the caller has to keep dst
+    alive, for example until hipStreamSynchronize.
+
+    Parameters
+    ----------
+    dst : ctypes pointer or buffer
+        Host memory pointer or writable contiguous buffer protocol object.
+    src : ctypes pointer
+        Device memory pointer.
+    count : int, optional
+        Number of bytes to copy, defaults to the size of the dst buffer.
+    stream : ctypes pointer
+        Stream on which command is to be enqueued
+
+    """
+
+    dst, src, count, _views = _copy_args(dst, src, count)
+    status = _libhip.hipMemcpyAsync(
+        dst, src, count, hipMemcpyDeviceToHost, stream
+    )
+    hipCheckStatus(status)
+
+
+def hipMemcpyAsync(dst, src, count=None, direction=hipMemcpyDefault, stream=None):
+    """
+    Copy memory from src to dst via a stream.
+
+    Host memory must stay alive, and a host src unchanged, until the copy
+    completed. Buffers are only referenced during the call, the caller has
+    to keep them alive, for example until hipStreamSynchronize.
+
+    Parameters
+    ----------
+    dst : ctypes pointer or buffer
+        Destination memory pointer or writable contiguous buffer.
+    src : ctypes pointer or buffer
+        Source memory pointer or contiguous buffer.
+    count : int, optional
+        Number of bytes to copy, defaults to the size of the src buffer, or
+        of the dst buffer if src is a pointer.
+    direction: int
+        Direction of memcpy
+    stream : ctypes pointer
+        Stream on which command is to be enqueued
+
+    """
+    dst, src, count, _views = _copy_args(dst, src, count)
+    status = _libhip.hipMemcpyAsync(dst, src, count, direction, stream)
+    hipCheckStatus(status)
+
+
+def hipMemcpy(dst, src, count=None, direction=hipMemcpyDefault):
+    """
+    Copy memory from src to dst.
+
+    Parameters
+    ----------
+    dst : ctypes pointer or buffer
+        Destination memory pointer or writable contiguous buffer.
+    src : ctypes pointer or buffer
+        Source memory pointer or contiguous buffer.
+    count : int, optional
+        Number of bytes to copy, defaults to the size of the src buffer, or
+        of the dst buffer if src is a pointer.
+    direction: int
+        Direction of memcpy, hipMemcpyDeviceToDevice for copies between
+        device allocations. With hipMemcpyDefault the direction is inferred
+        from the pointers, which also covers copies between devices.
+
+    """
+    dst, src, count, _views = _copy_args(dst, src, count)
+    status = _libhip.hipMemcpy(dst, src, count, direction)
+    hipCheckStatus(status)
+
+
+_libhip.hipMemcpyPeer.restype = int
+_libhip.hipMemcpyPeer.argtypes = [
+    ctypes.c_void_p,  # dst
+    ctypes.c_int,  # dst device
+    ctypes.c_void_p,  # src
+    ctypes.c_int,  # src device
+    ctypes.c_size_t,
+]  # count
+
+
+def hipMemcpyPeer(dst, dstDevice, src, srcDevice, count):
+    """
+    Copy memory between two devices.
+
+    Parameters
+    ----------
+    dst : ctypes pointer
+        Device memory pointer on dstDevice.
+    dstDevice : int
+        Destination device.
+    src : ctypes pointer
+        Device memory pointer on srcDevice.
+    srcDevice : int
+        Source device.
     count : int
         Number of bytes to copy.
+    """
+    status = _libhip.hipMemcpyPeer(dst, dstDevice, src, srcDevice, count)
+    hipCheckStatus(status)
+
 
+_libhip.hipMemcpyPeerAsync.restype = int
+_libhip.hipMemcpyPeerAsync.argtypes = [
+    ctypes.c_void_p,  # dst
+    ctypes.c_int,  # dst device
+    ctypes.c_void_p,  # src
+    ctypes.c_int,  # src device
+    ctypes.c_size_t,  # count
+    ctypes.c_void_p,
+]  # stream
+
+
+def hipMemcpyPeerAsync(dst, dstDevice, src, srcDevice, count, stream=None):
     """
+    Copy memory between two devices via a stream.
 
-    status = _libhip.hipMemcpy(
-        dst, src, ctypes.c_size_t(count), hipMemcpyHostToDevice)
+    Parameters
+    ----------
+    dst : ctypes pointer
+        Device memory pointer on dstDevice.
+    dstDevice : int
+        Destination device.
+    src : ctypes pointer
+        Device memory pointer on srcDevice.
+    srcDevice : int
+        Source device.
+    count : int
+        Number of bytes to copy.
+    stream : ctypes pointer
+        Stream on which command is to be enqueued
+    """
+    status = _libhip.hipMemcpyPeerAsync(dst, dstDevice, src, srcDevice, count, stream)
     hipCheckStatus(status)
 
 
-def hipMemcpy_dtoh(dst, src, count):
+def _pitched_args(ptr, pitch, width, height, writable):
+    # Resolve a pitched host buffer and check the rows fit into it
+    ptr, nbytes, view = _host_buffer(ptr, writable)
+    if nbytes is not None and height and (height - 1) * pitch + width > nbytes:
+        raise ValueError(
+            f"{height} rows of {width} bytes with pitch {pitch} exceed buffer size {nbytes}"
+        )
+    return ptr, view
+
+
+_libhip.hipMemcpy2D.restype = int
+_libhip.hipMemcpy2D.argtypes = [
+    ctypes.c_void_p,  # dst
+    ctypes.c_size_t,  # dst pitch
+    ctypes.c_void_p,  # src
+    ctypes.c_size_t,  # src pitch
+    ctypes.c_size_t,  # width in bytes
+    ctypes.c_size_t,  # height
+    ctypes.c_int,  # kind
+]
+
+
+def hipMemcpy2D(dst, dpitch, src, spitch, width, height, kind=hipMemcpyDefault):
     """
-    Copy memory from device to host.
+    Copy a 2D region between pitched memory areas.
 
-    Copy data from device memory to host memory.
+    Copies height rows of width bytes, consecutive rows are dpitch and
+    spitch bytes apart.
 
     Parameters
     ----------
-    dst : ctypes pointer
-        Host memory pointer.
-    src : ctypes pointer
-        Device memory pointer.
-    count : int
-        Number of bytes to copy.
-
+    dst : ctypes pointer or buffer
+        Destination memory.
+    dpitch : int
+        Pitch of dst in bytes.
+    src : ctypes pointer or buffer
+        Source memory.
+    spitch : int
+        Pitch of src in bytes.
+    width : int
+        Width of a row in bytes.
+    height : int
+        Number of rows.
+    kind : int, optional
+        Direction of memcpy
     """
-
-    status = _libhip.hipMemcpy(
-        dst, src, ctypes.c_size_t(count), hipMemcpyDeviceToHost)
+    dst, _dst_view = _pitched_args(dst, dpitch, width, height, True)
+    src, _src_view = _pitched_args(src, spitch, width, height, False)
+    status = _libhip.hipMemcpy2D(dst, dpitch, src, spitch, width, height, kind)
     hipCheckStatus(status)
 
 
-_libhip.hipMemcpyAsync.restype = int
-_libhip.hipMemcpyAsync.argtypes = [
-    ctypes.c_void_p,
-    ctypes.c_void_p,
-    ctypes.c_size_t,
-    ctypes.c_int,
-    ctypes.c_void_p,
+_libhip.hipMemcpy2DAsync.restype = int
+_libhip.hipMemcpy2DAsync.argtypes = [
+    ctypes.c_void_p,  # dst
+    ctypes.c_size_t,  # dst pitch
+    ctypes.c_void_p,  # src
+    ctypes.c_size_t,  # src pitch
+    ctypes.c_size_t,  # width in bytes
+    ctypes.c_size_t,  # height
+    ctypes.c_int,  # kind
+    ctypes.c_void_p,  # stream
 ]
 
 
-def hipMemcpyAsync_htod(dst, src, count, stream):
+def hipMemcpy2DAsync(dst, dpitch, src, spitch, width, height, kind=hipMemcpyDefault,
+                     stream=None):
     """
-    Copy memory from host to device via a stream.
+    Copy a 2D region between pitched memory areas via a stream.
 
     Parameters
     ----------
-    dst : ctypes pointer
-        Device memory pointer.
-    src : ctypes pointer
-        Host memory pointer.
-    count : int
-        Number of bytes to copy.
+    dst : ctypes pointer or buffer
+        Destination memory.
+    dpitch : int
+        Pitch of dst in bytes.
+    src : ctypes pointer or buffer
+        Source memory.
+    spitch : int
+        Pitch of src in bytes.
+    width : int
+        Width of a row in bytes.
+    height : int
+        Number of rows.
+    kind : int, optional
+        Direction of memcpy
     stream : ctypes pointer
         Stream on which command is to be enqueued
-
     """
-    status = _libhip.hipMemcpyAsync(
-        dst, src, ctypes.c_size_t(count), hipMemcpyHostToDevice, stream
+    dst, _dst_view = _pitched_args(dst, dpitch, width, height, True)
+    src, _src_view = _pitched_args(src, spitch, width, height, False)
+    status = _libhip.hipMemcpy2DAsync(
+        dst, dpitch, src, spitch, width, height, kind, stream
     )
     hipCheckStatus(status)
 
 
-def hipMemcpyAsync_dtoh(dst, src, count, stream):
+_libhip.hipMemcpy3D.restype = int
+_libhip.hipMemcpy3D.argtypes = [ctypes.POINTER(hipMemcpy3DParms)]
+
+
+def hipMemcpy3D(params):
     """
-    Copy memory from device to host.
+    Copy a 3D region between pitched memory areas.
 
     Parameters
     ----------
-    dst : ctypes pointer
-        Host memory pointer.
-    src : ctypes pointer
-        Device memory pointer.
-    count : int
-        Number of bytes to copy.
-    stream : ctypes pointer
-        Stream on which command is to be enqueued
-
+    params : hipMemcpy3DParms
+        Source, destination, extent and kind of the copy. For linear memory
+        srcPtr/dstPtr hold pointer, pitch and rows per slice (ysize), the
+        extent width is in bytes.
     """
-
-    status = _libhip.hipMemcpyAsync(
-        dst, src, ctypes.c_size_t(count), hipMemcpyDeviceToHost, stream
-    )
+    status = _libhip.hipMemcpy3D(ctypes.byref(params))
     hipCheckStatus(status)
 
 
-def hipMemcpyAsync(dst, src, count, direction, stream):
+_libhip.hipMemcpy3DAsync.restype = int
+_libhip.hipMemcpy3DAsync.argtypes = [
+    ctypes.POINTER(hipMemcpy3DParms),
+    ctypes.c_void_p,
+]
+
+
+def hipMemcpy3DAsync(params, stream=None):
     """
-    Copy memory from src to dst.
+    Copy a 3D region between pitched memory areas via a stream.
 
     Parameters
     ----------
-    dst : ctypes pointer
-        Host memory pointer.
-    src : ctypes pointer
-        Device memory pointer.
-    count : int
-        Number of bytes to copy.
-    direction: int
-        Direction of memcpy
+    params : hipMemcpy3DParms
+        Source, destination, extent and kind of the copy.
     stream : ctypes pointer
         Stream on which command is to be enqueued
-
     """
-    status = _libhip.hipMemcpyAsync(
-        dst, src, ctypes.c_size_t(count), direction, stream)
+    status = _libhip.hipMemcpy3DAsync(ctypes.byref(params), stream)
     hipCheckStatus(status)
 
 
@@ -812,6 +2485,77 @@ def hipGetDevice():
     return dev.value
 
 
+# Peer access errors
+hipErrorPeerAccessAlreadyEnabled = 704
+hipErrorPeerAccessNotEnabled = 705
+
+_libhip.hipDeviceCanAccessPeer.restype = int
+_libhip.hipDeviceCanAccessPeer.argtypes = [
+    ctypes.POINTER(ctypes.c_int),
+    ctypes.c_int,  # device
+    ctypes.c_int,
+]  # peer device
+
+
+def hipDeviceCanAccessPeer(deviceId, peerDeviceId):
+    """
+    Check whether a device can access the memory of a peer device.
+
+    Parameters
+    ----------
+    deviceId : int
+        Device doing the access.
+    peerDeviceId : int
+        Device owning the memory.
+
+    Returns
+    -------
+    can_access : bool
+    """
+    can_access = ctypes.c_int()
+    status = _libhip.hipDeviceCanAccessPeer(
+        ctypes.byref(can_access), deviceId, peerDeviceId
+    )
+    hipCheckStatus(status)
+    return bool(can_access.value)
+
+
+_libhip.hipDeviceEnablePeerAccess.restype = int
+_libhip.hipDeviceEnablePeerAccess.argtypes = [ctypes.c_int, ctypes.c_uint]
+
+
+def hipDeviceEnablePeerAccess(peerDeviceId, flags=0):
+    """
+    Let the current device access the memory of a peer device.
+
+    Parameters
+    ----------
+    peerDeviceId : int
+        Device owning the memory.
+    flags : int, optional
+        Reserved, must be 0.
+    """
+    status = _libhip.hipDeviceEnablePeerAccess(peerDeviceId, flags)
+    hipCheckStatus(status)
+
+
+_libhip.hipDeviceDisablePeerAccess.restype = int
+_libhip.hipDeviceDisablePeerAccess.argtypes = [ctypes.c_int]
+
+
+def hipDeviceDisablePeerAccess(peerDeviceId):
+    """
+    Stop the current device from accessing the memory of a peer device.
+
+    Parameters
+    ----------
+    peerDeviceId : int
+        Device owning the memory.
+    """
+    status = _libhip.hipDeviceDisablePeerAccess(peerDeviceId)
+    hipCheckStatus(status)
+
+
 class hipDeviceArch(ctypes.Structure):
     _fields_ = [
         # *32-bit Atomics*
@@ -1200,6 +2944,22 @@ _libhip.hipModuleLaunchKernel.argtypes = [
 ]  # extra
 
 
+# Markers of the extra argument of hipModuleLaunchKernel
+HIP_LAUNCH_PARAM_BUFFER_POINTER = 1
+HIP_LAUNCH_PARAM_BUFFER_SIZE = 2
+
+
+def hipLaunchParamEnd():
+    """
+    Not a traditional HIP API
+
+    Returns: HIP_LAUNCH_PARAM_END marker, it differs between amd and nvidia
+    """
+    if _libhip.platform == "amd":
+        return 3
+    return 0
+
+
 def hipModuleLaunchKernel(kernel, bx, by, bz, tx, ty, tz, shared, stream, struct):
     """
     Launch the kernel
@@ -1227,38 +2987,321 @@ def hipModuleLaunchKernel(kernel, bx, by, bz, tx, ty, tz, shared, stream, struct
     struct : ctypes structure
         struct of packed up arguments of kernel
     """
-    c_bx = ctypes.c_uint(bx)
-    c_by = ctypes.c_uint(by)
-    c_bz = ctypes.c_uint(bz)
-    c_tx = ctypes.c_uint(tx)
-    c_ty = ctypes.c_uint(ty)
-    c_tz = ctypes.c_uint(tz)
-    c_shared = ctypes.c_uint(shared)
-
-    ctypes.sizeof(struct)
-    hip_launch_param_buffer_ptr = ctypes.c_void_p(1)
-    hip_launch_param_buffer_size = ctypes.c_void_p(2)
-    hip_launch_param_buffer_end = ctypes.c_void_p(0)
-    if _hip_platform_name == "amd":
-        hip_launch_param_buffer_end = ctypes.c_void_p(3)
     size = ctypes.c_size_t(ctypes.sizeof(struct))
-    p_size = ctypes.c_void_p(ctypes.addressof(size))
-    p_struct = ctypes.c_void_p(ctypes.addressof(struct))
     config = (ctypes.c_void_p * 5)(
-        hip_launch_param_buffer_ptr,
-        p_struct,
-        hip_launch_param_buffer_size,
-        p_size,
-        hip_launch_param_buffer_end,
+        HIP_LAUNCH_PARAM_BUFFER_POINTER,
+        ctypes.addressof(struct),
+        HIP_LAUNCH_PARAM_BUFFER_SIZE,
+        ctypes.addressof(size),
+        hipLaunchParamEnd(),
     )
-    nullptr = ctypes.POINTER(ctypes.c_void_p)(ctypes.c_void_p(0))
 
     status = _libhip.hipModuleLaunchKernel(
-        kernel, c_bx, c_by, c_bz, c_tx, c_ty, c_tz, c_shared, stream, None, config
+        kernel, bx, by, bz, tx, ty, tz, shared, stream, None, config
+    )
+    hipCheckStatus(status)
+
+
+# Graph management
+
+# Stream capture modes
+hipStreamCaptureModeGlobal = 0
+hipStreamCaptureModeThreadLocal = 1
+hipStreamCaptureModeRelaxed = 2
+
+# Graph node types
+hipGraphNodeTypeKernel = 0
+hipGraphNodeTypeMemcpy = 1
+hipGraphNodeTypeMemset = 2
+hipGraphNodeTypeHost = 3
+
+
+class dim3(ctypes.Structure):
+    """dim3"""
+
+    _fields_ = [("x", ctypes.c_uint), ("y", ctypes.c_uint), ("z", ctypes.c_uint)]
+
+
+class hipKernelNodeParams(ctypes.Structure):
+    """hipKernelNodeParams"""
+
+    _fields_ = [
+        ("blockDim", dim3),
+        ("extra", ctypes.POINTER(ctypes.c_void_p)),
+        ("func", ctypes.c_void_p),
+        ("gridDim", dim3),
+        ("kernelParams", ctypes.POINTER(ctypes.c_void_p)),
+        ("sharedMemBytes", ctypes.c_uint),
+    ]
+
+
+_libhip.hipStreamBeginCapture.restype = int
+_libhip.hipStreamBeginCapture.argtypes = [ctypes.c_void_p, ctypes.c_int]
+
+
+def hipStreamBeginCapture(stream, mode=hipStreamCaptureModeGlobal):
+    """
+    Begin capturing the work enqueued on a stream into a graph.
+
+    Parameters
+    ----------
+    stream : ctypes pointer
+        Stream to capture, not the null stream.
+    mode : int, optional
+        hipStreamCaptureModeGlobal, hipStreamCaptureModeThreadLocal or
+        hipStreamCaptureModeRelaxed.
+    """
+    status = _libhip.hipStreamBeginCapture(stream, mode)
+    hipCheckStatus(status)
+
+
+_libhip.hipStreamEndCapture.restype = int
+_libhip.hipStreamEndCapture.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_void_p)]
+
+
+def hipStreamEndCapture(stream):
+    """
+    End capturing a stream.
+
+    Parameters
+    ----------
+    stream : ctypes pointer
+        Stream being captured.
+
+    Returns
+    -------
+    graph : ctypes pointer
+        Graph of the captured work, release it with hipGraphDestroy.
+    """
+    graph = ctypes.c_void_p()
+    status = _libhip.hipStreamEndCapture(stream, ctypes.byref(graph))
+    hipCheckStatus(status)
+    return graph
+
+
+_libhip.hipGraphDestroy.restype = int
+_libhip.hipGraphDestroy.argtypes = [ctypes.c_void_p]
+
+
+def hipGraphDestroy(graph):
+    """
+    Destroy a graph.
+
+    Parameters
+    ----------
+    graph : ctypes pointer
+        Graph to destroy.
+    """
+    status = _libhip.hipGraphDestroy(graph)
+    hipCheckStatus(status)
+
+
+_libhip.hipGraphGetNodes.restype = int
+_libhip.hipGraphGetNodes.argtypes = [
+    ctypes.c_void_p,  # graph
+    ctypes.POINTER(ctypes.c_void_p),  # nodes
+    ctypes.POINTER(ctypes.c_size_t),
+]  # number of nodes
+
+
+def hipGraphGetNodes(graph):
+    """
+    Get the nodes of a graph.
+
+    Parameters
+    ----------
+    graph : ctypes pointer
+        Graph to query.
+
+    Returns
+    -------
+    nodes : list of ctypes pointer
+    """
+    count = ctypes.c_size_t()
+    status = _libhip.hipGraphGetNodes(graph, None, ctypes.byref(count))
+    hipCheckStatus(status)
+    nodes = (ctypes.c_void_p * count.value)()
+    status = _libhip.hipGraphGetNodes(graph, nodes, ctypes.byref(count))
+    hipCheckStatus(status)
+    return [ctypes.c_void_p(node) for node in nodes[:count.value]]
+
+
+_libhip.hipGraphNodeGetDependencies.restype = int
+_libhip.hipGraphNodeGetDependencies.argtypes = [
+    ctypes.c_void_p,  # node
+    ctypes.POINTER(ctypes.c_void_p),  # dependencies
+    ctypes.POINTER(ctypes.c_size_t),
+]  # number of dependencies
+
+
+def hipGraphNodeGetDependencies(node):
+    """
+    Get the nodes a graph node depends on.
+
+    Parameters
+    ----------
+    node : ctypes pointer
+        Graph node.
+
+    Returns
+    -------
+    dependencies : list of ctypes pointer
+    """
+    count = ctypes.c_size_t()
+    status = _libhip.hipGraphNodeGetDependencies(node, None, ctypes.byref(count))
+    hipCheckStatus(status)
+    dependencies = (ctypes.c_void_p * count.value)()
+    status = _libhip.hipGraphNodeGetDependencies(node, dependencies, ctypes.byref(count))
+    hipCheckStatus(status)
+    return [ctypes.c_void_p(dependency) for dependency in dependencies[:count.value]]
+
+
+_libhip.hipGraphNodeGetType.restype = int
+_libhip.hipGraphNodeGetType.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_int)]
+
+
+def hipGraphNodeGetType(node):
+    """
+    Get the type of a graph node.
+
+    Parameters
+    ----------
+    node : ctypes pointer
+        Graph node.
+
+    Returns
+    -------
+    type : int
+        hipGraphNodeTypeKernel, hipGraphNodeTypeMemcpy, ...
+    """
+    node_type = ctypes.c_int()
+    status = _libhip.hipGraphNodeGetType(node, ctypes.byref(node_type))
+    hipCheckStatus(status)
+    return node_type.value
+
+
+_libhip.hipGraphKernelNodeGetParams.restype = int
+_libhip.hipGraphKernelNodeGetParams.argtypes = [
+    ctypes.c_void_p,
+    ctypes.POINTER(hipKernelNodeParams),
+]
+
+
+def hipGraphKernelNodeGetParams(node):
+    """
+    Get the launch parameters of a kernel node.
+
+    Parameters
+    ----------
+    node : ctypes pointer
+        Kernel node.
+
+    Returns
+    -------
+    params : hipKernelNodeParams
+    """
+    params = hipKernelNodeParams()
+    status = _libhip.hipGraphKernelNodeGetParams(node, ctypes.byref(params))
+    hipCheckStatus(status)
+    return params
+
+
+_libhip.hipGraphInstantiate.restype = int
+_libhip.hipGraphInstantiate.argtypes = [
+    ctypes.POINTER(ctypes.c_void_p),  # graph exec
+    ctypes.c_void_p,  # graph
+    ctypes.POINTER(ctypes.c_void_p),  # error node
+    ctypes.c_char_p,  # log buffer
+    ctypes.c_size_t,
+]  # log buffer size
+
+
+def hipGraphInstantiate(graph):
+    """
+    Create an executable graph from a graph.
+
+    Parameters
+    ----------
+    graph : ctypes pointer
+        Graph to instantiate, it can be destroyed afterwards.
+
+    Returns
+    -------
+    graph_exec : ctypes pointer
+        Executable graph, release it with hipGraphExecDestroy.
+    """
+    graph_exec = ctypes.c_void_p()
+    status = _libhip.hipGraphInstantiate(ctypes.byref(graph_exec), graph, None, None, 0)
+    hipCheckStatus(status)
+    return graph_exec
+
+
+_libhip.hipGraphLaunch.restype = int
+_libhip.hipGraphLaunch.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+
+
+def hipGraphLaunch(graph_exec, stream=None):
+    """
+    Launch an executable graph on a stream.
+
+    Parameters
+    ----------
+    graph_exec : ctypes pointer
+        Executable graph.
+    stream : ctypes pointer, optional
+        Stream on which the graph is enqueued.
+    """
+    status = _libhip.hipGraphLaunch(graph_exec, stream)
+    hipCheckStatus(status)
+
+
+_libhip.hipGraphExecKernelNodeSetParams.restype = int
+_libhip.hipGraphExecKernelNodeSetParams.argtypes = [
+    ctypes.c_void_p,  # graph exec
+    ctypes.c_void_p,  # node
+    ctypes.POINTER(hipKernelNodeParams),
+]
+
+
+def hipGraphExecKernelNodeSetParams(graph_exec, node, params):
+    """
+    Update the launch parameters of a kernel node of an executable graph.
+
+    The function of the node cannot change. Later launches of graph_exec
+    use the new parameters, the graph the node comes from is unchanged.
+
+    Parameters
+    ----------
+    graph_exec : ctypes pointer
+        Executable graph.
+    node : ctypes pointer
+        Kernel node of the graph graph_exec was instantiated from.
+    params : hipKernelNodeParams
+        New launch parameters.
+    """
+    status = _libhip.hipGraphExecKernelNodeSetParams(
+        graph_exec, node, ctypes.byref(params)
     )
     hipCheckStatus(status)
 
 
+_libhip.hipGraphExecDestroy.restype = int
+_libhip.hipGraphExecDestroy.argtypes = [ctypes.c_void_p]
+
+
+def hipGraphExecDestroy(graph_exec):
+    """
+    Destroy an executable graph.
+
+    Parameters
+    ----------
+    graph_exec : ctypes pointer
+        Executable graph to destroy.
+    """
+    status = _libhip.hipGraphExecDestroy(graph_exec)
+    hipCheckStatus(status)
+
+
 _libhip.hipDeviceSynchronize.restype = int
 _libhip.hipDeviceSynchronize.argtypes = []
 
@@ -1297,7 +3340,7 @@ def hipGetPlatformName():
 
     Returns: platform name, amd or nvidia
     """
-    return _hip_platform_name
+    return _libhip.platform
 
 
 _libhip.hipGetDeviceCount.restype = int
@@ -1372,9 +3415,9 @@ def hipRuntimeGetVersion():
     return c_version.value
 
 
-if hipDriverGetVersion() < 50200000:
-    _libhip.hipDeviceSetLimit.restype = int
-    _libhip.hipDeviceSetLimit.argtypes = [ctypes.c_uint, ctypes.c_size_t]
+# Only resolved when called, so newer drivers are not queried at import time
+_libhip.hipDeviceSetLimit.restype = int
+_libhip.hipDeviceSetLimit.argtypes = [ctypes.c_uint, ctypes.c_size_t]
 
 
 def hipDeviceSetLimit(attribute, value):
@@ -5,35 +5,30 @@ import os
 import sys
 import ctypes
 
-_libhiprtc_libname = "libhiprtc.so"
-_libhiprtc_fallback_libname = "libamdhip64.so"  # Fall back library
-_libhiprtc_nv_libname = "libnvhip64.so"
-
-_libhiprtc = None
-if "linux" in sys.platform:
-    try:
-        _libhiprtc = ctypes.cdll.LoadLibrary(_libhiprtc_libname)
-    except:
-        try:
-            _libhiprtc = ctypes.cdll.LoadLibrary(_libhiprtc_fallback_libname)
-        except:
-            _libhiprtc = ctypes.cdll.LoadLibrary(_libhiprtc_nv_libname)
-    if _libhiprtc == None:
-        _libhiprtc = ctypes.cdll.LoadLibrary(_libhiprtc_fallback_libname)
-elif "win" in sys.platform:
-    try:
-        _libhiprtc_libname = "hiprtc0505.dll"
-        _libhiprtc = ctypes.cdll.LoadLibrary(
-            os.path.join(os.getenv("HIP_PATH"), "bin", _libhiprtc_libname)
-        )
-    except:
-        raise RuntimeError("hiprtc library not found")
-else:
-    # Currently we do not support windows, mainly because I do not have a windows build of hip
-    raise RuntimeError("Only linux/windows is supported")
-
-if _libhiprtc == None:
-    raise OSError("hiprtc library not found")
+from ._loader import LazyLibrary
+
+
+def _libhiprtc_candidates():
+    if "linux" in sys.platform:
+        return [
+            ("libhiprtc.so", "amd"),
+            ("libamdhip64.so", "amd"),  # Fall back library
+            ("libnvhip64.so", "nvidia"),
+        ]
+    elif "win" in sys.platform:
+        hip_path = os.getenv("HIP_PATH")
+        if hip_path is None:
+            raise RuntimeError("hiprtc library not found, HIP_PATH is not set")
+        return [(os.path.join(hip_path, "bin", "hiprtc0505.dll"), "amd")]
+    else:
+        raise RuntimeError("Only linux/windows is supported")
+
+
+# Opened on first use, set PYHIP_LIBHIPRTC_PATH or call
+# pyhip.load(hiprtc_path=...) to pick the library.
+_libhiprtc = LazyLibrary(
+    "PYHIP_LIBHIPRTC_PATH", _libhiprtc_candidates, "hiprtc library not found"
+)
 
 
 def POINTER(obj):
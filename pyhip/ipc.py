@@ -0,0 +1,192 @@
+"""
+Device buffers and events shared between processes
+"""
+
+import threading
+
+from . import hip
+
+_lock = threading.Lock()
+# handle -> [mapped pointer or opened event, reference count]
+_opened = {}
+
+
+def _acquire(handle, open_handle):
+    with _lock:
+        entry = _opened.get(handle)
+        if entry is None:
+            entry = _opened[handle] = [open_handle(handle), 0]
+        entry[1] += 1
+        return entry[0]
+
+
+def _release(handle, close_handle):
+    with _lock:
+        entry = _opened.get(handle)
+        if entry is None:
+            raise ValueError("handle is not open in this process")
+        entry[1] -= 1
+        if entry[1] == 0:
+            del _opened[handle]
+            close_handle(entry[0])
+
+
+class _Shared:
+    """
+    Picklable IPC handle with reference counted open/close.
+
+    A handle can only be opened once per process by the driver, every
+    open() of the same handle in a process shares that mapping, it is
+    closed when the last user calls close(). Only the handle travels when
+    pickled, the unpickled object starts closed.
+    """
+
+    def __init__(self, handle):
+        self.handle = handle
+        self._opens = 0
+
+    def __reduce__(self):
+        return type(self)._from_state, self._state()
+
+    def _state(self):
+        return (self.handle,)
+
+    @classmethod
+    def _from_state(cls, *state):
+        return cls(*state)
+
+    def open(self):
+        value = _acquire(self.handle, self._open_handle)
+        self._opens += 1
+        return value
+
+    def close(self):
+        """
+        Drop one reference taken by open().
+        """
+        if self._opens == 0:
+            raise ValueError(f"{type(self).__name__} is not open")
+        self._opens -= 1
+        _release(self.handle, self._close_handle)
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SharedBuffer(_Shared):
+    """
+    Device allocation exported to other processes.
+
+    The exporting process keeps ownership and must keep the allocation
+    alive while other processes use it. Consumers map it with zero copies.
+
+    Parameters
+    ----------
+    handle : hip.hipIpcMemHandle
+        Handle of the allocation.
+    nbytes : int
+        Size of the allocation.
+
+    Examples
+    --------
+    Producer:
+
+    >>> queue.put(SharedBuffer.export(ptr, nbytes))
+
+    Consumer:
+
+    >>> shared = queue.get()
+    >>> with shared as ptr:
+    ...     hip.hipMemcpy_dtoh(out, ptr, shared.nbytes)
+    """
+
+    def __init__(self, handle, nbytes):
+        super().__init__(handle)
+        self.nbytes = nbytes
+
+    def _state(self):
+        return (self.handle, self.nbytes)
+
+    @classmethod
+    def export(cls, ptr, nbytes):
+        """
+        Export a device allocation.
+
+        Parameters
+        ----------
+        ptr : ctypes pointer
+            Base pointer of an allocation made with hipMalloc.
+        nbytes : int
+            Size of the allocation.
+        """
+        return cls(hip.hipIpcGetMemHandle(ptr), nbytes)
+
+    @staticmethod
+    def _open_handle(handle):
+        return hip.hipIpcOpenMemHandle(handle)
+
+    @staticmethod
+    def _close_handle(ptr):
+        hip.hipIpcCloseMemHandle(ptr)
+
+    def open(self):
+        """
+        Map the allocation in this process.
+
+        Returns
+        -------
+        ptr : ctypes pointer
+            Device pointer, shared by all the opens of the handle in this
+            process.
+        """
+        return super().open()
+
+
+class SharedEvent(_Shared):
+    """
+    Event exported to other processes.
+
+    The event must be created with hipEventInterprocess and
+    hipEventDisableTiming. The producer records it after writing a shared
+    buffer, consumers wait on it before reading.
+
+    Parameters
+    ----------
+    handle : hip.hipIpcEventHandle
+        Handle of the event.
+
+    Examples
+    --------
+    >>> event = hip.hipEventCreateWithFlags(
+    ...     hip.hipEventInterprocess | hip.hipEventDisableTiming)
+    >>> queue.put(SharedEvent.export(event))
+    """
+
+    @classmethod
+    def export(cls, event):
+        """
+        Export an interprocess event.
+        """
+        return cls(hip.hipIpcGetEventHandle(event))
+
+    @staticmethod
+    def _open_handle(handle):
+        return hip.hipIpcOpenEventHandle(handle)
+
+    @staticmethod
+    def _close_handle(event):
+        hip.hipEventDestroy(event)
+
+    def open(self):
+        """
+        Open the event in this process.
+
+        Returns
+        -------
+        event : ctypes pointer
+            Event shared by all the opens of the handle in this process.
+        """
+        return super().open()
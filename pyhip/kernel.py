@@ -0,0 +1,355 @@
+"""
+Kernels with argument structs built from their signature
+"""
+
+import ctypes
+import re
+import threading
+
+from . import hip, hiprtc
+from .launch import PreparedLaunch
+
+# Type spec codes, struct module style
+_SPEC_TYPES = {
+    "P": ctypes.c_void_p,
+    "?": ctypes.c_bool,
+    "b": ctypes.c_int8,
+    "B": ctypes.c_uint8,
+    "h": ctypes.c_int16,
+    "H": ctypes.c_uint16,
+    "i": ctypes.c_int32,
+    "I": ctypes.c_uint32,
+    "l": ctypes.c_long,
+    "L": ctypes.c_ulong,
+    "q": ctypes.c_int64,
+    "Q": ctypes.c_uint64,
+    "n": ctypes.c_ssize_t,
+    "N": ctypes.c_size_t,
+    "f": ctypes.c_float,
+    "d": ctypes.c_double,
+}
+
+# C parameter types, after dropping qualifiers
+_C_TYPES = {
+    "bool": ctypes.c_bool,
+    "char": ctypes.c_int8,
+    "signed char": ctypes.c_int8,
+    "unsigned char": ctypes.c_uint8,
+    "short": ctypes.c_short,
+    "short int": ctypes.c_short,
+    "unsigned short": ctypes.c_ushort,
+    "unsigned short int": ctypes.c_ushort,
+    "int": ctypes.c_int,
+    "signed": ctypes.c_int,
+    "signed int": ctypes.c_int,
+    "unsigned": ctypes.c_uint,
+    "unsigned int": ctypes.c_uint,
+    "long": ctypes.c_long,
+    "long int": ctypes.c_long,
+    "unsigned long": ctypes.c_ulong,
+    "unsigned long int": ctypes.c_ulong,
+    "long long": ctypes.c_longlong,
+    "long long int": ctypes.c_longlong,
+    "unsigned long long": ctypes.c_ulonglong,
+    "unsigned long long int": ctypes.c_ulonglong,
+    "int8_t": ctypes.c_int8,
+    "uint8_t": ctypes.c_uint8,
+    "int16_t": ctypes.c_int16,
+    "uint16_t": ctypes.c_uint16,
+    "int32_t": ctypes.c_int32,
+    "uint32_t": ctypes.c_uint32,
+    "int64_t": ctypes.c_int64,
+    "uint64_t": ctypes.c_uint64,
+    "size_t": ctypes.c_size_t,
+    "ssize_t": ctypes.c_ssize_t,
+    "ptrdiff_t": ctypes.c_ssize_t,
+    "float": ctypes.c_float,
+    "double": ctypes.c_double,
+}
+
+_QUALIFIERS = {"const", "volatile", "__restrict__", "__restrict", "restrict"}
+
+_LAUNCH_BOUNDS = r"(?:__launch_bounds__\s*\([^)]*\)\s*)?"
+_SIGNATURE = re.compile(
+    r'(extern\s+"C"\s+)?__global__\s+' + _LAUNCH_BOUNDS + r"void\s+" + _LAUNCH_BOUNDS
+    + r"(\w+)\s*\(([^)]*)\)"
+)
+_EXTERN_C_BLOCK = re.compile(r'extern\s+"C"\s*\{')
+_COMMENT = re.compile(r"//[^\n]*|/\*.*?\*/", re.DOTALL)
+
+_INT_TYPES = (
+    ctypes.c_int8, ctypes.c_uint8, ctypes.c_int16, ctypes.c_uint16,
+    ctypes.c_int32, ctypes.c_uint32, ctypes.c_int64, ctypes.c_uint64,
+    ctypes.c_long, ctypes.c_ulong, ctypes.c_ssize_t, ctypes.c_size_t,
+)
+
+_structs_lock = threading.Lock()
+_structs = {}  # tuple of ctypes types -> argument struct class
+
+
+def parse_spec(spec):
+    """
+    Argument types of a compact type spec.
+
+    Parameters
+    ----------
+    spec : str
+        Comma separated codes, P for any pointer and the struct module
+        codes ? b B h H i I l L q Q n N f d for scalars, e.g. "P,i,i,Q".
+
+    Returns
+    -------
+    types : tuple of ctypes types
+    """
+    types = []
+    for code in spec.split(","):
+        code = code.strip()
+        if code not in _SPEC_TYPES:
+            raise ValueError(f"unknown type code {code!r} in spec {spec!r}")
+        types.append(_SPEC_TYPES[code])
+    return tuple(types)
+
+
+def _parameter_type(parameter):
+    if "*" in parameter or "[" in parameter:
+        return ctypes.c_void_p
+    if re.search(r"[^\w\s]", parameter):
+        # references, templates, default values
+        raise ValueError(
+            f"unsupported kernel parameter {parameter.strip()!r}, pass a type spec"
+        )
+    words = [word for word in parameter.split() if word not in _QUALIFIERS]
+    c_type = " ".join(words)
+    if c_type not in _C_TYPES:
+        # Drop the parameter name
+        c_type = " ".join(words[:-1])
+    if c_type not in _C_TYPES:
+        raise ValueError(
+            f"unsupported kernel parameter {parameter.strip()!r}, pass a type spec"
+        )
+    return _C_TYPES[c_type]
+
+
+def _extern_c_blocks(source):
+    # (start, end) of the extern "C" { ... } blocks
+    blocks = []
+    for match in _EXTERN_C_BLOCK.finditer(source):
+        depth = 1
+        index = match.end()
+        while depth and index < len(source):
+            if source[index] == "{":
+                depth += 1
+            elif source[index] == "}":
+                depth -= 1
+            index += 1
+        blocks.append((match.end(), index))
+    return blocks
+
+
+def parse_signature(source, name):
+    """
+    Argument types of an extern "C" __global__ kernel in source.
+
+    Pointers of any type map to c_void_p, scalar parameters to the
+    matching ctypes type. Structs passed by value and templates are not
+    supported, use a type spec for those kernels.
+
+    Parameters
+    ----------
+    source : str
+        Kernel source.
+    name : str
+        Kernel name.
+
+    Returns
+    -------
+    types : tuple of ctypes types
+    """
+    source = _COMMENT.sub(" ", source)
+    blocks = None
+    for match in _SIGNATURE.finditer(source):
+        if match.group(2) != name:
+            continue
+        if match.group(1) is None:
+            if blocks is None:
+                blocks = _extern_c_blocks(source)
+            if not any(start <= match.start() < end for start, end in blocks):
+                raise ValueError(
+                    f'kernel {name} is not extern "C", its name is mangled'
+                )
+        parameters = match.group(3).strip()
+        if not parameters or parameters == "void":
+            return ()
+        return tuple(_parameter_type(parameter) for parameter in parameters.split(","))
+    raise ValueError(f'no extern "C" __global__ kernel {name} in source')
+
+
+def argument_struct(types):
+    """
+    ctypes structure with one field per kernel argument, cached per list
+    of types.
+
+    Fields are laid out with their natural alignment, like the kernel
+    argument buffer.
+    """
+    types = tuple(types)
+    with _structs_lock:
+        struct = _structs.get(types)
+        if struct is None:
+            struct = type(
+                "KernelArgs",
+                (ctypes.Structure,),
+                {"_fields_": [(f"arg{i}", t) for i, t in enumerate(types)]},
+            )
+            _structs[types] = struct
+        return struct
+
+
+def _check(index, c_type, value):
+    # ctypes rejects DeviceArrays and c_void_p for c_void_p fields, unwrap
+    # them, and check scalars here to report the argument index
+    if c_type is ctypes.c_void_p:
+        if hasattr(value, "_as_parameter_"):
+            value = value._as_parameter_
+        if isinstance(value, ctypes.c_void_p):
+            return value.value
+        if value is None or isinstance(value, int):
+            return value
+        raise TypeError(f"argument {index} must be a device pointer, got {type(value).__name__}")
+    if c_type in _INT_TYPES:
+        if not isinstance(value, int):
+            raise TypeError(f"argument {index} must be an int, got {type(value).__name__}")
+    elif c_type in (ctypes.c_float, ctypes.c_double):
+        if not isinstance(value, (int, float)):
+            raise TypeError(f"argument {index} must be a number, got {type(value).__name__}")
+    return value
+
+
+def _dims(dims):
+    if isinstance(dims, int):
+        return (dims, 1, 1)
+    dims = tuple(dims)
+    if not 1 <= len(dims) <= 3:
+        raise ValueError(f"expected 1 to 3 dims, got {dims}")
+    return dims + (1,) * (3 - len(dims))
+
+
+class Kernel:
+    """
+    Kernel function with a cached argument struct.
+
+    The argument struct class is built once from the kernel signature or
+    a type spec, launches pack the arguments into it after checking their
+    number and types.
+
+    Parameters
+    ----------
+    function : ctypes pointer
+        Kernel from hip.hipModuleGetFunction.
+    types : str or sequence of ctypes types
+        Type spec like "P,i,i,Q", see parse_spec, or the argument types.
+    name : str, optional
+        Kernel name used in error messages.
+
+    Examples
+    --------
+    >>> axpy = Kernel.from_source(source, "axpy")
+    >>> axpy((blocks,), (1024,), ptr, 2, 3, size, stream=stream)
+    """
+
+    def __init__(self, function, types, name=None):
+        if isinstance(types, str):
+            types = parse_spec(types)
+        self.function = function
+        self.types = tuple(types)
+        self.name = name or "kernel"
+        self.struct_type = argument_struct(self.types)
+        self.module = None
+
+    @classmethod
+    def from_source(cls, source, name, options=None, types=None):
+        """
+        Compile source with hiprtc and get kernel name from it.
+
+        The argument types come from the extern "C" __global__ signature
+        of name in source unless given.
+
+        Parameters
+        ----------
+        source : str
+            Kernel source.
+        name : str
+            Kernel name.
+        options : list of str, optional
+            hiprtc options, --offload-arch of the current device is added
+            on amd.
+        types : str or sequence of ctypes types, optional
+            Argument types, for kernels parse_signature does not support.
+
+        Returns
+        -------
+        kernel : Kernel
+        """
+        if types is None:
+            types = parse_signature(source, name)
+        options = list(options or [])
+        if hip.hipGetPlatformName() == "amd" and not any(
+            option.startswith("--offload-arch") for option in options
+        ):
+            arch = hip.hipGetDeviceProperties(hip.hipGetDevice()).gcnArchName
+            options.append(f"--offload-arch={arch}")
+        prog = hiprtc.hiprtcCreateProgram(source, name, [], [])
+        try:
+            hiprtc.hiprtcCompileProgram(prog, options)
+            code = hiprtc.hiprtcGetCode(prog)
+        finally:
+            hiprtc.hiprtcDestroyProgram(prog)
+        module = hip.hipModuleLoadData(code)
+        kernel = cls(hip.hipModuleGetFunction(module, name), types, name)
+        kernel.module = module
+        return kernel
+
+    def _values(self, args):
+        if len(args) != len(self.types):
+            raise TypeError(
+                f"{self.name}() takes {len(self.types)} arguments ({len(args)} given)"
+            )
+        return [_check(i, t, value) for i, (t, value) in enumerate(zip(self.types, args))]
+
+    def pack(self, *args):
+        """
+        Check the arguments and pack them into a new argument struct.
+        """
+        return self.struct_type(*self._values(args))
+
+    def __call__(self, grid, block, *args, stream=None, shared=0):
+        """
+        Launch the kernel.
+
+        Parameters
+        ----------
+        grid : int or tuple of int
+            grid dims (x, y, z), missing dims default to 1
+        block : int or tuple of int
+            block dims (x, y, z), missing dims default to 1
+        args :
+            Kernel arguments, device pointers may be ints, ctypes pointers
+            or DeviceArrays.
+        stream : ctypes pointer, optional
+            stream object
+        shared : int, optional
+            shared mem
+        """
+        struct = self.pack(*args)
+        hip.hipModuleLaunchKernel(
+            self.function, *_dims(grid), *_dims(block), shared, stream, struct
+        )
+
+    def prepare(self, grid, block, *args, stream=None, shared=0):
+        """
+        PreparedLaunch of the kernel, for launches repeated in a loop.
+        """
+        return PreparedLaunch(
+            self.function, _dims(grid), _dims(block), self.struct_type, shared, stream,
+            args=self._values(args),
+        )
@@ -0,0 +1,137 @@
+"""
+Prepared kernel launches
+"""
+
+import ctypes
+
+from . import hip
+
+
+class PreparedLaunch:
+    """
+    Kernel launch with preallocated launch parameters.
+
+    hip.hipModuleLaunchKernel builds the argument size and the
+    HIP_LAUNCH_PARAM config array on every call. A prepared launch builds
+    them once, the argument struct is kept and can be updated in place
+    between launches.
+
+    Parameters
+    ----------
+    kernel : ctypes ptr
+        kernel from loaded module
+    grid : tuple of int
+        grid dims (x, y, z), missing dims default to 1
+    block : tuple of int
+        block dims (x, y, z), missing dims default to 1
+    struct_type : ctypes structure type
+        struct type of the packed up arguments of kernel
+    shared : int, optional
+        shared mem
+    stream : ctype void ptr, optional
+        stream object
+    args : optional
+        initial values of the struct fields, in field order
+
+    Examples
+    --------
+    >>> launch = PreparedLaunch(kernel, (blocks,), (1024,), PackageStruct)
+    >>> launch.args.a = ptr
+    >>> launch.args.size = size
+    >>> launch()
+    """
+
+    def __init__(self, kernel, grid, block, struct_type, shared=0, stream=None, args=()):
+        self._grid = _dim3(grid)
+        self._block = _dim3(block)
+        self._shared = ctypes.c_uint(shared)
+        self._stream = stream
+        self.kernel = kernel
+        self.args = struct_type(*args)
+        self._size = ctypes.c_size_t(ctypes.sizeof(struct_type))
+        self._config = (ctypes.c_void_p * 5)(
+            hip.HIP_LAUNCH_PARAM_BUFFER_POINTER,
+            ctypes.addressof(self.args),
+            hip.HIP_LAUNCH_PARAM_BUFFER_SIZE,
+            ctypes.addressof(self._size),
+            hip.hipLaunchParamEnd(),
+        )
+        self._update()
+
+    def _update(self):
+        self._launch_args = (
+            self.kernel,
+            *self._grid,
+            *self._block,
+            self._shared,
+            self._stream,
+            None,
+            self._config,
+        )
+
+    @property
+    def grid(self):
+        return tuple(d.value for d in self._grid)
+
+    @grid.setter
+    def grid(self, grid):
+        self._grid = _dim3(grid)
+        self._update()
+
+    @property
+    def block(self):
+        return tuple(d.value for d in self._block)
+
+    @block.setter
+    def block(self, block):
+        self._block = _dim3(block)
+        self._update()
+
+    @property
+    def shared(self):
+        return self._shared.value
+
+    @shared.setter
+    def shared(self, shared):
+        self._shared = ctypes.c_uint(shared)
+        self._update()
+
+    @property
+    def stream(self):
+        return self._stream
+
+    @stream.setter
+    def stream(self, stream):
+        self._stream = stream
+        self._update()
+
+    def set_args(self, *args, **kwargs):
+        """
+        Update kernel arguments in place.
+
+        Parameters
+        ----------
+        args :
+            values of the leading struct fields, in field order
+        kwargs :
+            values of struct fields by name
+        """
+        for (name, _), value in zip(self.args._fields_, args):
+            setattr(self.args, name, value)
+        for name, value in kwargs.items():
+            setattr(self.args, name, value)
+
+    def __call__(self):
+        """
+        Launch the kernel with the current arguments.
+        """
+        status = hip._libhip.hipModuleLaunchKernel(*self._launch_args)
+        hip.hipCheckStatus(status)
+
+
+def _dim3(dims):
+    dims = tuple(dims)
+    if not 1 <= len(dims) <= 3:
+        raise ValueError(f"expected 1 to 3 dims, got {dims}")
+    dims = dims + (1,) * (3 - len(dims))
+    return tuple(ctypes.c_uint(d) for d in dims)
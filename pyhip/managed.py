@@ -0,0 +1,156 @@
+"""
+Managed (unified) memory buffers
+"""
+
+import ctypes
+
+from . import hip
+
+
+class ManagedBuffer:
+    """
+    Managed memory buffer with prefetch and advice helpers.
+
+    The memory is accessible from the host and the devices, pages migrate on
+    demand. Prefetching ranges ahead of use and setting read-mostly or
+    preferred-location hints avoids page fault storms on large, sparsely
+    accessed arrays.
+
+    A ManagedBuffer can be passed directly to the hip functions and kernel
+    argument structs expecting a pointer.
+
+    Parameters
+    ----------
+    nbytes : int
+        Size of the buffer.
+    flags : int, optional
+        hipMemAttachGlobal or hipMemAttachHost.
+
+    Examples
+    --------
+    >>> buf = ManagedBuffer(1 << 30)
+    >>> buf.set_read_mostly()
+    >>> buf.prefetch(0, stream, offset=chunk_start, count=chunk_size)
+    >>> hip.hipModuleLaunchKernel(kernel, ..., stream, PackageStruct(buf.ptr))
+    >>> buf.prefetch_to_host(stream)
+    """
+
+    def __init__(self, nbytes, flags=hip.hipMemAttachGlobal):
+        self.nbytes = nbytes
+        self.ptr = hip.hipMallocManaged(max(nbytes, 1), flags)
+
+    @property
+    def _as_parameter_(self):
+        return self.ptr
+
+    def host(self):
+        """
+        Host view of the buffer.
+
+        Only valid to access once the device work using the buffer has been
+        synchronized.
+
+        Returns
+        -------
+        buf : ctypes.c_char array
+        """
+        return (ctypes.c_char * self.nbytes).from_address(self.ptr.value)
+
+    def _range(self, offset, count):
+        if count is None:
+            count = self.nbytes - offset
+        if offset < 0 or count < 0 or offset + count > self.nbytes:
+            raise ValueError(
+                f"range {offset}:{offset + count} is outside of the buffer of {self.nbytes} bytes"
+            )
+        return self.ptr.value + offset, count
+
+    def prefetch(self, device=None, stream=None, offset=0, count=None):
+        """
+        Migrate a range to a device ahead of use.
+
+        Parameters
+        ----------
+        device : int, optional
+            Destination device, the current device when omitted.
+            hip.hipCpuDeviceId prefetches to the host.
+        stream : ctypes pointer, optional
+            Stream the prefetch is ordered on.
+        offset : int, optional
+            Start of the range in bytes.
+        count : int, optional
+            Size of the range, defaults to the rest of the buffer.
+        """
+        if device is None:
+            device = hip.hipGetDevice()
+        ptr, count = self._range(offset, count)
+        hip.hipMemPrefetchAsync(ptr, count, device, stream)
+
+    def prefetch_to_host(self, stream=None, offset=0, count=None):
+        """
+        Migrate a range to the host ahead of host access.
+        """
+        self.prefetch(hip.hipCpuDeviceId, stream, offset, count)
+
+    def set_read_mostly(self, enable=True, offset=0, count=None):
+        """
+        Mark a range as mostly read, devices keep read-only copies of the
+        pages instead of migrating them.
+        """
+        ptr, count = self._range(offset, count)
+        advice = hip.hipMemAdviseSetReadMostly if enable else hip.hipMemAdviseUnsetReadMostly
+        # The device is ignored for read mostly advice
+        hip.hipMemAdvise(ptr, count, advice, hip.hipCpuDeviceId)
+
+    def set_preferred_location(self, device, offset=0, count=None):
+        """
+        Set the preferred location of a range, None unsets it.
+
+        Parameters
+        ----------
+        device : int or None
+            Device id, hip.hipCpuDeviceId for the host.
+        """
+        ptr, count = self._range(offset, count)
+        if device is None:
+            hip.hipMemAdvise(ptr, count, hip.hipMemAdviseUnsetPreferredLocation,
+                             hip.hipCpuDeviceId)
+        else:
+            hip.hipMemAdvise(ptr, count, hip.hipMemAdviseSetPreferredLocation, device)
+
+    def set_accessed_by(self, device, enable=True, offset=0, count=None):
+        """
+        Keep a range mapped in the page tables of a device.
+        """
+        ptr, count = self._range(offset, count)
+        advice = hip.hipMemAdviseSetAccessedBy if enable else hip.hipMemAdviseUnsetAccessedBy
+        hip.hipMemAdvise(ptr, count, advice, device)
+
+    @property
+    def read_mostly(self):
+        return bool(hip.hipMemRangeGetAttribute(
+            self.ptr, self.nbytes, hip.hipMemRangeAttributeReadMostly))
+
+    @property
+    def preferred_location(self):
+        return hip.hipMemRangeGetAttribute(
+            self.ptr, self.nbytes, hip.hipMemRangeAttributePreferredLocation)
+
+    @property
+    def last_prefetch_location(self):
+        return hip.hipMemRangeGetAttribute(
+            self.ptr, self.nbytes, hip.hipMemRangeAttributeLastPrefetchLocation)
+
+    def free(self):
+        """
+        Free the managed memory.
+        """
+        if self.ptr is not None:
+            hip.hipFree(self.ptr)
+            self.ptr = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.free()
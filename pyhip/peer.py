@@ -0,0 +1,134 @@
+"""
+Peer-to-peer copies between devices
+"""
+
+from . import hip
+from .allocator import PinnedBufferPool, _address
+
+
+class PeerTopology:
+    """
+    Peer access matrix of the devices and copy routing on top of it.
+
+    The matrix is queried with hipDeviceCanAccessPeer once, when the
+    topology is built, and peer access is enabled for every pair that
+    supports it. copy() then sends each device to device copy directly
+    with hipMemcpyPeerAsync when the pair has peer access, and through
+    pinned host staging buffers otherwise.
+
+    Parameters
+    ----------
+    devices : list of int, optional
+        Devices to include, all devices by default.
+    enable : bool, optional
+        Enable peer access for the pairs that support it.
+    staging_bytes : int, optional
+        Chunk size of staged copies.
+
+    Examples
+    --------
+    >>> topology = PeerTopology()
+    >>> topology.copy(d_dst, 1, d_src, 0, nbytes, stream)
+    """
+
+    def __init__(self, devices=None, enable=True, staging_bytes=8 << 20):
+        if devices is None:
+            devices = range(hip.hipGetDeviceCount())
+        self.devices = list(devices)
+        self.staging_bytes = staging_bytes
+        self.staging = PinnedBufferPool()
+        # (device, peer) -> peer access available
+        self._access = {}
+        for device in self.devices:
+            for peer in self.devices:
+                if peer != device:
+                    self._access[device, peer] = hip.hipDeviceCanAccessPeer(device, peer)
+        if enable:
+            self._enable()
+
+    def _enable(self):
+        current = hip.hipGetDevice()
+        try:
+            for (device, peer), access in self._access.items():
+                if not access:
+                    continue
+                hip.hipSetDevice(device)
+                status = hip._libhip.hipDeviceEnablePeerAccess(peer, 0)
+                if status != hip.hipErrorPeerAccessAlreadyEnabled:
+                    hip.hipCheckStatus(status)
+        finally:
+            hip.hipSetDevice(current)
+
+    def can_access(self, device, peer):
+        """
+        True if device can access the memory of peer directly.
+        """
+        if device == peer:
+            return True
+        return self._access[device, peer]
+
+    def direct(self, src_device, dst_device):
+        """
+        True if copies from src_device to dst_device skip host staging.
+        """
+        return self.can_access(src_device, dst_device) or self.can_access(
+            dst_device, src_device
+        )
+
+    def matrix(self):
+        """
+        Peer access matrix, matrix[i][j] is True if devices[i] can access
+        the memory of devices[j].
+        """
+        return [[self.can_access(i, j) for j in self.devices] for i in self.devices]
+
+    def copy(self, dst, dst_device, src, src_device, count, stream=None):
+        """
+        Copy count bytes between device allocations, asynchronously on
+        stream.
+
+        Parameters
+        ----------
+        dst : ctypes pointer
+            Device memory pointer on dst_device.
+        dst_device : int
+            Destination device.
+        src : ctypes pointer
+            Device memory pointer on src_device.
+        src_device : int
+            Source device.
+        count : int
+            Number of bytes to copy.
+        stream : ctypes pointer, optional
+            Stream on which the copy is enqueued.
+        """
+        if src_device == dst_device:
+            hip.hipMemcpyAsync(dst, src, count, hip.hipMemcpyDeviceToDevice, stream)
+        elif self.direct(src_device, dst_device):
+            hip.hipMemcpyPeerAsync(dst, dst_device, src, src_device, count, stream)
+        else:
+            self._copy_staged(dst, src, count, stream)
+
+    def _copy_staged(self, dst, src, count, stream):
+        # Both copies of a chunk are ordered on stream, so the staging
+        # buffer can be reused by the next chunk without a host sync
+        dst = _address(dst)
+        src = _address(src)
+        staging = self.staging.acquire(min(count, self.staging_bytes))
+        try:
+            for offset in range(0, count, self.staging_bytes):
+                nbytes = min(self.staging_bytes, count - offset)
+                hip.hipMemcpyAsync(
+                    staging, src + offset, nbytes, hip.hipMemcpyDeviceToHost, stream
+                )
+                hip.hipMemcpyAsync(
+                    dst + offset, staging, nbytes, hip.hipMemcpyHostToDevice, stream
+                )
+        finally:
+            self.staging.release(staging, stream)
+
+    def close(self):
+        """
+        Free the staging buffers.
+        """
+        self.staging.empty_cache()
@@ -0,0 +1,248 @@
+"""
+Multi-stream pipelines for datasets larger than device memory
+"""
+
+import collections
+import ctypes
+import time
+
+from . import hip
+
+
+class PipelineStats:
+    """
+    Per stage totals of a pipeline run.
+
+    Stage times are measured with events on the device, wall_s is the host
+    time of the whole run.
+    """
+
+    def __init__(self):
+        self.chunks = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.h2d_ms = 0.0
+        self.kernel_ms = 0.0
+        self.d2h_ms = 0.0
+        self.wall_s = 0.0
+
+    @staticmethod
+    def _gbps(nbytes, seconds):
+        return nbytes / seconds / 1e9 if seconds > 0 else 0.0
+
+    @property
+    def h2d_gbps(self):
+        return self._gbps(self.bytes_in, self.h2d_ms / 1e3)
+
+    @property
+    def kernel_gbps(self):
+        return self._gbps(self.bytes_in, self.kernel_ms / 1e3)
+
+    @property
+    def d2h_gbps(self):
+        return self._gbps(self.bytes_out, self.d2h_ms / 1e3)
+
+    @property
+    def gbps(self):
+        """End to end input throughput."""
+        return self._gbps(self.bytes_in, self.wall_s)
+
+    def __repr__(self):
+        return (
+            f"PipelineStats(chunks={self.chunks}, h2d={self.h2d_gbps:.2f} GB/s, "
+            f"kernel={self.kernel_gbps:.2f} GB/s, d2h={self.d2h_gbps:.2f} GB/s, "
+            f"total={self.gbps:.2f} GB/s)"
+        )
+
+
+class _Slot:
+    """
+    Device buffers, pinned staging buffers, stream and events of one
+    in-flight chunk.
+    """
+
+    def __init__(self, in_bytes, out_bytes, in_place):
+        self.stream = hip.hipStreamCreate()
+        self.d_in = hip.hipMalloc(in_bytes)
+        self.d_out = self.d_in if in_place else hip.hipMalloc(out_bytes)
+        self.h_in = _pinned(in_bytes)
+        self.h_out = _pinned(out_bytes)
+        self.start = hip.hipEventCreate()
+        self.copied_in = hip.hipEventCreate()
+        self.computed = hip.hipEventCreate()
+        self.done = hip.hipEventCreate()
+        self.in_nbytes = 0
+        self.out_nbytes = 0
+        self.in_place = in_place
+
+    def free(self):
+        hip.hipStreamSynchronize(self.stream)
+        for event in (self.start, self.copied_in, self.computed, self.done):
+            hip.hipEventDestroy(event)
+        hip.hipHostFree(self.h_in)
+        hip.hipHostFree(self.h_out)
+        if not self.in_place:
+            hip.hipFree(self.d_out)
+        hip.hipFree(self.d_in)
+        hip.hipStreamDestroy(self.stream)
+
+
+def _pinned(count):
+    ptr = hip.hipHostMalloc(max(count, 1))
+    return (ctypes.c_char * count).from_address(ptr.value)
+
+
+class StreamPipeline:
+    """
+    Overlapped host to device, kernel and device to host pipeline.
+
+    Chunks are rotated over depth slots, each with its own stream, device
+    buffers and pinned staging buffers. While one chunk is computed the next
+    is copied in and the previous copied out. Results come back in input
+    order.
+
+    Parameters
+    ----------
+    compute : callable
+        compute(d_in, d_out, nbytes, stream) enqueues the work of a chunk on
+        stream, for example with hipModuleLaunchKernel. d_in and d_out are
+        device pointers, nbytes is the chunk size.
+    chunk_bytes : int
+        Maximum chunk size, device and staging buffers are allocated for it.
+    depth : int, optional
+        Number of slots (streams) in flight.
+    output_size : callable, optional
+        output_size(nbytes) returns the result size of a chunk. When omitted
+        compute works in place and d_out is d_in.
+
+    Examples
+    --------
+    >>> def compute(d_in, d_out, nbytes, stream):
+    ...     hip.hipModuleLaunchKernel(kernel, nbytes // 4096 + 1, 1, 1, 1024, 1, 1,
+    ...                               0, stream, PackageStruct(d_in, nbytes // 4))
+    >>> with StreamPipeline(compute, 64 << 20, depth=3) as pipeline:
+    ...     for result in pipeline.run(data):
+    ...         out.write(result)
+    ...     print(pipeline.stats)
+    """
+
+    def __init__(self, compute, chunk_bytes, depth=2, output_size=None):
+        if depth < 1:
+            raise ValueError("depth must be at least 1")
+        self.compute = compute
+        self.chunk_bytes = chunk_bytes
+        self.depth = depth
+        self.output_size = output_size
+        self.stats = PipelineStats()
+        self._slots = None
+
+    def _allocate(self):
+        in_place = self.output_size is None
+        out_bytes = self.chunk_bytes if in_place else self.output_size(self.chunk_bytes)
+        self._slots = [
+            _Slot(self.chunk_bytes, out_bytes, in_place) for _ in range(self.depth)
+        ]
+
+    def _chunks(self, source):
+        try:
+            view = memoryview(source)
+        except TypeError:
+            return iter(source)
+        if not view.contiguous:
+            raise ValueError("source buffer must be contiguous")
+        view = view.cast("B")
+        return (
+            view[offset:offset + self.chunk_bytes]
+            for offset in range(0, view.nbytes, self.chunk_bytes)
+        )
+
+    def _submit(self, slot, chunk):
+        address, nbytes, view = hip._host_buffer(chunk)
+        if nbytes is None:
+            raise TypeError("chunks must support the buffer protocol")
+        if nbytes > self.chunk_bytes:
+            raise ValueError(f"chunk of {nbytes} bytes exceeds chunk_bytes {self.chunk_bytes}")
+        out_nbytes = nbytes if self.output_size is None else self.output_size(nbytes)
+        ctypes.memmove(slot.h_in, address, nbytes)
+        slot.in_nbytes = nbytes
+        slot.out_nbytes = out_nbytes
+
+        hip.hipEventRecord(slot.start, slot.stream)
+        hip.hipMemcpyAsync_htod(slot.d_in, slot.h_in, nbytes, slot.stream)
+        hip.hipEventRecord(slot.copied_in, slot.stream)
+        self.compute(slot.d_in, slot.d_out, nbytes, slot.stream)
+        hip.hipEventRecord(slot.computed, slot.stream)
+        hip.hipMemcpyAsync_dtoh(slot.h_out, slot.d_out, out_nbytes, slot.stream)
+        hip.hipEventRecord(slot.done, slot.stream)
+
+    def _finish(self, slot, copy):
+        hip.hipEventSynchronize(slot.done)
+        stats = self.stats
+        stats.chunks += 1
+        stats.bytes_in += slot.in_nbytes
+        stats.bytes_out += slot.out_nbytes
+        stats.h2d_ms += hip.hipEventElapsedTime(slot.start, slot.copied_in)
+        stats.kernel_ms += hip.hipEventElapsedTime(slot.copied_in, slot.computed)
+        stats.d2h_ms += hip.hipEventElapsedTime(slot.computed, slot.done)
+        result = memoryview(slot.h_out)[:slot.out_nbytes]
+        return result.tobytes() if copy else result
+
+    def run(self, source, copy=True):
+        """
+        Stream data through the pipeline.
+
+        Parameters
+        ----------
+        source : buffer or iterable of buffers
+            A single buffer protocol object is split into chunk_bytes
+            chunks, an iterable is taken as the chunks.
+        copy : bool, optional
+            Yield results as bytes. When False a memoryview of the pinned
+            staging buffer is yielded, it is only valid until the next
+            result is requested.
+
+        Yields
+        ------
+        result : bytes or memoryview
+            Result of each chunk, in input order.
+        """
+        if self._slots is None:
+            self._allocate()
+        start = time.perf_counter()
+        pending = collections.deque()
+        try:
+            for index, chunk in enumerate(self._chunks(source)):
+                slot = self._slots[index % self.depth]
+                if len(pending) == self.depth:
+                    # The oldest chunk is the one using this slot
+                    result = self._finish(pending.popleft(), copy)
+                    if copy:
+                        self._submit(slot, chunk)
+                        pending.append(slot)
+                        yield result
+                        continue
+                    yield result
+                self._submit(slot, chunk)
+                pending.append(slot)
+            while pending:
+                yield self._finish(pending.popleft(), copy)
+        finally:
+            # Never leave copies running on the staging buffers
+            for slot in pending:
+                hip.hipEventSynchronize(slot.done)
+            self.stats.wall_s += time.perf_counter() - start
+
+    def close(self):
+        """
+        Free streams, events, device and staging buffers.
+        """
+        if self._slots is not None:
+            for slot in self._slots:
+                slot.free()
+            self._slots = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
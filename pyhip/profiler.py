@@ -0,0 +1,274 @@
+"""
+Low overhead GPU timing of code regions with events
+
+Examples
+--------
+>>> from pyhip import profiler
+>>> with profiler.region("decode", stream):
+...     hip.hipModuleLaunchKernel(decode, ..., stream, args)
+>>> profiler.flush()
+>>> profiler.report()
+"""
+
+import contextlib
+import random
+import sys
+import threading
+
+from . import hip
+from .events import EventPool
+
+# Samples kept per region for percentiles, reservoir sampled beyond that
+_RESERVOIR_SIZE = 1024
+# Pending regions resolved without blocking once there are this many
+_AUTO_FLUSH = 1024
+
+
+class RegionStats:
+    """
+    Timing statistics of a named region, in milliseconds.
+
+    count, total, min and max are exact, percentiles come from a uniform
+    sample of at most _RESERVOIR_SIZE measurements.
+    """
+
+    __slots__ = ("name", "count", "total_ms", "min_ms", "max_ms", "_samples", "_sorted")
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = float("inf")
+        self.max_ms = 0.0
+        self._samples = []
+        self._sorted = True
+
+    def add(self, ms):
+        self.count += 1
+        self.total_ms += ms
+        if ms < self.min_ms:
+            self.min_ms = ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+        if len(self._samples) < _RESERVOIR_SIZE:
+            self._samples.append(ms)
+        else:
+            index = random.randrange(self.count)
+            if index < _RESERVOIR_SIZE:
+                self._samples[index] = ms
+        self._sorted = False
+
+    @property
+    def mean_ms(self):
+        return self.total_ms / self.count if self.count else 0.0
+
+    def percentile(self, q):
+        """
+        q-th percentile, 0 <= q <= 100, in milliseconds.
+        """
+        if not self._samples:
+            return 0.0
+        if not self._sorted:
+            self._samples.sort()
+            self._sorted = True
+        index = min(int(q / 100 * len(self._samples)), len(self._samples) - 1)
+        return self._samples[index]
+
+    @property
+    def p50_ms(self):
+        return self.percentile(50)
+
+    @property
+    def p99_ms(self):
+        return self.percentile(99)
+
+    def __repr__(self):
+        return (
+            f"RegionStats({self.name}, count={self.count}, min={self.min_ms:.3f}ms, "
+            f"mean={self.mean_ms:.3f}ms, p50={self.p50_ms:.3f}ms, "
+            f"p99={self.p99_ms:.3f}ms)"
+        )
+
+
+class Profiler:
+    """
+    Times regions of device work with recycled events.
+
+    region() records a start and an end event on the stream, nothing is
+    synchronized. The events come from an EventPool of timing events.
+    Elapsed times are read in bulk by flush(), which also returns the
+    events to the pool. When many regions are pending they are resolved
+    without blocking as they complete.
+
+    Parameters
+    ----------
+    enabled : bool, optional
+        When False, region() does nothing.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._events = None  # timing events, created on first use
+        self._pending = []  # (name, start, end)
+        self._stats = {}
+
+    def _acquire(self):
+        if self._events is None:
+            with self._lock:
+                if self._events is None:
+                    self._events = EventPool(
+                        flags=hip.hipEventDefault, max_idle=2 * _AUTO_FLUSH
+                    )
+        return self._events.acquire()
+
+    @contextlib.contextmanager
+    def region(self, name, stream=None):
+        """
+        Time the device work enqueued on stream inside the block.
+
+        Parameters
+        ----------
+        name : str
+            Region name, statistics are aggregated per name.
+        stream : ctypes pointer, optional
+            Stream the work is enqueued on.
+        """
+        if not self.enabled:
+            yield
+            return
+        start = self._acquire()
+        hip.hipEventRecord(start, stream)
+        try:
+            yield
+        finally:
+            end = self._acquire()
+            hip.hipEventRecord(end, stream)
+            with self._lock:
+                self._pending.append((name, start, end))
+                auto_flush = len(self._pending) >= _AUTO_FLUSH
+            if auto_flush:
+                self.flush(block=False)
+
+    def flush(self, block=True):
+        """
+        Resolve the pending regions into the statistics.
+
+        Parameters
+        ----------
+        block : bool, optional
+            Wait for all pending regions. When False only the completed
+            ones are resolved.
+        """
+        with self._lock:
+            pending = self._pending
+            self._pending = []
+        remaining = []
+        done = []
+        for name, start, end in pending:
+            if block:
+                hip.hipEventSynchronize(end)
+            elif not hip.hipEventQuery(end):
+                remaining.append((name, start, end))
+                continue
+            done.append((name, hip.hipEventElapsedTime(start, end)))
+            self._events.release(start)
+            self._events.release(end)
+        with self._lock:
+            self._pending = remaining + self._pending
+            for name, ms in done:
+                stats = self._stats.get(name)
+                if stats is None:
+                    stats = self._stats[name] = RegionStats(name)
+                stats.add(ms)
+
+    def stats(self):
+        """
+        Statistics per region name, of the regions flushed so far.
+
+        Returns
+        -------
+        stats : dict of str to RegionStats
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def report(self, file=None):
+        """
+        Flush and write a table of the statistics, slowest total first.
+
+        Parameters
+        ----------
+        file : file object, optional
+            Destination, stdout when omitted.
+        """
+        if file is None:
+            file = sys.stdout
+        self.flush()
+        print(
+            f"{'region':<24} {'count':>8} {'total ms':>10} {'min ms':>9} {'mean ms':>9} "
+            f"{'p50 ms':>9} {'p99 ms':>9}",
+            file=file,
+        )
+        for stats in sorted(self.stats().values(), key=lambda s: -s.total_ms):
+            print(
+                f"{stats.name:<24} {stats.count:>8} {stats.total_ms:>10.3f} "
+                f"{stats.min_ms:>9.3f} {stats.mean_ms:>9.3f} {stats.p50_ms:>9.3f} "
+                f"{stats.p99_ms:>9.3f}",
+                file=file,
+            )
+
+    def reset(self):
+        """
+        Flush and drop the statistics.
+        """
+        self.flush()
+        with self._lock:
+            self._stats.clear()
+
+    def close(self):
+        """
+        Flush and destroy the pooled events.
+        """
+        self.flush()
+        if self._events is not None:
+            self._events.close()
+
+
+# Process wide profiler behind the module functions
+default = Profiler()
+
+
+def region(name, stream=None):
+    """
+    Time a region with the default profiler, see Profiler.region.
+    """
+    return default.region(name, stream)
+
+
+def flush(block=True):
+    """
+    Flush the default profiler, see Profiler.flush.
+    """
+    default.flush(block)
+
+
+def stats():
+    """
+    Statistics of the default profiler, see Profiler.stats.
+    """
+    return default.stats()
+
+
+def report(file=None):
+    """
+    Report of the default profiler, see Profiler.report.
+    """
+    default.report(file)
+
+
+def reset():
+    """
+    Reset the default profiler, see Profiler.reset.
+    """
+    default.reset()
@@ -0,0 +1,146 @@
+"""
+Per-device pools of prioritized non-blocking streams
+"""
+
+import contextlib
+import threading
+
+from . import hip
+
+_PRIORITIES = ("high", "low")
+
+_pools_lock = threading.Lock()
+_pools = {}  # device -> StreamPool
+
+
+@contextlib.contextmanager
+def _on_device(device):
+    current = hip.hipGetDevice()
+    if current == device:
+        yield
+        return
+    hip.hipSetDevice(device)
+    try:
+        yield
+    finally:
+        hip.hipSetDevice(current)
+
+
+class StreamPool:
+    """
+    Fixed set of non-blocking streams of one device, handed out round-robin.
+
+    Creating and destroying a stream per request is expensive and streams
+    from hipStreamCreate synchronize with the null stream. The pool
+    creates size hipStreamNonBlocking streams per priority on first use,
+    at the greatest and least priority of the device, and reuses them.
+    Streams are shared: work of different users of a stream is
+    serialized, use an event or a dedicated stream when that matters.
+
+    Parameters
+    ----------
+    device : int, optional
+        Device of the streams, the current device by default.
+    size : int, optional
+        Number of streams per priority.
+
+    Examples
+    --------
+    >>> streams = stream_pool()
+    >>> stream = streams.get("high")
+    >>> hip.hipModuleLaunchKernel(kernel, ..., stream, args)
+    """
+
+    def __init__(self, device=None, size=4):
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        self.device = hip.hipGetDevice() if device is None else device
+        self.size = size
+        self._lock = threading.Lock()
+        self._streams = {}  # priority name -> list of streams
+        self._next = dict.fromkeys(_PRIORITIES, 0)
+        with _on_device(self.device):
+            self.least_priority, self.greatest_priority = (
+                hip.hipDeviceGetStreamPriorityRange()
+            )
+
+    def priority(self, name):
+        """
+        Numeric stream priority of "high" or "low".
+        """
+        if name not in _PRIORITIES:
+            raise ValueError(f"priority must be one of {_PRIORITIES}, got {name!r}")
+        return self.greatest_priority if name == "high" else self.least_priority
+
+    def _create(self, name):
+        value = self.priority(name)
+        with _on_device(self.device):
+            return [
+                hip.hipStreamCreateWithPriority(hip.hipStreamNonBlocking, value)
+                for _ in range(self.size)
+            ]
+
+    def get(self, priority="low"):
+        """
+        Next stream of the given priority.
+
+        Parameters
+        ----------
+        priority : str, optional
+            "high" for latency critical work, "low" for bulk work.
+
+        Returns
+        -------
+        stream : ctypes pointer
+            Stream owned by the pool, do not destroy it.
+        """
+        with self._lock:
+            streams = self._streams.get(priority)
+            if streams is None:
+                streams = self._streams[priority] = self._create(priority)
+            index = self._next[priority]
+            self._next[priority] = (index + 1) % self.size
+            return streams[index]
+
+    def synchronize(self):
+        """
+        Wait for the work of all the streams of the pool.
+        """
+        with self._lock:
+            streams = [stream for group in self._streams.values() for stream in group]
+        for stream in streams:
+            hip.hipStreamSynchronize(stream)
+
+    def close(self):
+        """
+        Synchronize and destroy the streams, the pool can be used again
+        afterwards and recreates them.
+        """
+        with self._lock:
+            streams = [stream for group in self._streams.values() for stream in group]
+            self._streams.clear()
+        for stream in streams:
+            hip.hipStreamSynchronize(stream)
+            hip.hipStreamDestroy(stream)
+
+
+def stream_pool(device=None):
+    """
+    Process wide StreamPool of a device.
+
+    Parameters
+    ----------
+    device : int, optional
+        Device, the current device by default.
+
+    Returns
+    -------
+    pool : StreamPool
+    """
+    if device is None:
+        device = hip.hipGetDevice()
+    with _pools_lock:
+        pool = _pools.get(device)
+        if pool is None:
+            pool = _pools[device] = StreamPool(device)
+        return pool
@@ -0,0 +1,285 @@
+"""
+Task graphs of copies, kernels and host functions run over several streams
+"""
+
+import collections
+
+from . import hip
+from .streams import stream_pool
+
+
+class Node:
+    """
+    Node of a TaskGraph, returned by the TaskGraph methods and passed as
+    dependency of later nodes.
+    """
+
+    __slots__ = ("graph", "index", "name", "host", "func", "args", "deps")
+
+    def __init__(self, graph, index, name, host, func, args, deps):
+        self.graph = graph
+        self.index = index
+        self.name = name
+        self.host = host
+        self.func = func
+        self.args = args
+        self.deps = deps
+
+    def __repr__(self):
+        kind = "host" if self.host else "device"
+        return f"Node({self.name or self.index}, {kind})"
+
+
+def _merge(clock, other):
+    for i, value in enumerate(other):
+        if value > clock[i]:
+            clock[i] = value
+
+
+class TaskGraph:
+    """
+    DAG of copies, kernels and host functions.
+
+    Nodes are declared with their dependencies, run() enqueues the whole
+    graph. The scheduler places a node on the stream of one of its
+    dependencies when that dependency is the last work of the stream,
+    otherwise on the stream that has been idle the longest, so independent
+    branches run concurrently. For dependencies on other streams it
+    inserts a hipStreamWaitEvent, except when the stream is already
+    ordered after the dependency through earlier waits. Each stream keeps
+    a vector clock of the work it is known to follow, and a wait merges
+    the clock of the awaited node.
+
+    Host nodes run on the calling thread during run(), after waiting for
+    their device dependencies, device nodes that are ready are enqueued
+    before them. Consecutive runs are ordered: every stream waits for
+    the previous run to finish on all the streams.
+
+    Parameters
+    ----------
+    streams : list of ctypes pointer, optional
+        Streams to schedule on, the low priority streams of the current
+        device's stream_pool() by default.
+
+    Examples
+    --------
+    >>> graph = TaskGraph()
+    >>> a = graph.copy(d_a, h_a, n, hip.hipMemcpyHostToDevice)
+    >>> b = graph.copy(d_b, h_b, n, hip.hipMemcpyHostToDevice)
+    >>> pa = graph.kernel(prep, (blocks,), (256,), PrepArgs(d_a, n), deps=[a])
+    >>> pb = graph.kernel(prep, (blocks,), (256,), PrepArgs(d_b, n), deps=[b])
+    >>> c = graph.kernel(combine, (blocks,), (256,), CombineArgs(d_a, d_b, n),
+    ...                  deps=[pa, pb])
+    >>> graph.copy(h_out, d_a, n, hip.hipMemcpyDeviceToHost, deps=[c])
+    >>> graph.run()
+    >>> graph.synchronize()
+    """
+
+    def __init__(self, streams=None):
+        if streams is None:
+            pool = stream_pool()
+            streams = [pool.get("low") for _ in range(pool.size)]
+        if not streams:
+            raise ValueError("at least one stream is required")
+        self.streams = list(streams)
+        self._nodes = []
+        self._plan = None
+        self._events = {}  # node index -> event recorded after the node
+        self._done = {}  # stream index -> event recorded at the end of a run
+
+    def _add(self, name, host, func, args, deps):
+        deps = tuple(deps)
+        for dep in deps:
+            if not isinstance(dep, Node) or dep.graph is not self:
+                raise ValueError(f"{dep!r} is not a node of this graph")
+        node = Node(self, len(self._nodes), name, host, func, args, deps)
+        self._nodes.append(node)
+        self._plan = None
+        return node
+
+    def add(self, func, *args, deps=(), name=None):
+        """
+        Add a device node, func(*args, stream) enqueues its work on stream.
+        """
+        return self._add(name, False, func, args, deps)
+
+    def copy(self, dst, src, count, direction=hip.hipMemcpyDefault, deps=(), name=None):
+        """
+        Add a hipMemcpyAsync node.
+        """
+        return self.add(hip.hipMemcpyAsync, dst, src, count, direction, deps=deps, name=name)
+
+    def memset(self, dst, value, sizeBytes, deps=(), name=None):
+        """
+        Add a hipMemsetAsync node.
+        """
+        return self.add(hip.hipMemsetAsync, dst, value, sizeBytes, deps=deps, name=name)
+
+    def kernel(self, kernel, grid, block, struct, shared=0, deps=(), name=None):
+        """
+        Add a hipModuleLaunchKernel node.
+
+        Parameters
+        ----------
+        kernel : ctypes ptr
+            kernel from loaded module
+        grid : tuple of int
+            grid dims (x, y, z), missing dims default to 1
+        block : tuple of int
+            block dims (x, y, z), missing dims default to 1
+        struct : ctypes structure
+            struct of packed up arguments of kernel
+        shared : int, optional
+            shared mem
+        """
+        grid = tuple(grid) + (1,) * (3 - len(grid))
+        block = tuple(block) + (1,) * (3 - len(block))
+        return self.add(_launch, kernel, grid, block, shared, struct, deps=deps, name=name)
+
+    def host(self, func, *args, deps=(), name=None):
+        """
+        Add a host node, func(*args) is called once its dependencies are
+        done.
+        """
+        return self._add(name, True, func, args, deps)
+
+    def _order(self):
+        # Kahn's algorithm, ready device nodes go before ready host nodes so
+        # host waits delay as little device work as possible
+        remaining = [len(node.deps) for node in self._nodes]
+        users = [[] for _ in self._nodes]
+        for node in self._nodes:
+            for dep in node.deps:
+                users[dep.index].append(node.index)
+        device = collections.deque()
+        host = collections.deque()
+        for node in self._nodes:
+            if not node.deps:
+                (host if node.host else device).append(node.index)
+        order = []
+        while device or host:
+            index = device.popleft() if device else host.popleft()
+            order.append(index)
+            for user in users[index]:
+                remaining[user] -= 1
+                if remaining[user] == 0:
+                    (host if self._nodes[user].host else device).append(user)
+        return order
+
+    def _build_plan(self):
+        count = len(self.streams)
+        tail = [None] * count  # last node of each stream
+        tail_step = [-1] * count
+        seq = [0] * count
+        clocks = [[0] * count for _ in range(count)]
+        host_clock = [0] * count
+        position = {}  # device node -> (stream, seq)
+        node_clock = {}  # node -> clock right after it
+        waited = set()  # nodes other nodes wait for, they need an event
+        plan = []
+        for step, index in enumerate(self._order()):
+            node = self._nodes[index]
+            if node.host:
+                waits = []
+                for dep in node.deps:
+                    if dep.host:
+                        continue
+                    stream, number = position[dep.index]
+                    if host_clock[stream] < number:
+                        waits.append(dep.index)
+                        _merge(host_clock, node_clock[dep.index])
+                node_clock[index] = list(host_clock)
+                waited.update(waits)
+                plan.append((index, None, waits))
+                continue
+
+            stream = None
+            for dep in node.deps:
+                if not dep.host and tail[position[dep.index][0]] == dep.index:
+                    stream = position[dep.index][0]
+                    break
+            if stream is None:
+                stream = min(range(count), key=lambda s: tail_step[s])
+            clock = clocks[stream]
+            waits = []
+            # Later dependencies first, waiting on them may cover the others
+            for dep in sorted(node.deps, key=lambda dep: -dep.index):
+                if dep.host:
+                    _merge(clock, node_clock[dep.index])
+                    continue
+                dep_stream, number = position[dep.index]
+                if dep_stream == stream or clock[dep_stream] >= number:
+                    continue
+                waits.append(dep.index)
+                _merge(clock, node_clock[dep.index])
+            seq[stream] += 1
+            clock[stream] = seq[stream]
+            position[index] = (stream, seq[stream])
+            node_clock[index] = list(clock)
+            tail[stream] = index
+            tail_step[stream] = step
+            waited.update(waits)
+            plan.append((index, stream, waits))
+        used = sorted({stream for _, stream, _ in plan if stream is not None})
+        return plan, used, waited
+
+    def run(self):
+        """
+        Enqueue the graph, the host only blocks for host nodes.
+        """
+        if self._plan is None:
+            self._plan = self._build_plan()
+        plan, used, waited = self._plan
+        for index in waited:
+            if index not in self._events:
+                self._events[index] = hip.hipEventCreateWithFlags(hip.hipEventDisableTiming)
+        streams = self.streams
+        # Order this run after the previous one on every stream
+        for stream in used:
+            for other, event in self._done.items():
+                if other != stream:
+                    hip.hipStreamWaitEvent(streams[stream], event)
+        for index, stream, waits in plan:
+            node = self._nodes[index]
+            if stream is None:
+                for dep in waits:
+                    hip.hipEventSynchronize(self._events[dep])
+                node.func(*node.args)
+                continue
+            for dep in waits:
+                hip.hipStreamWaitEvent(streams[stream], self._events[dep])
+            node.func(*node.args, streams[stream])
+            if index in self._events:
+                hip.hipEventRecord(self._events[index], streams[stream])
+        for stream in used:
+            if stream not in self._done:
+                self._done[stream] = hip.hipEventCreateWithFlags(hip.hipEventDisableTiming)
+            hip.hipEventRecord(self._done[stream], streams[stream])
+
+    def synchronize(self):
+        """
+        Wait for the last run to complete.
+        """
+        for event in self._done.values():
+            hip.hipEventSynchronize(event)
+
+    def close(self):
+        """
+        Wait for the last run and destroy the events of the graph.
+        """
+        self.synchronize()
+        for event in list(self._events.values()) + list(self._done.values()):
+            hip.hipEventDestroy(event)
+        self._events.clear()
+        self._done.clear()
+        self._plan = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _launch(kernel, grid, block, shared, struct, stream):
+    hip.hipModuleLaunchKernel(kernel, *grid, *block, shared, stream, struct)
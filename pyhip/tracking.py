@@ -0,0 +1,219 @@
+"""
+Device memory allocation tracking
+"""
+
+import atexit
+import contextlib
+import contextvars
+import sys
+import threading
+import time
+import traceback
+
+from . import hip
+from .allocator import _address
+
+_current_tag = contextvars.ContextVar("pyhip_allocation_tag", default=None)
+
+
+@contextlib.contextmanager
+def tag(name):
+    """
+    Tag the allocations made in the block.
+
+    Examples
+    --------
+    >>> with tracking.tag("decoder"):
+    ...     ptr = hip.hipMalloc(size)
+    """
+    token = _current_tag.set(name)
+    try:
+        yield
+    finally:
+        _current_tag.reset(token)
+
+
+class Allocation:
+    """
+    Live device allocation recorded by an AllocationTracker.
+    """
+
+    __slots__ = ("ptr", "size", "api", "tag", "timestamp", "stack")
+
+    def __init__(self, ptr, size, api, tag, timestamp, stack):
+        self.ptr = ptr
+        self.size = size
+        self.api = api
+        self.tag = tag
+        self.timestamp = timestamp
+        self.stack = stack
+
+    def __repr__(self):
+        return (
+            f"Allocation(ptr={self.ptr:#x}, size={self.size}, api={self.api}, "
+            f"tag={self.tag})"
+        )
+
+
+class AllocationTracker:
+    """
+    Records live device allocations made through pyhip.
+
+    Once started, hipMalloc, hipMallocPitch, hipMalloc3D, hipMallocManaged,
+    hipMallocAsync and hipMallocFromPoolAsync record each pointer with its
+    size, tag and timestamp in a dictionary keyed by pointer value,
+    hipFree/hipFreeAsync remove it. The allocating stack is captured for one
+    allocation in stack_sample_rate to keep the overhead low.
+
+    Parameters
+    ----------
+    stack_sample_rate : int, optional
+        Capture the stack of every n-th allocation, every 64th by default,
+        0 disables stacks.
+    stack_depth : int, optional
+        Number of frames kept per captured stack.
+    dump_at_exit : bool, optional
+        Dump the live allocations to stderr when the interpreter exits.
+
+    Examples
+    --------
+    >>> with AllocationTracker() as tracker:
+    ...     with tracking.tag("batch"):
+    ...         ptr = hip.hipMalloc(size)
+    >>> tracker.bytes_by_tag()
+    {'batch': 4096}
+    >>> tracker.dump()
+    """
+
+    def __init__(self, stack_sample_rate=64, stack_depth=8, dump_at_exit=False):
+        self.stack_sample_rate = stack_sample_rate
+        self.stack_depth = stack_depth
+        self._lock = threading.Lock()
+        self._live = {}  # address -> Allocation
+        self._tag_bytes = {}
+        self._count = 0
+        self.current_bytes = 0
+        self.peak_bytes = 0
+        self.total_allocations = 0
+        self.untracked_frees = 0
+        self._previous = None
+        if dump_at_exit:
+            atexit.register(self.dump)
+
+    def start(self):
+        """
+        Install the tracker, returns the previously installed one.
+        """
+        previous = hip._tracker
+        if previous is not self:
+            self._previous = previous
+            hip._tracker = self
+        return previous
+
+    def stop(self):
+        """
+        Uninstall the tracker and reinstall the one start() replaced,
+        recorded allocations are kept.
+        """
+        if hip._tracker is self:
+            hip._tracker = self._previous
+        self._previous = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def record(self, ptr, size, api):
+        """
+        Record an allocation, called by the hip allocation functions.
+        """
+        address = _address(ptr)
+        stack = None
+        with self._lock:
+            self._count += 1
+            if self.stack_sample_rate and self._count % self.stack_sample_rate == 0:
+                # Drop the frames of the tracker and the hip wrapper
+                stack = traceback.extract_stack(limit=self.stack_depth + 2)[:-2]
+            previous = self._live.pop(address, None)
+            if previous is not None:
+                # Address reused by the driver, its free was not seen
+                self._remove(previous)
+            allocation = Allocation(address, size, api, _current_tag.get(), time.time(), stack)
+            self._live[address] = allocation
+            self._tag_bytes[allocation.tag] = self._tag_bytes.get(allocation.tag, 0) + size
+            self.current_bytes += size
+            self.total_allocations += 1
+            if self.current_bytes > self.peak_bytes:
+                self.peak_bytes = self.current_bytes
+
+    def release(self, ptr):
+        """
+        Forget an allocation, called by the hip free functions.
+        """
+        address = _address(ptr)
+        with self._lock:
+            allocation = self._live.pop(address, None)
+            if allocation is None:
+                self.untracked_frees += 1
+                return
+            self._remove(allocation)
+
+    def _remove(self, allocation):
+        self.current_bytes -= allocation.size
+        remaining = self._tag_bytes[allocation.tag] - allocation.size
+        if remaining:
+            self._tag_bytes[allocation.tag] = remaining
+        else:
+            del self._tag_bytes[allocation.tag]
+
+    def live(self):
+        """
+        Live allocations, largest first.
+
+        Returns
+        -------
+        allocations : list of Allocation
+        """
+        with self._lock:
+            allocations = list(self._live.values())
+        return sorted(allocations, key=lambda allocation: allocation.size, reverse=True)
+
+    def bytes_by_tag(self):
+        """
+        Live bytes per tag, untagged allocations are under None.
+        """
+        with self._lock:
+            return dict(self._tag_bytes)
+
+    def dump(self, file=None):
+        """
+        Write a report of the live allocations.
+
+        Parameters
+        ----------
+        file : file object, optional
+            Destination, stderr when omitted.
+        """
+        if file is None:
+            file = sys.stderr
+        allocations = self.live()
+        now = time.time()
+        print(
+            f"pyhip: {len(allocations)} live allocations, {self.current_bytes} bytes "
+            f"(peak {self.peak_bytes} bytes)",
+            file=file,
+        )
+        for tag_name, nbytes in sorted(self.bytes_by_tag().items(), key=lambda item: -item[1]):
+            print(f"  tag {tag_name}: {nbytes} bytes", file=file)
+        for allocation in allocations:
+            print(
+                f"  {allocation.ptr:#x} {allocation.size} bytes by {allocation.api} "
+                f"tag {allocation.tag}, {now - allocation.timestamp:.1f}s ago",
+                file=file,
+            )
+            if allocation.stack is not None:
+                for line in traceback.format_list(allocation.stack):
+                    file.write("    " + line.replace("\n", "\n    ").rstrip(" "))
@@ -1,6 +1,6 @@
-from pyhip import hip, hiprtc
-import ctypes
-from itertools import repeat
+from pyhip.array import DeviceArray
+from pyhip.kernel import Kernel
+import numpy as np
 import time
 
 size = 50000000
@@ -9,23 +9,11 @@ y = 3
 
 
 def create_array():
-    cpu = list()
-    gpu = (ctypes.c_int * size)()
-    j = 1
-    for i in repeat(0, size):
-        cpu.append(j)
-        gpu[j - 1] = j
-        j = j + 1
-    return cpu, gpu
+    return np.arange(1, size + 1, dtype=np.int32)
 
 
 def cpu_axpy(a):
-    result = list()
-    j = 0
-    for i in repeat(0, size):
-        result.append(a[j] * x + y)
-        j = j + 1
-    return result
+    return a * x + y
 
 
 def gpu_axpy(res):
@@ -40,51 +28,28 @@ def gpu_axpy(res):
       }
     }
     """
-    prog = hiprtc.hiprtcCreateProgram(source, "axpy", [], [])
-    device_properties = hip.hipGetDeviceProperties(0)
-    print(f"Compiling kernel for {device_properties.gcnArchName}")
-    hiprtc.hiprtcCompileProgram(
-        prog, [f"--offload-arch={device_properties.gcnArchName}"]
-    )
-    code = hiprtc.hiprtcGetCode(prog)
-    module = hip.hipModuleLoadData(code)
-    kernel = hip.hipModuleGetFunction(module, "axpy")
-    ptr = hip.hipMalloc(4 * size)
-
-    class PackageStruct(ctypes.Structure):
-        _fields_ = [
-            ("a", ctypes.c_void_p),
-            ("x", ctypes.c_int),
-            ("y", ctypes.c_int),
-            ("size", ctypes.c_size_t),
-        ]
-
-    hip.hipMemcpy_htod(ptr, ctypes.byref(
-        res), ctypes.sizeof(ctypes.c_int) * size)
-    struct = PackageStruct(ptr, 2, 3, size)
-    block = int(size / 1024) + 1
-    hip.hipModuleLaunchKernel(kernel, block, 1, 1, 1024, 1, 1, 0, 0, struct)
-    hip.hipMemcpy_dtoh(ctypes.byref(res), ptr,
-                       ctypes.sizeof(ctypes.c_int) * size)
-    hip.hipFree(ptr)
+    # The argument struct is built from the axpy signature
+    axpy = Kernel.from_source(source, "axpy")
+
+    # The numpy buffer is copied directly, no ctypes staging array
+    with DeviceArray.from_numpy(res) as device:
+        block = int(size / 1024) + 1
+        axpy(block, 1024, device, x, y, size)
+        device.copy_to_host(out=res)
     return res
 
 
 if __name__ == "__main__":
-    cpu_array, gpu_array = create_array()
+    cpu_array = create_array()
+    gpu_array = cpu_array.copy()
 
     start = time.time()
     cpu_result = cpu_axpy(cpu_array)
     cend = time.time()
-    gres = gpu_axpy(gpu_array)
+    gpu_result = gpu_axpy(gpu_array)
     gend = time.time()
-    gpu_result = list()
-
-    # Copy back for comparision
-    for i in gres:
-        gpu_result.append(i)
 
-    if cpu_result != gpu_result:
+    if not np.array_equal(cpu_result, gpu_result):
         print("Error in vaidation: ", cpu_result, gpu_result)
     else:
         print("Passed")
@@ -0,0 +1,72 @@
+from pyhip import hip, hiprtc
+from pyhip.launch import PreparedLaunch
+import ctypes
+import time
+
+launches = 100000
+
+
+def compile_kernel():
+    source = """
+    extern "C" __global__ void add(int *a, int x) {
+      a[threadIdx.x] += x;
+    }
+    """
+    prog = hiprtc.hiprtcCreateProgram(source, "add", [], [])
+    device_properties = hip.hipGetDeviceProperties(0)
+    if hip.hipGetPlatformName() == "amd":
+        hiprtc.hiprtcCompileProgram(
+            prog, [f"--offload-arch={device_properties.gcnArchName}"]
+        )
+    else:
+        hiprtc.hiprtcCompileProgram(prog, [])
+    code = hiprtc.hiprtcGetCode(prog)
+    module = hip.hipModuleLoadData(code)
+    return hip.hipModuleGetFunction(module, "add")
+
+
+class PackageStruct(ctypes.Structure):
+    _fields_ = [("a", ctypes.c_void_p), ("x", ctypes.c_int)]
+
+
+def bench_module_launch(kernel, ptr, stream):
+    start = time.perf_counter()
+    for i in range(launches):
+        struct = PackageStruct(ptr, 1)
+        hip.hipModuleLaunchKernel(kernel, 1, 1, 1, 32, 1, 1, 0, stream, struct)
+    end = time.perf_counter()
+    hip.hipStreamSynchronize(stream)
+    return end - start
+
+
+def bench_prepared_launch(kernel, ptr, stream):
+    launch = PreparedLaunch(kernel, (1,), (32,), PackageStruct,
+                            stream=stream, args=(ptr, 1))
+    start = time.perf_counter()
+    for i in range(launches):
+        launch.args.x = 1
+        launch()
+    end = time.perf_counter()
+    hip.hipStreamSynchronize(stream)
+    return end - start
+
+
+if __name__ == "__main__":
+    kernel = compile_kernel()
+    ptr = hip.hipMalloc(4 * 32)
+    stream = hip.hipStreamCreate()
+
+    # Warmup, binds the library functions and loads the kernel
+    bench_module_launch(kernel, ptr, stream)
+
+    module_time = bench_module_launch(kernel, ptr, stream)
+    prepared_time = bench_prepared_launch(kernel, ptr, stream)
+    print("hipModuleLaunchKernel: %.2f us/launch" %
+          (module_time / launches * 1e6))
+    print("PreparedLaunch:        %.2f us/launch" %
+          (prepared_time / launches * 1e6))
+    print("Python overhead removed: %.2f us/launch" %
+          ((module_time - prepared_time) / launches * 1e6))
+
+    hip.hipStreamDestroy(stream)
+    hip.hipFree(ptr)
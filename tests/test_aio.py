@@ -0,0 +1,57 @@
+from pyhip import aio, hip
+import asyncio
+import gc
+import unittest
+import weakref
+
+
+class TestAio(unittest.TestCase):
+    def test_synchronize(self):
+        count = 1 << 20
+        data = bytes(range(256)) * (count // 256)
+
+        async def roundtrip(stream):
+            ptr = hip.hipMalloc(count)
+            res = bytearray(count)
+            hip.hipMemcpyAsync_htod(ptr, data, stream=stream)
+            hip.hipMemcpyAsync_dtoh(res, ptr, stream=stream)
+            await aio.synchronize(stream)
+            hip.hipFree(ptr)
+            return res
+
+        async def main():
+            streams = [hip.hipStreamCreate() for _ in range(8)]
+            results = await asyncio.gather(*(roundtrip(stream) for stream in streams))
+            for stream in streams:
+                hip.hipStreamDestroy(stream)
+            return results
+
+        for res in asyncio.run(main()):
+            self.assertEqual(res, data)
+
+    def test_pollerReleased(self):
+        async def main():
+            return aio._poller()
+
+        loop = asyncio.new_event_loop()
+        poller = loop.run_until_complete(main())
+        loop.close()
+        ref = weakref.ref(loop)
+        del loop
+        gc.collect()
+        self.assertIsNone(ref())
+        self.assertNotIn(poller, aio._pollers.values())
+
+    def test_wait(self):
+        async def main():
+            event = hip.hipEventCreate()
+            hip.hipEventRecord(event)
+            await aio.wait(event)
+            self.assertTrue(hip.hipEventQuery(event))
+            hip.hipEventDestroy(event)
+
+        asyncio.run(main())
+
+
+if __name__ == "__main__":
+    unittest.main()
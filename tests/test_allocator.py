@@ -0,0 +1,220 @@
+from pyhip import hip
+from pyhip.allocator import CachingAllocator, MemPool, PinnedBufferPool, _round_size
+import ctypes
+import unittest
+
+
+class TestAllocator(unittest.TestCase):
+    def test_roundSize(self):
+        self.assertEqual(_round_size(1), 512)
+        self.assertEqual(_round_size(512), 512)
+        self.assertEqual(_round_size(1000), 1024)
+        self.assertEqual(_round_size(1025), 1280)
+        self.assertEqual(_round_size(1 << 20), 1 << 20)
+        for count in range(1, 10000, 37):
+            size = _round_size(count)
+            self.assertGreaterEqual(size, count)
+            self.assertLessEqual(size, max(512, count * 1.25))
+
+    def test_cachingAllocator(self):
+        pool = CachingAllocator()
+        ptr = pool.malloc(1024)
+        self.assertIsNotNone(ptr)
+        pool.free(ptr)
+        ptr1 = pool.malloc(1000)
+        self.assertEqual(ptr.value, ptr1.value)
+        stats = pool.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["bytes_in_use"], 1024)
+        pool.free(ptr1)
+        self.assertEqual(pool.bytes_cached, 1024)
+        pool.empty_cache()
+        self.assertEqual(pool.bytes_held, 0)
+        self.assertEqual(pool.peak_bytes, 1024)
+
+    def test_cachingAllocatorStreams(self):
+        pool = CachingAllocator()
+        stream = hip.hipStreamCreate()
+        ptr = pool.malloc(4096, stream)
+        pool.free(ptr)
+        hip.hipStreamSynchronize(stream)
+        # Freed on stream, reusable by the null stream once the event completed
+        ptr1 = pool.malloc(4096)
+        self.assertEqual(ptr.value, ptr1.value)
+        pool.free(ptr1)
+        pool.empty_cache()
+        hip.hipStreamDestroy(stream)
+
+    def test_cachingAllocatorPending(self):
+        pool = CachingAllocator()
+        stream = hip.hipStreamCreateWithFlags(hip.hipStreamNonBlocking)
+        done = hip.hipEventCreate()
+        size = 64 << 20
+        ptr = pool.malloc(size)
+        for _ in range(16):
+            hip.hipMemsetAsync(ptr, 1, size, stream)
+        hip.hipEventRecord(done, stream)
+        # Freed without a stream, as by hipFree, the pending work finishes first
+        pool.free(ptr)
+        self.assertTrue(hip.hipEventQuery(done))
+        ptr1 = pool.malloc(size)
+        self.assertEqual(ptr.value, ptr1.value)
+
+        for _ in range(16):
+            hip.hipMemsetAsync(ptr1, 2, size, stream)
+        hip.hipEventRecord(done, stream)
+        # Freed on the stream, another stream only reuses it once completed
+        pool.free(ptr1, stream)
+        ptr2 = pool.malloc(size)
+        if ptr2.value == ptr1.value:
+            self.assertTrue(hip.hipEventQuery(done))
+        pool.free(ptr2)
+        hip.hipStreamSynchronize(stream)
+        pool.empty_cache()
+        hip.hipEventDestroy(done)
+        hip.hipStreamDestroy(stream)
+
+    def test_cachingAllocatorLimit(self):
+        pool = CachingAllocator(limit=4096)
+        ptr = pool.malloc(4096)
+        with self.assertRaises(MemoryError):
+            pool.malloc(1)
+        pool.free(ptr)
+        ptr = pool.malloc(2048)
+        self.assertEqual(pool.bytes_held, 2048)
+        pool.free(ptr)
+        pool.empty_cache()
+
+    def test_hipSetAllocator(self):
+        pool = CachingAllocator()
+        previous = hip.hipSetAllocator(pool)
+        try:
+            count = 10
+            size = 4 * count
+            ptr = hip.hipMalloc(size)
+            res = (ctypes.c_int * count)(*range(count))
+            hip.hipMemcpy_htod(ptr, res, size)
+            res1 = (ctypes.c_int * count)()
+            hip.hipMemcpy_dtoh(res1, ptr, size)
+            self.assertEqual(list(res), list(res1))
+            hip.hipFree(ptr)
+            self.assertEqual(pool.bytes_cached, 512)
+        finally:
+            hip.hipSetAllocator(previous)
+            pool.empty_cache()
+
+    def test_hipHostMalloc(self):
+        count = 10
+        size = 4 * count
+        host = hip.hipHostMalloc(size)
+        self.assertIsNotNone(host.value)
+        res = (ctypes.c_int * count).from_address(host.value)
+        for i in range(count):
+            res[i] = i + 1
+        ptr = hip.hipMalloc(size)
+        hip.hipMemcpy_htod(ptr, host, size)
+        res1 = (ctypes.c_int * count)()
+        hip.hipMemcpy_dtoh(res1, ptr, size)
+        self.assertEqual(list(res), list(res1))
+        hip.hipFree(ptr)
+        hip.hipHostFree(host)
+
+    def test_hipHostRegister(self):
+        count = 1024
+        size = 4 * count
+        res = (ctypes.c_int * count)(*range(count))
+        hip.hipHostRegister(res, size)
+        ptr = hip.hipMalloc(size)
+        stream = hip.hipStreamCreate()
+        hip.hipMemcpyAsync_htod(ptr, res, size, stream)
+        res1 = (ctypes.c_int * count)()
+        hip.hipMemcpyAsync_dtoh(res1, ptr, size, stream)
+        hip.hipStreamSynchronize(stream)
+        self.assertEqual(list(res), list(res1))
+        hip.hipHostUnregister(res)
+        hip.hipFree(ptr)
+        hip.hipStreamDestroy(stream)
+
+    def test_pinnedBufferPool(self):
+        pool = PinnedBufferPool()
+        stream = hip.hipStreamCreate()
+        count = 10
+        size = 4 * count
+        ptr = hip.hipMalloc(size)
+        buf = pool.acquire(size)
+        self.assertEqual(len(memoryview(buf)), size)
+        ctypes.memmove(buf, (ctypes.c_int * count)(*range(count)), size)
+        hip.hipMemcpyAsync_htod(ptr, buf, size, stream)
+        pool.release(buf, stream)
+        hip.hipStreamSynchronize(stream)
+
+        out = pool.acquire(size)
+        self.assertEqual(ctypes.addressof(out), ctypes.addressof(buf))
+        hip.hipMemcpyAsync_dtoh(out, ptr, size, stream)
+        hip.hipStreamSynchronize(stream)
+        res = (ctypes.c_int * count).from_buffer(out)
+        self.assertEqual(list(res), list(range(count)))
+        del res
+        # Views of an acquired buffer can be released too
+        pool.release(memoryview(out).cast("B"))
+        with self.assertRaises(ValueError):
+            pool.release(out)
+        self.assertEqual(pool.stats()["hits"], 1)
+        pool.empty_cache()
+        self.assertEqual(pool.bytes_held, 0)
+        hip.hipFree(ptr)
+        hip.hipStreamDestroy(stream)
+
+    def test_hipMallocAsync(self):
+        stream = hip.hipStreamCreate()
+        count = 10
+        size = 4 * count
+        ptr = hip.hipMallocAsync(size, stream)
+        src = (ctypes.c_int * count)(*range(count))
+        res = (ctypes.c_int * count)()
+        hip.hipMemcpyAsync_htod(ptr, src, size, stream)
+        hip.hipMemcpyAsync_dtoh(res, ptr, size, stream)
+        hip.hipFreeAsync(ptr, stream)
+        hip.hipStreamSynchronize(stream)
+        self.assertEqual(list(src), list(res))
+        hip.hipStreamDestroy(stream)
+
+    def test_memPool(self):
+        stream = hip.hipStreamCreate()
+        pool = MemPool(release_threshold=1 << 20)
+        self.assertEqual(pool.release_threshold, 1 << 20)
+        pool.set_reuse(allow_opportunistic=False)
+        self.assertEqual(hip.hipMemPoolGetAttribute(
+            pool.handle, hip.hipMemPoolReuseAllowOpportunistic), 0)
+        ptr = pool.malloc(4096, stream)
+        pool.free(ptr, stream)
+        hip.hipStreamSynchronize(stream)
+        stats = pool.stats()
+        self.assertGreaterEqual(stats["used_high"], 4096)
+        self.assertEqual(stats["used_bytes"], 0)
+        pool.trim(0)
+        self.assertEqual(pool.stats()["reserved_bytes"], 0)
+        pool.destroy()
+        hip.hipStreamDestroy(stream)
+
+    def test_defaultMemPool(self):
+        pool = MemPool(default=True)
+        self.assertEqual(pool.handle.value,
+                         hip.hipDeviceGetDefaultMemPool(pool.device).value)
+        previous = hip.hipSetAllocator(pool)
+        try:
+            ptr = hip.hipMalloc(1024)
+            hip.hipMemset(ptr, 0, 1024)
+            hip.hipFree(ptr)
+            # Not allocated by the pool, freed by the driver hipFree
+            managed = hip.hipMallocManaged(1024)
+            hip.hipFree(managed)
+            hip.hipDeviceSynchronize()
+        finally:
+            hip.hipSetAllocator(previous)
+        pool.destroy()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+from pyhip import hip
+from pyhip.array import DeviceArray, _pitched_layout
+import unittest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class TestPitchedLayout(unittest.TestCase):
+    def test_pitchedLayout(self):
+        # Contiguous arrays are copied as one row
+        self.assertEqual(_pitched_layout((4, 6), 8, (48, 8), (48, 8)),
+                         (192, 1, 1, [(192, 1), (192, 1)]))
+        # Tile of a larger array
+        self.assertEqual(_pitched_layout((2, 3), 8, (48, 8), (24, 8)),
+                         (24, 2, 1, [(48, 2), (24, 2)]))
+        # Slices with row padding
+        self.assertEqual(_pitched_layout((2, 3, 4), 4, (256, 64, 4), (48, 16, 4)),
+                         (16, 3, 2, [(64, 4), (16, 3)]))
+        # Non contiguous rows
+        self.assertIsNone(_pitched_layout((4, 3), 8, (48, 16), (24, 8)))
+        # Slice stride is not a multiple of the pitch
+        self.assertIsNone(_pitched_layout((2, 3, 4), 4, (100, 64, 4), (48, 16, 4)))
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestArray(unittest.TestCase):
+    def test_fromNumpy(self):
+        host = np.arange(24, dtype=np.float32).reshape(4, 6)
+        device = DeviceArray.from_numpy(host)
+        self.assertEqual(device.shape, (4, 6))
+        self.assertEqual(device.strides, host.strides)
+        self.assertEqual(device.nbytes, host.nbytes)
+        np.testing.assert_array_equal(device.to_numpy(), host)
+        device.free()
+
+    def test_copyToHostAsync(self):
+        stream = hip.hipStreamCreate()
+        host = np.arange(100, dtype=np.int32)
+        with DeviceArray.from_numpy(host, stream) as device:
+            out = np.zeros_like(host)
+            self.assertIs(device.copy_to_host(out=out, stream=stream), out)
+            hip.hipStreamSynchronize(stream)
+            np.testing.assert_array_equal(out, host)
+            with self.assertRaises(ValueError):
+                device.copy_to_host(out=np.zeros(10, dtype=np.int32))
+        hip.hipStreamDestroy(stream)
+
+    def test_fromNumpyTemporary(self):
+        stream = hip.hipStreamCreate()
+        host = np.arange(24, dtype=np.int32).reshape(4, 6)
+        # The transpose goes through a temporary copied synchronously
+        with DeviceArray.from_numpy(host.T, stream) as device:
+            np.testing.assert_array_equal(device.to_numpy(), host.T)
+        hip.hipStreamDestroy(stream)
+
+    def test_slicing(self):
+        host = np.arange(24, dtype=np.int64).reshape(4, 6)
+        with DeviceArray.from_numpy(host) as device:
+            rows = device[1:3]
+            self.assertTrue(rows.is_contiguous)
+            self.assertEqual(rows.ptr.value, device.ptr.value + host.strides[0])
+            np.testing.assert_array_equal(rows.to_numpy(), host[1:3])
+
+            row = device[-1]
+            self.assertEqual(row.shape, (6,))
+            np.testing.assert_array_equal(row.to_numpy(), host[-1])
+
+            cols = device[:, ::2]
+            self.assertEqual(cols.shape, (4, 3))
+            self.assertEqual(cols.strides, host[:, ::2].strides)
+            self.assertFalse(cols.is_contiguous)
+            with self.assertRaises(ValueError):
+                cols.to_numpy()
+
+            tile = device[1:3, 2:5]
+            self.assertFalse(tile.is_contiguous)
+            np.testing.assert_array_equal(tile.to_numpy(), host[1:3, 2:5])
+
+            # Views share memory with the base array
+            rows.copy_from_host(np.zeros((2, 6), dtype=np.int64))
+            expected = host.copy()
+            expected[1:3] = 0
+            np.testing.assert_array_equal(device.to_numpy(), expected)
+            with self.assertRaises(ValueError):
+                rows.free()
+
+    def test_pitched(self):
+        host = np.arange(5 * 7, dtype=np.float32).reshape(5, 7)
+        with DeviceArray.empty_pitched(host.shape, host.dtype) as device:
+            self.assertGreaterEqual(device.strides[0], 7 * 4)
+            device.copy_from_host(host)
+            np.testing.assert_array_equal(device.to_numpy(), host)
+            # Host tile to device tile, one 2D copy each way
+            tile = np.full((2, 3), -1, dtype=np.float32)
+            device[1:3, 1:4].copy_from_host(tile)
+            out = np.zeros((10, 10), dtype=np.float32)
+            device[1:3, 1:4].copy_to_host(out=out[4:6, 4:7])
+            np.testing.assert_array_equal(out[4:6, 4:7], tile)
+
+        host = np.arange(2 * 3 * 5, dtype=np.int16).reshape(2, 3, 5)
+        with DeviceArray.empty_pitched(host.shape, host.dtype) as device:
+            device.copy_from_host(host)
+            np.testing.assert_array_equal(device.to_numpy(), host)
+
+    def test_asParameter(self):
+        host = np.arange(10, dtype=np.int32)
+        with DeviceArray.from_numpy(host) as device:
+            out = np.zeros_like(host)
+            hip.hipMemcpy_dtoh(out.ctypes.data, device, device.nbytes)
+            np.testing.assert_array_equal(out, host)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+from pyhip import hip
+from pyhip.autotune import Autotuner, Config, ResultCache, size_bucket
+import ctypes
+import multiprocessing
+import os
+import tempfile
+import unittest
+
+SOURCE = """
+#ifndef ITEMS
+#define ITEMS 1
+#endif
+extern "C" __global__ void axpy(int *a, int x, int y, size_t size) {
+  size_t i = (blockDim.x * blockIdx.x + threadIdx.x) * ITEMS;
+  for (int k = 0; k < ITEMS; k++) {
+    if (i + k < size) {
+      a[i + k] = a[i + k] * x + y;
+    }
+  }
+}
+"""
+
+
+def _put(path, index):
+    cache = ResultCache(path)
+    for i in range(20):
+        cache.put(f"{index}/{i}", Config(64 * (index + 1)))
+
+
+class TestAutotune(unittest.TestCase):
+    def test_sizeBucket(self):
+        self.assertEqual(size_bucket(0), 1)
+        self.assertEqual(size_bucket(1), 1)
+        self.assertEqual(size_bucket(1000), 1024)
+        self.assertEqual(size_bucket(1024), 1024)
+        self.assertEqual(size_bucket(1025), 2048)
+
+    def test_resultCache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sub", "autotune.json")
+            cache = ResultCache(path)
+            self.assertIsNone(cache.get("k"))
+            cache.put("k", Config(256, 0, {"ITEMS": 4}, ms=0.5))
+            # A second cache, as in another process, merges its entries
+            other = ResultCache(path)
+            other.put("j", Config((16, 16)))
+            config = ResultCache(path).get("k")
+            self.assertEqual(config, Config((256, 1, 1), 0, {"ITEMS": 4}))
+            self.assertEqual(config.ms, 0.5)
+            self.assertEqual(ResultCache(path).get("j").block, (16, 16, 1))
+
+            with open(path, "w") as f:
+                f.write("{")
+            self.assertIsNone(ResultCache(path).get("k"))
+
+    def test_resultCacheProcesses(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "autotune.json")
+            context = multiprocessing.get_context("spawn")
+            processes = [context.Process(target=_put, args=(path, i)) for i in range(4)]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join(60)
+                self.assertEqual(process.exitcode, 0)
+            cache = ResultCache(path)
+            for index in range(4):
+                for i in range(20):
+                    self.assertEqual(cache.get(f"{index}/{i}").block[0], 64 * (index + 1))
+
+    def test_tune(self):
+        count = 1 << 16
+        size = 4 * count
+        ptr = hip.hipMalloc(size)
+        hip.hipMemset(ptr, 0, size)
+        stream = hip.hipStreamCreate()
+
+        def grid(config):
+            items = config.block[0] * config.defines.get("ITEMS", 1)
+            return ((count + items - 1) // items,)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "autotune.json")
+            tuner = Autotuner(SOURCE, "axpy", cache=ResultCache(path), warmup=1, repeat=2)
+            with self.assertRaises(KeyError):
+                tuner.launch(grid, ptr, 1, 0, count, size=count, stream=stream)
+            best = tuner.tune(
+                grid, (ptr, 1, 0, count), blocks=(64, 256, 1024),
+                # The last constants do not compile, the candidate is skipped
+                defines=({}, {"ITEMS": 4}, {"ITEMS": "("}), size=count, stream=stream,
+            )
+            self.assertIn(best.block[0], (64, 256, 1024))
+            self.assertGreater(best.ms, 0)
+
+            # Another process only looks the result up
+            tuner = Autotuner(SOURCE, "axpy", cache=ResultCache(path))
+            self.assertEqual(tuner.lookup(count), best)
+            self.assertIsNone(tuner.lookup(4 * count))
+            hip.hipMemset(ptr, 0, size)
+            tuner.launch(grid, ptr, 2, 3, count, size=count, stream=stream)
+            hip.hipStreamSynchronize(stream)
+
+        res = (ctypes.c_int * count)()
+        hip.hipMemcpy_dtoh(res, ptr, size)
+        self.assertEqual(list(res), [3] * count)
+        hip.hipFree(ptr)
+        hip.hipStreamDestroy(stream)
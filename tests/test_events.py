@@ -0,0 +1,42 @@
+from pyhip import hip
+from pyhip.events import EventPool, event_pool
+import unittest
+
+
+class TestEvents(unittest.TestCase):
+    def test_eventPool(self):
+        pool = EventPool(initial=2, max_idle=2)
+        self.assertEqual(pool.stats()["size"], 2)
+        events = [pool.acquire() for _ in range(3)]
+        stats = pool.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["in_use"]), (2, 1, 3))
+        for event in events:
+            hip.hipEventRecord(event)
+            pool.release(event)
+        hip.hipDeviceSynchronize()
+        # Completed events are reused, the one beyond max_idle is destroyed
+        event = pool.acquire()
+        stats = pool.stats()
+        self.assertEqual((stats["size"], stats["destroyed"], stats["hits"]), (2, 1, 3))
+        pool.release(event)
+        pool.trim()
+        self.assertEqual(pool.stats()["size"], 0)
+        pool.close()
+
+    def test_limit(self):
+        pool = EventPool(limit=1)
+        event = pool.acquire()
+        self.assertRaises(RuntimeError, pool.acquire)
+        hip.hipEventRecord(event)
+        pool.release(event)
+        # Waits for the released event instead of growing
+        self.assertEqual(pool.acquire().value, event.value)
+        pool.release(event)
+        pool.close()
+
+    def test_eventPoolPerDevice(self):
+        self.assertIs(event_pool(), event_pool(hip.hipGetDevice()))
+
+
+if __name__ == "__main__":
+    unittest.main()
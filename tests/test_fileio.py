@@ -0,0 +1,48 @@
+from pyhip import hip
+from pyhip.allocator import PinnedBufferPool
+from pyhip.fileio import load_file
+import os
+import tempfile
+import unittest
+
+
+class TestFileIO(unittest.TestCase):
+    def setUp(self):
+        self.data = bytes(i % 251 for i in range(3 * 4096 + 123))
+        fd, self.path = tempfile.mkstemp()
+        with os.fdopen(fd, "wb") as f:
+            f.write(self.data)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def read_back(self, result):
+        out = bytearray(result.nbytes)
+        hip.hipMemcpy_dtoh(out, result.ptr)
+        hip.hipFree(result.ptr)
+        return bytes(out)
+
+    def test_loadFile(self):
+        result = load_file(self.path, window_bytes=4096)
+        self.assertEqual(result.nbytes, len(self.data))
+        self.assertFalse(result.registered)
+        self.assertGreater(result.gbps, 0)
+        self.assertEqual(self.read_back(result), self.data)
+
+    def test_loadFileRegion(self):
+        pool = PinnedBufferPool()
+        result = load_file(self.path, offset=5000, size=6000,
+                           window_bytes=1000, depth=3, pool=pool)
+        self.assertEqual(self.read_back(result), self.data[5000:11000])
+        self.assertGreater(pool.bytes_cached, 0)
+        pool.empty_cache()
+        with self.assertRaises(ValueError):
+            load_file(self.path, offset=len(self.data), size=1)
+
+    def test_loadFileRegistered(self):
+        result = load_file(self.path, offset=100, register=True)
+        self.assertEqual(self.read_back(result), self.data[100:])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+from pyhip import hip
+from pyhip.fill import _pattern, _period, fill
+import ctypes
+import unittest
+
+
+class TestFill(unittest.TestCase):
+    def test_period(self):
+        self.assertEqual(_period(_pattern(0, ctypes.c_double)), 1)
+        self.assertEqual(_period(_pattern(0x0101, ctypes.c_uint16)), 1)
+        self.assertEqual(_period(_pattern(0x0102, ctypes.c_uint16)), 2)
+        self.assertEqual(_period(_pattern(1.0, ctypes.c_float)), 4)
+        self.assertEqual(_period(_pattern(0x0000000100000001, ctypes.c_uint64)), 4)
+        self.assertIsNone(_period(_pattern(1.0, ctypes.c_double)))
+
+    def test_fillInt32(self):
+        count = 1000
+        stream = hip.hipStreamCreate()
+        ptr = hip.hipMalloc(4 * count)
+        fill(ptr, -7, ctypes.c_int32, stream, count=count)
+        res = (ctypes.c_int32 * count)()
+        hip.hipMemcpyAsync_dtoh(res, ptr, stream=stream)
+        hip.hipStreamSynchronize(stream)
+        self.assertEqual(list(res), [-7] * count)
+        hip.hipFree(ptr)
+        hip.hipStreamDestroy(stream)
+
+    def test_fillDouble(self):
+        count = 1001
+        stream = hip.hipStreamCreate()
+        ptr = hip.hipMalloc(8 * count)
+        fill(ptr, 0.0, ctypes.c_double, stream, count=count)
+        fill(ptr, 2.5, ctypes.c_double, stream, count=count - 1)
+        res = (ctypes.c_double * count)()
+        hip.hipMemcpyAsync_dtoh(res, ptr, stream=stream)
+        hip.hipStreamSynchronize(stream)
+        self.assertEqual(list(res), [2.5] * (count - 1) + [0.0])
+        hip.hipFree(ptr)
+        hip.hipStreamDestroy(stream)
+
+    def test_hipMemsetD16(self):
+        count = 6
+        ptr = hip.hipMalloc(2 * count)
+        hip.hipMemsetD16(ptr, 0x1234, count)
+        res = (ctypes.c_uint16 * count)()
+        hip.hipMemcpy_dtoh(res, ptr)
+        self.assertEqual(list(res), [0x1234] * count)
+        hip.hipFree(ptr)
+
+
+if __name__ == "__main__":
+    unittest.main()
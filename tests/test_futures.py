@@ -0,0 +1,50 @@
+from pyhip import futures, hip
+import concurrent.futures
+import contextlib
+import io
+import unittest
+
+
+class TestFutures(unittest.TestCase):
+    def test_memcpy(self):
+        count = 1 << 20
+        data = bytes(range(256)) * (count // 256)
+        streams = [hip.hipStreamCreate() for _ in range(4)]
+        ptrs = [hip.hipMalloc(count) for _ in streams]
+        jobs = []
+        for stream, ptr in zip(streams, ptrs):
+            futures.memset(ptr, 0, count, stream)
+            futures.memcpy_htod(ptr, data, stream=stream)
+            jobs.append(futures.memcpy_dtoh(bytearray(count), ptr, stream=stream))
+        done = 0
+        for future in concurrent.futures.as_completed(jobs, timeout=60):
+            self.assertEqual(future.result(), data)
+            self.assertFalse(future.cancel())
+            done += 1
+        self.assertEqual(done, len(jobs))
+        for stream, ptr in zip(streams, ptrs):
+            hip.hipFree(ptr)
+            hip.hipStreamDestroy(stream)
+
+    def test_record(self):
+        future = futures.record(result="done")
+        self.assertEqual(future.result(timeout=60), "done")
+
+    def test_finishReported(self):
+        class Pool:
+            def release(self, event):
+                raise RuntimeError("release failed")
+
+        future = concurrent.futures.Future()
+        future.set_result("first")
+        pending = futures._Pending(Pool(), None, future, "second", None)
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            futures._CompletionThread._finish(pending)
+        self.assertIn("release failed", stderr.getvalue())
+        self.assertIn("InvalidStateError", stderr.getvalue())
+        self.assertEqual(future.result(), "first")
+
+
+if __name__ == "__main__":
+    unittest.main()
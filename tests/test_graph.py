@@ -0,0 +1,79 @@
+from pyhip import hip, hiprtc
+from pyhip.graph import CapturedGraph, _topological_order
+import ctypes
+import unittest
+
+
+class PackageStruct(ctypes.Structure):
+    _fields_ = [
+        ("a", ctypes.c_void_p),
+        ("x", ctypes.c_int),
+        ("y", ctypes.c_int),
+    ]
+
+
+class TestGraph(unittest.TestCase):
+    def get_kernel(self):
+        source = """
+        extern "C" __global__ void axpy(int *a, int x, int y) {
+          a[threadIdx.x] = a[threadIdx.x] * x + y;
+        }
+        """
+        prog = hiprtc.hiprtcCreateProgram(source, "axpy", [], [])
+        device_properties = hip.hipGetDeviceProperties(0)
+        if hip.hipGetPlatformName() == "amd":
+            hiprtc.hiprtcCompileProgram(
+                prog, [f"--offload-arch={device_properties.gcnArchName}"]
+            )
+        else:
+            hiprtc.hiprtcCompileProgram(prog, [])
+        code = hiprtc.hiprtcGetCode(prog)
+        module = hip.hipModuleLoadData(code)
+        kernel = hip.hipModuleGetFunction(module, "axpy")
+        hiprtc.hiprtcDestroyProgram(prog)
+        return kernel
+
+    def test_capture(self):
+        kernel = self.get_kernel()
+        count = 32
+        size = 4 * count
+        ptr = hip.hipMalloc(size)
+        stream = hip.hipStreamCreate()
+
+        with CapturedGraph(stream) as graph:
+            hip.hipMemsetAsync(ptr, 0, size, stream)
+            hip.hipModuleLaunchKernel(kernel, 1, 1, 1, count, 1, 1, 0, stream,
+                                      PackageStruct(ptr, 1, 1))
+            hip.hipModuleLaunchKernel(kernel, 1, 1, 1, count, 1, 1, 0, stream,
+                                      PackageStruct(ptr, 2, 3))
+        self.assertEqual(len(graph.kernel_nodes), 2)
+
+        res = (ctypes.c_int * count)()
+        graph.launch()
+        hip.hipMemcpyAsync_dtoh(res, ptr, size, stream)
+        hip.hipStreamSynchronize(stream)
+        # (0 * 1 + 1) * 2 + 3
+        self.assertEqual(list(res), [5] * count)
+
+        graph.set_kernel_args(1, PackageStruct(ptr, 10, 0))
+        graph.launch()
+        hip.hipMemcpyAsync_dtoh(res, ptr, size, stream)
+        hip.hipStreamSynchronize(stream)
+        self.assertEqual(list(res), [10] * count)
+
+        graph.close()
+        hip.hipFree(ptr)
+        hip.hipStreamDestroy(stream)
+
+    def test_topologicalOrder(self):
+        # Chain c -> a -> d as listed out of order, b is independent
+        dependencies = {"d": ["a"], "b": [], "a": ["c"], "c": []}
+        self.assertEqual(_topological_order(list(dependencies), dependencies),
+                         ["b", "c", "a", "d"])
+
+    def test_nullStream(self):
+        self.assertRaises(ValueError, CapturedGraph, None)
+
+
+if __name__ == "__main__":
+    unittest.main()
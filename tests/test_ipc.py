@@ -0,0 +1,53 @@
+from pyhip import hip
+from pyhip.ipc import SharedBuffer, SharedEvent
+import multiprocessing
+import pickle
+import unittest
+
+
+def _consume(shared, event, queue):
+    hip.hipEventSynchronize(event.open())
+    with shared as ptr:
+        # A second open in the same process shares the mapping
+        with shared as again:
+            assert again.value == ptr.value
+        res = bytearray(shared.nbytes)
+        hip.hipMemcpy_dtoh(res, ptr)
+    event.close()
+    queue.put(bytes(res))
+
+
+class TestIpc(unittest.TestCase):
+    def test_pickle(self):
+        handle = hip.hipIpcMemHandle.from_buffer_copy(bytes(range(64)))
+        shared = pickle.loads(pickle.dumps(SharedBuffer(handle, 4096)))
+        self.assertEqual(shared.handle, handle)
+        self.assertEqual(shared.nbytes, 4096)
+        self.assertRaises(ValueError, shared.close)
+
+    def test_sharedBuffer(self):
+        count = 1024
+        data = bytes(range(256)) * (count // 256)
+        ptr = hip.hipMalloc(count)
+        event = hip.hipEventCreateWithFlags(
+            hip.hipEventInterprocess | hip.hipEventDisableTiming
+        )
+        hip.hipMemcpy_htod(ptr, data)
+        hip.hipEventRecord(event)
+
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        process = context.Process(
+            target=_consume,
+            args=(SharedBuffer.export(ptr, count), SharedEvent.export(event), queue),
+        )
+        process.start()
+        self.assertEqual(queue.get(timeout=60), data)
+        process.join()
+        self.assertEqual(process.exitcode, 0)
+        hip.hipEventDestroy(event)
+        hip.hipFree(ptr)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+from pyhip import hip
+from pyhip.kernel import Kernel, argument_struct, parse_signature, parse_spec
+import ctypes
+import unittest
+
+SOURCE = """
+extern "C" __global__ void axpy(int *a, int x, int y, size_t size) {
+  size_t i = blockDim.x * blockIdx.x + threadIdx.x;
+  if (i < size) {
+    a[i] = a[i] * x + y;
+  }
+}
+
+extern "C" __global__ __launch_bounds__(256)
+void scale(const float* __restrict__ in, float *out, unsigned n, double s) {}
+
+extern "C" __global__ void noop(void) {}
+"""
+
+
+class TestKernel(unittest.TestCase):
+    def test_parseSpec(self):
+        self.assertEqual(
+            parse_spec("P, i,i,Q"),
+            (ctypes.c_void_p, ctypes.c_int32, ctypes.c_int32, ctypes.c_uint64),
+        )
+        with self.assertRaises(ValueError):
+            parse_spec("P,x")
+
+    def test_parseSignature(self):
+        self.assertEqual(
+            parse_signature(SOURCE, "axpy"),
+            (ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_size_t),
+        )
+        self.assertEqual(
+            parse_signature(SOURCE, "scale"),
+            (ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint, ctypes.c_double),
+        )
+        self.assertEqual(parse_signature(SOURCE, "noop"), ())
+        self.assertEqual(
+            parse_signature('extern "C" __global__ void k(int a[], unsigned) {}', "k"),
+            (ctypes.c_void_p, ctypes.c_uint),
+        )
+        bounds = """
+        // __global__ void k(double x) is commented out
+        extern "C" __global__ void __launch_bounds__(256) k(long long a, float b) {}
+        """
+        self.assertEqual(parse_signature(bounds, "k"), (ctypes.c_longlong, ctypes.c_float))
+        block = """
+        extern "C" {
+        __device__ int twice(int v) { return 2 * v; }
+        __global__ void __launch_bounds__(128, 2) k(int *a, size_t n) {}
+        }
+        """
+        self.assertEqual(parse_signature(block, "k"), (ctypes.c_void_p, ctypes.c_size_t))
+        with self.assertRaises(ValueError):
+            parse_signature(SOURCE, "missing")
+        with self.assertRaises(ValueError):
+            parse_signature("__global__ void k(int *a) {}", "k")
+        for parameter in ("float2 v", "int &a", "n", "const"):
+            with self.assertRaises(ValueError):
+                parse_signature(f'extern "C" __global__ void k({parameter}) {{}}', "k")
+
+    def test_argumentStruct(self):
+        struct = argument_struct(parse_spec("P,i,i,Q"))
+        self.assertIs(struct, argument_struct(parse_spec("P,i,i,Q")))
+        self.assertEqual(struct.arg1.offset, 8)
+        self.assertEqual(struct.arg3.offset, 16)
+        self.assertEqual(ctypes.sizeof(struct), 24)
+        # int followed by a double is padded to the double alignment
+        self.assertEqual(argument_struct(parse_spec("i,d")).arg1.offset, 8)
+
+    def test_pack(self):
+        kernel = Kernel(None, "P,i,i,Q", "axpy")
+        struct = kernel.pack(ctypes.c_void_p(64), 2, 3, 10)
+        self.assertIsInstance(struct, kernel.struct_type)
+        self.assertEqual((struct.arg0, struct.arg1, struct.arg2, struct.arg3), (64, 2, 3, 10))
+        with self.assertRaises(TypeError):
+            kernel.pack(64, 2, 3)
+        with self.assertRaises(TypeError):
+            kernel.pack(64, 2.5, 3, 10)
+        with self.assertRaises(TypeError):
+            kernel.pack("ptr", 2, 3, 10)
+
+    def test_launch(self):
+        axpy = Kernel.from_source(SOURCE, "axpy")
+        count = 1000
+        size = 4 * count
+        ptr = hip.hipMalloc(size)
+        hip.hipMemset(ptr, 0, size)
+        stream = hip.hipStreamCreate()
+        axpy(4, 256, ptr, 2, 3, count, stream=stream)
+        launch = axpy.prepare((4,), (256,), ptr, 2, 1, count, stream=stream)
+        launch()
+        hip.hipStreamSynchronize(stream)
+
+        res = (ctypes.c_int * count)()
+        hip.hipMemcpy_dtoh(res, ptr, size)
+        # (0 * 2 + 3) * 2 + 1
+        self.assertEqual(list(res), [7] * count)
+        hip.hipFree(ptr)
+        hip.hipStreamDestroy(stream)
+        hip.hipModuleUnload(axpy.module)
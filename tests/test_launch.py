@@ -0,0 +1,71 @@
+from pyhip import hip, hiprtc
+from pyhip.launch import PreparedLaunch
+import ctypes
+import unittest
+
+
+class TestLaunch(unittest.TestCase):
+    def get_kernel(self):
+        source = """
+        extern "C" __global__ void axpy(int *a, int x, int y) {
+          a[threadIdx.x] = a[threadIdx.x] * x + y;
+        }
+        """
+        prog = hiprtc.hiprtcCreateProgram(source, "axpy", [], [])
+        device_properties = hip.hipGetDeviceProperties(0)
+        if hip.hipGetPlatformName() == "amd":
+            hiprtc.hiprtcCompileProgram(
+                prog, [f"--offload-arch={device_properties.gcnArchName}"]
+            )
+        else:
+            hiprtc.hiprtcCompileProgram(prog, [])
+        code = hiprtc.hiprtcGetCode(prog)
+        module = hip.hipModuleLoadData(code)
+        kernel = hip.hipModuleGetFunction(module, "axpy")
+        hiprtc.hiprtcDestroyProgram(prog)
+        return kernel
+
+    def test_preparedLaunch(self):
+        kernel = self.get_kernel()
+        count = 32
+        size = 4 * count
+        ptr = hip.hipMalloc(size)
+        hip.hipMemset(ptr, 0, size)
+        stream = hip.hipStreamCreate()
+
+        class PackageStruct(ctypes.Structure):
+            _fields_ = [
+                ("a", ctypes.c_void_p),
+                ("x", ctypes.c_int),
+                ("y", ctypes.c_int),
+            ]
+
+        launch = PreparedLaunch(kernel, (1,), (count,), PackageStruct,
+                                stream=stream, args=(ptr, 1, 1))
+        self.assertEqual(launch.grid, (1, 1, 1))
+        self.assertEqual(launch.block, (count, 1, 1))
+        launch()
+        launch.set_args(y=2)
+        launch()
+        launch.args.x = 3
+        launch()
+        hip.hipStreamSynchronize(stream)
+
+        res = (ctypes.c_int * count)()
+        hip.hipMemcpy_dtoh(res, ptr, size)
+        # ((0 * 1 + 1) * 1 + 2) * 3 + 2
+        for i in range(count):
+            self.assertEqual(res[i], 11)
+        hip.hipFree(ptr)
+        hip.hipStreamDestroy(stream)
+
+    def test_preparedLaunchDims(self):
+        class PackageStruct(ctypes.Structure):
+            _fields_ = [("a", ctypes.c_void_p)]
+
+        with self.assertRaises(ValueError):
+            PreparedLaunch(None, (1, 1, 1, 1), (1,), PackageStruct)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import subprocess
+import sys
+import unittest
+
+
+class TestLoader(unittest.TestCase):
+    def run_python(self, code):
+        return subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True
+        )
+
+    def test_importDoesNotLoadLibraries(self):
+        result = self.run_python(
+            "import pyhip; "
+            "assert not pyhip.hip._libhip.loaded; "
+            "assert not pyhip.hiprtc._libhiprtc.loaded"
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+    def test_loadInvalidPath(self):
+        result = self.run_python(
+            "import pyhip\n"
+            "try:\n"
+            "    pyhip.load(path='/nonexistent/libamdhip64.so')\n"
+            "except RuntimeError:\n"
+            "    pass\n"
+            "else:\n"
+            "    raise AssertionError('load did not fail')\n"
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+from pyhip import hip
+from pyhip.managed import ManagedBuffer
+import ctypes
+import unittest
+
+
+class TestManaged(unittest.TestCase):
+    def test_hipMallocManaged(self):
+        count = 10
+        size = 4 * count
+        ptr = hip.hipMallocManaged(size)
+        self.assertIsNotNone(ptr.value)
+        host = (ctypes.c_int * count).from_address(ptr.value)
+        for i in range(count):
+            host[i] = i
+        hip.hipMemPrefetchAsync(ptr, size, hip.hipGetDevice())
+        hip.hipMemAdvise(ptr, size, hip.hipMemAdviseSetReadMostly, hip.hipCpuDeviceId)
+        self.assertEqual(
+            hip.hipMemRangeGetAttribute(ptr, size, hip.hipMemRangeAttributeReadMostly), 1
+        )
+        hip.hipDeviceSynchronize()
+        out = (ctypes.c_int * count)()
+        hip.hipMemcpy_dtoh(out, ptr)
+        self.assertEqual(list(out), list(range(count)))
+        hip.hipFree(ptr)
+
+    def test_managedBuffer(self):
+        stream = hip.hipStreamCreate()
+        with ManagedBuffer(1 << 20) as buf:
+            ctypes.memset(buf.host(), 7, buf.nbytes)
+            buf.set_read_mostly()
+            self.assertTrue(buf.read_mostly)
+            buf.set_read_mostly(False)
+            self.assertFalse(buf.read_mostly)
+            device = hip.hipGetDevice()
+            buf.set_preferred_location(device)
+            self.assertEqual(buf.preferred_location, device)
+            buf.prefetch(device, stream, offset=4096, count=4096)
+            buf.prefetch_to_host(stream)
+            hip.hipStreamSynchronize(stream)
+            self.assertEqual(buf.last_prefetch_location, hip.hipCpuDeviceId)
+            self.assertEqual(buf.host()[4096], b"\x07")
+            with self.assertRaises(ValueError):
+                buf.prefetch(device, stream, offset=buf.nbytes, count=1)
+        hip.hipStreamDestroy(stream)
+
+
+if __name__ == "__main__":
+    unittest.main()
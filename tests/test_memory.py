@@ -1,4 +1,5 @@
 from pyhip import hip
+import array
 import ctypes
 from itertools import repeat
 import unittest
@@ -60,6 +61,90 @@ class TestMemory(unittest.TestCase):
         hip.hipMemcpy_dtoh(output, x_d, size)
         assert all(output[i] == 4 for i in range(len(output)))
 
+    def test_hostBuffer(self):
+        data = bytearray(b"abcd")
+        address, nbytes, view = hip._host_buffer(data, writable=True)
+        self.assertEqual(ctypes.string_at(address, nbytes), b"abcd")
+        self.assertEqual(hip._host_buffer(array.array("i", [1, 2, 3]))[1], 12)
+        ptr = ctypes.c_void_p(16)
+        self.assertIs(hip._host_buffer(ptr)[0], ptr)
+        with self.assertRaises(ValueError):
+            hip._host_buffer(b"abcd", writable=True)
+        with self.assertRaises(ValueError):
+            hip._host_buffer(memoryview(data)[::2])
+        with self.assertRaises(ValueError):
+            hip._copy_args(ptr, data, 8)
+        with self.assertRaises(ValueError):
+            hip._copy_args(ptr, ptr, None)
+
+    def test_hipMemcpyBuffers(self):
+        count = 10
+        size = 4 * count
+        ptr = hip.hipMalloc(size)
+        src = array.array("i", range(count))
+        hip.hipMemcpy_htod(ptr, src)
+        dst = bytearray(size)
+        hip.hipMemcpy_dtoh(dst, ptr)
+        self.assertEqual(bytes(dst), src.tobytes())
+
+        stream = hip.hipStreamCreate()
+        # Both buffers are referenced until the stream is synchronized
+        zeros = bytes(size)
+        hip.hipMemcpyAsync_htod(ptr, zeros, stream=stream)
+        out = memoryview(bytearray(size))
+        hip.hipMemcpyAsync_dtoh(out, ptr, stream=stream)
+        hip.hipStreamSynchronize(stream)
+        self.assertEqual(out.tobytes(), zeros)
+        with self.assertRaises(ValueError):
+            hip.hipMemcpy_dtoh(bytearray(4), ptr, size)
+        hip.hipStreamDestroy(stream)
+        hip.hipFree(ptr)
+
+    def test_hipMallocPitch(self):
+        rows, cols = 5, 7
+        ptr, pitch = hip.hipMallocPitch(0, rows, cols, 4)
+        self.assertGreaterEqual(pitch, cols * 4)
+        src = array.array("i", range(rows * cols))
+        hip.hipMemcpy2D(ptr, pitch, src, cols * 4, cols * 4, rows,
+                        hip.hipMemcpyHostToDevice)
+        dst = array.array("i", [0] * (rows * cols))
+        stream = hip.hipStreamCreate()
+        hip.hipMemcpy2DAsync(dst, cols * 4, ptr, pitch, cols * 4, rows,
+                             hip.hipMemcpyDeviceToHost, stream)
+        hip.hipStreamSynchronize(stream)
+        self.assertEqual(src, dst)
+        with self.assertRaises(ValueError):
+            hip.hipMemcpy2D(ptr, pitch, src, cols * 4, cols * 4, rows + 1,
+                            hip.hipMemcpyHostToDevice)
+        hip.hipStreamDestroy(stream)
+        hip.hipFree(ptr)
+
+    def test_hipMemcpy3D(self):
+        width, height, depth = 8, 3, 2
+        pitched_ptr = hip.hipMalloc3D(width, height, depth)
+        self.assertGreaterEqual(pitched_ptr.pitch, width)
+        src = bytes(range(width * height * depth))
+        host = (ctypes.c_char * len(src)).from_buffer_copy(src)
+        params = hip.hipMemcpy3DParms()
+        params.srcPtr = hip.hipPitchedPtr(ctypes.addressof(host), width, width, height)
+        params.dstPtr = pitched_ptr
+        params.extent = hip.hipExtent(width, height, depth)
+        params.kind = hip.hipMemcpyHostToDevice
+        hip.hipMemcpy3D(params)
+
+        out = (ctypes.c_char * len(src))()
+        params = hip.hipMemcpy3DParms()
+        params.srcPtr = pitched_ptr
+        params.dstPtr = hip.hipPitchedPtr(ctypes.addressof(out), width, width, height)
+        params.extent = hip.hipExtent(width, height, depth)
+        params.kind = hip.hipMemcpyDeviceToHost
+        stream = hip.hipStreamCreate()
+        hip.hipMemcpy3DAsync(params, stream)
+        hip.hipStreamSynchronize(stream)
+        self.assertEqual(bytes(out), src)
+        hip.hipStreamDestroy(stream)
+        hip.hipFree(pitched_ptr.ptr)
+
 
 if __name__ == "__main__":
     unittest.main()
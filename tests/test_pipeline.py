@@ -0,0 +1,71 @@
+from pyhip import hip, hiprtc
+from pyhip.pipeline import StreamPipeline
+import ctypes
+import unittest
+
+
+class TestPipeline(unittest.TestCase):
+    def get_kernel(self):
+        source = """
+        extern "C" __global__ void inc(unsigned char *a, unsigned char *b, size_t size) {
+          size_t i = blockDim.x * blockIdx.x + threadIdx.x;
+          if (i < size) {
+            b[i] = a[i] + 1;
+          }
+        }
+        """
+        prog = hiprtc.hiprtcCreateProgram(source, "inc", [], [])
+        device_properties = hip.hipGetDeviceProperties(0)
+        if hip.hipGetPlatformName() == "amd":
+            hiprtc.hiprtcCompileProgram(
+                prog, [f"--offload-arch={device_properties.gcnArchName}"]
+            )
+        else:
+            hiprtc.hiprtcCompileProgram(prog, [])
+        code = hiprtc.hiprtcGetCode(prog)
+        module = hip.hipModuleLoadData(code)
+        kernel = hip.hipModuleGetFunction(module, "inc")
+        hiprtc.hiprtcDestroyProgram(prog)
+        return kernel
+
+    def get_compute(self):
+        kernel = self.get_kernel()
+
+        class PackageStruct(ctypes.Structure):
+            _fields_ = [
+                ("a", ctypes.c_void_p),
+                ("b", ctypes.c_void_p),
+                ("size", ctypes.c_size_t),
+            ]
+
+        def compute(d_in, d_out, nbytes, stream):
+            struct = PackageStruct(d_in, d_out, nbytes)
+            hip.hipModuleLaunchKernel(
+                kernel, nbytes // 256 + 1, 1, 1, 256, 1, 1, 0, stream, struct
+            )
+
+        return compute
+
+    def test_pipelineBuffer(self):
+        data = bytes(i % 200 for i in range(10000))
+        expected = bytes(i + 1 for i in data)
+        with StreamPipeline(self.get_compute(), 1024, depth=3) as pipeline:
+            results = list(pipeline.run(data))
+            self.assertEqual(len(results), 10)
+            self.assertEqual(b"".join(results), expected)
+            self.assertEqual(pipeline.stats.chunks, 10)
+            self.assertEqual(pipeline.stats.bytes_in, len(data))
+            self.assertGreater(pipeline.stats.gbps, 0)
+
+    def test_pipelineChunks(self):
+        chunks = [bytearray([i]) * (100 + i) for i in range(7)]
+        with StreamPipeline(self.get_compute(), 128, depth=2,
+                            output_size=lambda nbytes: nbytes) as pipeline:
+            for chunk, result in zip(chunks, pipeline.run(chunks, copy=False)):
+                self.assertEqual(result.tobytes(), bytes(i + 1 for i in chunk))
+            with self.assertRaises(ValueError):
+                list(pipeline.run([bytes(256)]))
+
+
+if __name__ == "__main__":
+    unittest.main()
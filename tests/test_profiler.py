@@ -0,0 +1,44 @@
+from pyhip import hip
+from pyhip.profiler import Profiler, RegionStats
+import io
+import unittest
+
+
+class TestProfiler(unittest.TestCase):
+    def test_regionStats(self):
+        stats = RegionStats("copy")
+        for ms in range(1, 101):
+            stats.add(float(ms))
+        self.assertEqual(stats.count, 100)
+        self.assertEqual(stats.min_ms, 1.0)
+        self.assertEqual(stats.max_ms, 100.0)
+        self.assertEqual(stats.mean_ms, 50.5)
+        self.assertEqual(stats.p50_ms, 51.0)
+        self.assertEqual(stats.p99_ms, 100.0)
+
+    def test_region(self):
+        profiler = Profiler()
+        count = 1 << 20
+        ptr = hip.hipMalloc(count)
+        stream = hip.hipStreamCreate()
+        for _ in range(10):
+            with profiler.region("memset", stream):
+                hip.hipMemsetAsync(ptr, 0, count, stream)
+        profiler.flush()
+        stats = profiler.stats()["memset"]
+        self.assertEqual(stats.count, 10)
+        self.assertGreaterEqual(stats.min_ms, 0.0)
+        # Events are recycled, not created per region
+        with profiler.region("memset", stream):
+            pass
+        self.assertEqual(profiler._events.stats()["size"], 20)
+        out = io.StringIO()
+        profiler.report(out)
+        self.assertIn("memset", out.getvalue())
+        profiler.close()
+        hip.hipFree(ptr)
+        hip.hipStreamDestroy(stream)
+
+
+if __name__ == "__main__":
+    unittest.main()
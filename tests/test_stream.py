@@ -1,6 +1,10 @@
 from pyhip import hip
+from pyhip.streams import StreamPool, stream_pool
 import ctypes
+import contextlib
+import io
 from itertools import repeat
+import threading
 import unittest
 
 
@@ -34,6 +38,63 @@ class TestStream(unittest.TestCase):
         hip.hipFree(ptr)
         hip.hipStreamDestroy(stream)
 
+    def test_hipStreamCreateWithPriority(self):
+        least, greatest = hip.hipDeviceGetStreamPriorityRange()
+        self.assertLessEqual(greatest, least)
+        stream = hip.hipStreamCreateWithPriority(hip.hipStreamNonBlocking, greatest)
+        self.assertEqual(hip.hipStreamGetPriority(stream), greatest)
+        self.assertEqual(hip.hipStreamGetFlags(stream), hip.hipStreamNonBlocking)
+        hip.hipStreamDestroy(stream)
+        stream = hip.hipStreamCreateWithFlags(hip.hipStreamNonBlocking)
+        self.assertEqual(hip.hipStreamGetFlags(stream), hip.hipStreamNonBlocking)
+        hip.hipStreamDestroy(stream)
+
+    def test_streamPool(self):
+        pool = StreamPool(size=2)
+        high = [pool.get("high") for _ in range(4)]
+        self.assertEqual(high[0].value, high[2].value)
+        self.assertNotEqual(high[0].value, high[1].value)
+        self.assertEqual(hip.hipStreamGetPriority(high[0]), pool.greatest_priority)
+        self.assertEqual(hip.hipStreamGetPriority(pool.get()), pool.least_priority)
+        self.assertRaises(ValueError, pool.get, "urgent")
+        pool.synchronize()
+        pool.close()
+        self.assertIs(stream_pool(), stream_pool(hip.hipGetDevice()))
+
+    def test_callbackTrampoline(self):
+        calls = []
+        key = hip._register_callback(calls.append, ("inline",), False)
+        hip._host_fn_trampoline(key)
+        # A key fires once
+        hip._host_fn_trampoline(key)
+        self.assertEqual(calls, ["inline"])
+
+        key = hip._register_callback(lambda: 1 / 0, (), False)
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            hip._host_fn_trampoline(key)
+        self.assertIn("ZeroDivisionError", stderr.getvalue())
+        self.assertNotIn(key, hip._callbacks)
+
+    def test_hipLaunchHostFunc(self):
+        stream = hip.hipStreamCreate()
+        count = 1 << 20
+        ptr = hip.hipMalloc(count)
+        done = threading.Event()
+        results = []
+
+        def on_stream(stream, status, tag):
+            results.append((status, tag))
+
+        hip.hipMemsetAsync(ptr, 0, count, stream)
+        hip.hipStreamAddCallback(stream, on_stream, "memset")
+        hip.hipLaunchHostFunc(stream, done.set)
+        self.assertTrue(done.wait(60))
+        self.assertEqual(results, [(0, "memset")])
+        hip.hipStreamSynchronize(stream)
+        hip.hipFree(ptr)
+        hip.hipStreamDestroy(stream)
+
 
 if __name__ == "__main__":
     unittest.main()
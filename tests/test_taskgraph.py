@@ -0,0 +1,65 @@
+from pyhip import hip
+from pyhip.taskgraph import TaskGraph
+import unittest
+
+
+def _nothing(*args):
+    pass
+
+
+class TestTaskGraph(unittest.TestCase):
+    def test_plan(self):
+        # Streams are only used by run(), planning needs no device
+        graph = TaskGraph(streams=[1, 2, 3])
+        a = graph.add(_nothing)
+        b = graph.add(_nothing)
+        pa = graph.add(_nothing, deps=[a])
+        pb = graph.add(_nothing, deps=[b])
+        host = graph.host(_nothing, deps=[pa])
+        c = graph.add(_nothing, deps=[pa, pb])
+        d = graph.add(_nothing, deps=[c, a])
+        e = graph.add(_nothing, deps=[host])
+        plan, used, waited = graph._build_plan()
+        steps = {index: (stream, waits) for index, stream, waits in plan}
+        # Independent branches on their own streams, continued in place
+        self.assertEqual(steps[a.index][0], steps[pa.index][0])
+        self.assertEqual(steps[b.index][0], steps[pb.index][0])
+        self.assertNotEqual(steps[a.index][0], steps[b.index][0])
+        # Only the cross stream dependency is waited for
+        self.assertEqual(steps[c.index], (steps[pa.index][0], [pb.index]))
+        self.assertEqual(steps[d.index][1], [])
+        self.assertEqual(steps[host.index], (None, [pa.index]))
+        self.assertEqual(steps[e.index][1], [])
+        self.assertEqual(waited, {pa.index, pb.index})
+        # Device nodes are enqueued before the host node waits
+        order = [index for index, _, _ in plan]
+        self.assertLess(order.index(d.index), order.index(host.index))
+        self.assertEqual(used, [0, 1, 2])
+
+    def test_foreignNode(self):
+        node = TaskGraph(streams=[1]).add(_nothing)
+        self.assertRaises(ValueError, TaskGraph(streams=[1]).add, _nothing, deps=[node])
+
+    def test_run(self):
+        count = 1 << 16
+        data = bytes(range(256)) * (count // 256)
+        d_a = hip.hipMalloc(count)
+        d_b = hip.hipMalloc(count)
+        res = bytearray(count)
+        seen = []
+        with TaskGraph() as graph:
+            a = graph.copy(d_a, data, count, hip.hipMemcpyHostToDevice)
+            b = graph.memset(d_b, 0, count)
+            c = graph.copy(d_b, d_a, count, hip.hipMemcpyDeviceToDevice, deps=[a, b])
+            out = graph.copy(res, d_b, count, hip.hipMemcpyDeviceToHost, deps=[c])
+            graph.host(lambda: seen.append(bytes(res)), deps=[out])
+            for _ in range(2):
+                graph.run()
+                graph.synchronize()
+        self.assertEqual(seen, [data, data])
+        hip.hipFree(d_a)
+        hip.hipFree(d_b)
+
+
+if __name__ == "__main__":
+    unittest.main()
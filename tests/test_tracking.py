@@ -0,0 +1,95 @@
+from pyhip import hip, tracking
+from pyhip.tracking import AllocationTracker
+import ctypes
+import io
+import unittest
+
+
+class TestTracking(unittest.TestCase):
+    def test_record(self):
+        tracker = AllocationTracker(stack_sample_rate=2)
+        tracker.record(ctypes.c_void_p(0x1000), 100, "hipMalloc")
+        with tracking.tag("batch"):
+            tracker.record(ctypes.c_void_p(0x2000), 300, "hipMallocPitch")
+        self.assertEqual(tracker.current_bytes, 400)
+        self.assertEqual(tracker.bytes_by_tag(), {None: 100, "batch": 300})
+        live = tracker.live()
+        self.assertEqual([allocation.ptr for allocation in live], [0x2000, 0x1000])
+        self.assertIsNotNone(live[0].stack)
+        self.assertIsNone(live[1].stack)
+
+        # Recording the same pointer again replaces it
+        tracker.record(0x1000, 50, "hipMallocFromPoolAsync")
+        self.assertEqual(tracker.current_bytes, 350)
+        tracker.release(ctypes.c_void_p(0x2000))
+        tracker.release(0x3000)
+        self.assertEqual(tracker.current_bytes, 50)
+        self.assertEqual(tracker.peak_bytes, 400)
+        self.assertEqual(tracker.untracked_frees, 1)
+        self.assertEqual(tracker.bytes_by_tag(), {None: 50})
+
+        out = io.StringIO()
+        tracker.dump(out)
+        self.assertIn("1 live allocations, 50 bytes", out.getvalue())
+        self.assertIn("0x1000", out.getvalue())
+
+        # A reused address does not inherit the stack of the previous allocation
+        tracker = AllocationTracker(stack_sample_rate=2)
+        tracker.record(0x1000, 10, "hipMalloc")
+        tracker.record(0x2000, 20, "hipMalloc")
+        self.assertIsNotNone(tracker.live()[0].stack)
+        tracker.record(0x2000, 20, "hipMalloc")
+        self.assertEqual(tracker.live()[0].ptr, 0x2000)
+        self.assertIsNone(tracker.live()[0].stack)
+
+    def test_nestedAllocator(self):
+        class Pool:
+            # Allocates and frees through tracked hip functions, like MemPool
+            def malloc(self, count):
+                ptr = ctypes.c_void_p(0x5000)
+                hip._record(ptr, count, "hipMallocFromPoolAsync")
+                return ptr
+
+            def free(self, ptr):
+                hip._release(ptr)
+
+        tracker = AllocationTracker()
+        tracker.start()
+        allocator = hip.hipSetAllocator(Pool())
+        try:
+            ptr = hip.hipMalloc(64)
+            self.assertEqual(tracker.total_allocations, 1)
+            self.assertEqual(tracker.live()[0].api, "hipMalloc")
+            hip.hipFree(ptr)
+            self.assertEqual(tracker.current_bytes, 0)
+            self.assertEqual(tracker.untracked_frees, 0)
+        finally:
+            hip.hipSetAllocator(allocator)
+            tracker.stop()
+
+    def test_nested(self):
+        outer = AllocationTracker()
+        inner = AllocationTracker()
+        previous = hip._tracker
+        with outer:
+            with inner:
+                self.assertIs(hip._tracker, inner)
+            self.assertIs(hip._tracker, outer)
+        self.assertIs(hip._tracker, previous)
+        self.assertEqual(AllocationTracker().stack_sample_rate, 64)
+
+    def test_tracker(self):
+        with AllocationTracker(stack_sample_rate=1) as tracker:
+            with tracking.tag("test"):
+                ptr = hip.hipMalloc(1024)
+                pitched, pitch = hip.hipMallocPitch(0, 4, 10, 4)
+            self.assertEqual(tracker.bytes_by_tag(), {"test": 1024 + 4 * pitch})
+            hip.hipFree(pitched)
+            self.assertEqual(tracker.current_bytes, 1024)
+            self.assertEqual(tracker.live()[0].api, "hipMalloc")
+            hip.hipFree(ptr)
+            self.assertEqual(tracker.current_bytes, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()